@@ -0,0 +1 @@
+"""Offline benchmarks for the deepseek-code-agent orchestration core."""
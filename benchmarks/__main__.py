@@ -0,0 +1,89 @@
+"""Run the orchestration benchmark suite.
+
+Usage::
+
+    python -m benchmarks                       # full suite, table on stdout
+    python -m benchmarks --quick               # reduced sizes for CI
+    python -m benchmarks --json out.json       # also write results as JSON
+    python -m benchmarks --baseline benchmarks/baseline.json
+
+With ``--baseline`` every metric is compared against the stored run and the
+exit status is 1 if any regressed by more than ``--tolerance``. The baseline
+must have been recorded with the same ``--quick`` and ``--latency``, since
+metric names do not encode sizes or latencies; otherwise the comparison is
+refused with exit status 2.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from . import suite
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for smoke runs")
+    parser.add_argument(
+        "--latency",
+        default="lognormal:0.002,0.5",
+        help="stub agent latency: constant:S, uniform:LO,HI, exponential:MEAN, "
+        "lognormal:MEDIAN,SIGMA",
+    )
+    parser.add_argument("--only", nargs="*", help="run cases whose names start with these")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against results stored by --json")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        meta = baseline.get("meta", {})
+        recorded = {"quick": meta.get("quick"), "latency": meta.get("latency")}
+        wanted = {"quick": args.quick, "latency": args.latency}
+        if recorded != wanted:
+            print(
+                f"{args.baseline} was recorded with {recorded}, not {wanted}; "
+                "rerun with matching options or record a new baseline",
+                file=sys.stderr,
+            )
+            return 2
+
+    results = suite.run(quick=args.quick, latency=args.latency, only=args.only)
+    for metric, value in results.items():
+        print(f"{metric:<45} {value:>16,.1f}")
+
+    if args.json:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "quick": args.quick,
+                "latency": args.latency,
+            },
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if baseline is None:
+        return 0
+    rows = suite.compare(results, baseline["results"], args.tolerance)
+    print(f"\n{'metric':<45} {'baseline':>14} {'current':>14} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(
+            f"{row['metric']:<45} {row['baseline']:>14,.1f} {row['current']:>14,.1f} "
+            f"{row['change']:>+8.1%}{flag}"
+        )
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Memory and throughput of broadcasting large payloads to many agents.
+
+Sends a ``--size`` MiB payload (1 MiB by default) to ``--agents`` agents
+(1,000 by default) three ways: one message per recipient with a private
+copy of the payload, as when each send serialises its own content; one
+message per recipient sharing the payload; and a single message shared
+through ``MessageBus.broadcast``. Retained memory is measured with
+tracemalloc. Finally it times ``MessageBus.pump`` flushing agent
+outboxes into their recipients' inboxes against publishing each message
+on the bus.
+
+Run with ``python -m benchmarks.bench_broadcast``.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from deepseek_code_agent import Agent
+from deepseek_code_agent.messaging import Message, MessageBus
+
+
+def measure(send) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    bus = send()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del bus
+    return elapsed, retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=1_000)
+    parser.add_argument("--size", type=int, default=1, help="payload size in MiB")
+    parser.add_argument("--messages", type=int, default=200_000)
+    args = parser.parse_args()
+
+    agent_ids = [f"agent_{i}" for i in range(args.agents)]
+    payload = b"x" * (args.size << 20)
+
+    def copies() -> MessageBus:
+        bus = MessageBus()
+        for agent_id in agent_ids:
+            bus.publish(Message(from_agent="lead", to_agent=agent_id, content=bytearray(payload)))
+        return bus
+
+    def per_recipient() -> MessageBus:
+        bus = MessageBus()
+        for agent_id in agent_ids:
+            bus.publish(Message(from_agent="lead", to_agent=agent_id, content=payload))
+        return bus
+
+    def broadcast() -> MessageBus:
+        bus = MessageBus()
+        bus.broadcast(Message(from_agent="lead", to_agent="*", content=payload), agent_ids)
+        return bus
+
+    print(f"{args.size} MiB payload to {args.agents:,} agents")
+    print(f"{'strategy':<22} {'ms':>9} {'retained MiB':>13} {'deliveries/s':>13}")
+    for label, send in (
+        ("copy per recipient", copies),
+        ("message per recipient", per_recipient),
+        ("broadcast", broadcast),
+    ):
+        elapsed, retained = measure(send)
+        print(
+            f"{label:<22} {elapsed * 1e3:>9.2f} {retained / 2**20:>13.2f} "
+            f"{args.agents / elapsed:>13,.0f}"
+        )
+
+    agents = [Agent(name=f"a{i}", inbox_size=None, outbox_size=None) for i in range(100)]
+    per_agent = args.messages // len(agents)
+
+    def fill() -> list[Message]:
+        for i, agent in enumerate(agents):
+            for j in range(per_agent):
+                agent.send_to(agents[(i + j + 1) % len(agents)], "ping")
+        return [message for agent in agents for message in agent.outbox]
+
+    fill()
+    start = time.perf_counter()
+    moved = MessageBus().pump(agents)
+    pumped = time.perf_counter() - start
+
+    messages = fill()
+    for agent in agents:
+        agent.outbox.clear()
+        while agent.receive() is not None:
+            pass
+    bus = MessageBus()
+    start = time.perf_counter()
+    for message in messages:
+        bus.publish(message)
+    single = time.perf_counter() - start
+    print()
+    print(f"pump {moved:,} outbox messages: {moved / pumped:>12,.0f} msg/s")
+    print(f"publish on the bus:        {len(messages) / single:>12,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Completion throughput and latency through the shared client pool.
+
+Starts the local stub server and has thousands of agents call it
+concurrently, once with the shared ``ClientPool`` and once with a fresh
+client per agent (the situation without a client layer). Requires the
+``openai`` package.
+
+Run with ``python -m benchmarks.bench_client``.
+"""
+
+import argparse
+import asyncio
+import time
+
+from deepseek_code_agent import Agent
+from deepseek_code_agent.client import ClientPool, set_client_pool
+
+from .stub_server import StubServer
+
+MESSAGES = [{"role": "user", "content": "Fix lint in module x."}]
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def pooled(agents: list[Agent], concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(agent: Agent) -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            await agent.complete(MESSAGES)
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*(one(agent) for agent in agents))
+
+
+async def unpooled(agents: list[Agent], concurrency: int) -> list[float]:
+    from openai import AsyncOpenAI
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(agent: Agent) -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            async with AsyncOpenAI(base_url=agent.base_url, api_key="stub") as client:
+                await client.chat.completions.create(model=agent.model, messages=MESSAGES)
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*(one(agent) for agent in agents))
+
+
+async def bench(args: argparse.Namespace) -> None:
+    async with StubServer(latency=args.latency) as server:
+        agents = [Agent(name=f"agent-{i}", base_url=server.base_url) for i in range(args.agents)]
+        pool = ClientPool(max_connections=args.concurrency)
+        set_client_pool(pool)
+        for label, runner in (("pooled", pooled), ("per-agent", unpooled)):
+            server.connections = 0
+            start = time.perf_counter()
+            latencies = await runner(agents, args.concurrency)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{label:<10} {len(agents) / elapsed:>8,.0f} req/s  "
+                f"p50={percentile(latencies, 0.5) * 1e3:6.1f}ms  "
+                f"p99={percentile(latencies, 0.99) * 1e3:6.1f}ms  "
+                f"connections={server.connections}"
+            )
+        await pool.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.01)
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Fixed against adaptive concurrency on a stub provider that starts throttling.
+
+The stub provider answers in ``--latency`` seconds up to ``--capacity``
+calls in flight and proportionally slower beyond it. It returns a 429 for
+calls over its throttling point, which starts at ``--throttle`` and drops
+to ``--throttle-after`` once half the calls are made, as when a shared
+quota is taken by another tenant. The same tasks run through a
+``TaskQueue`` at several fixed ``max_concurrency`` values and once with an
+``AdaptiveConcurrency`` limit; makespan, successful calls per second, the
+429 rate and the final limit are printed.
+
+Run with ``python -m benchmarks.bench_concurrency``.
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+
+from deepseek_code_agent import Agent, Task, TaskQueue, TaskResult
+from deepseek_code_agent.concurrency import AdaptiveConcurrency
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+@dataclass
+class Provider:
+    latency: float
+    capacity: int
+    throttle: int
+    throttle_after: int
+    switch_at: int
+    in_flight: int = 0
+    calls: int = 0
+
+    async def call(self) -> None:
+        self.calls += 1
+        limit = self.throttle if self.calls <= self.switch_at else self.throttle_after
+        self.in_flight += 1
+        try:
+            if self.in_flight > limit:
+                await asyncio.sleep(self.latency / 4)
+                raise RateLimitError("429 Too Many Requests")
+            await asyncio.sleep(self.latency * max(1.0, self.in_flight / self.capacity))
+        finally:
+            self.in_flight -= 1
+
+
+@dataclass(repr=False)
+class ProviderAgent(Agent):
+    provider: Provider | None = None
+
+    async def run_async(self, task: Task) -> TaskResult:
+        await self.provider.call()
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output="")
+
+
+def run(
+    args: argparse.Namespace, workers: int, limiter: AdaptiveConcurrency | None
+) -> tuple[float, int]:
+    provider = Provider(
+        args.latency, args.capacity, args.throttle, args.throttle_after, args.tasks // 2
+    )
+    queue = TaskQueue(
+        agents=[ProviderAgent(name=f"stub-{i}", provider=provider) for i in range(workers)],
+        tasks=[Task(description=f"task {i}") for i in range(args.tasks)],
+        parallel=True,
+        max_concurrency=workers,
+        concurrency=limiter,
+    )
+    start = time.perf_counter()
+    results = queue.run()
+    return time.perf_counter() - start, sum(result.success for result in results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--capacity", type=int, default=24)
+    parser.add_argument("--throttle", type=int, default=32)
+    parser.add_argument("--throttle-after", type=int, default=8)
+    parser.add_argument("--ceiling", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'concurrency':<12} {'makespan':>8} {'ok/s':>7} {'429s':>6} {'limit':>6}")
+    for workers in (4, 16, args.ceiling, None):
+        limiter = None
+        if workers is None:
+            workers = args.ceiling
+            limiter = AdaptiveConcurrency(ceiling=args.ceiling)
+        makespan, succeeded = run(args, workers, limiter)
+        label = "adaptive" if limiter else f"fixed {workers}"
+        limit = limiter.limit if limiter else workers
+        print(
+            f"{label:<12} {makespan:>8.3f} {succeeded / makespan:>7.0f} "
+            f"{1 - succeeded / args.tasks:>6.1%} {limit:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Executor backend scaling on CPU-bound stub tasks.
+
+Thread pools stay flat because the stub holds the GIL; process pools should
+scale with the number of cores. Workers are warmed before timing.
+
+Run with ``python -m benchmarks.bench_executors``.
+"""
+
+import argparse
+import os
+import time
+
+from deepseek_code_agent import Task, TaskQueue
+from deepseek_code_agent.executors import ProcessExecutor, make_executor
+
+from .stubs import BusyAgent
+
+
+def bench(backend: str, workers: int, tasks: int, work: int) -> float:
+    executor = make_executor(backend, workers)
+    if isinstance(executor, ProcessExecutor):
+        executor.warm()
+    queue = TaskQueue(
+        agents=[BusyAgent(name=f"busy-{i}", work=work) for i in range(workers)],
+        parallel=True,
+        max_concurrency=workers,
+        executor=executor,
+    )
+    for i in range(tasks):
+        queue.add_task(Task(description=f"task {i}"))
+    try:
+        start = time.perf_counter()
+        queue.run()
+        return time.perf_counter() - start
+    finally:
+        queue.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=64)
+    parser.add_argument("--work", type=int, default=200_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    baseline = bench("inline", 1, args.tasks, args.work)
+    print(f"cores={os.cpu_count()} inline baseline {baseline:.2f}s")
+    workers = 1
+    while workers <= args.max_workers:
+        for backend in ("thread", "process"):
+            elapsed = bench(backend, workers, args.tasks, args.work)
+            speedup = baseline / elapsed
+            print(f"{backend:>8} x{workers:<3} {elapsed:>7.2f}s  speedup {speedup:>5.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Random-access line reads on a very large file through FileView.
+
+Writes a file of ``--size`` MiB (1 GiB by default) of variable-length log
+lines, then times building the line index, cached reopening, and random
+50-line range reads, against reading the whole file and splitting it as a
+naive read tool would.
+
+Run with ``python -m benchmarks.bench_fileview``.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from deepseek_code_agent.fileview import FileView
+
+from .suite import percentile
+
+
+def make_file(path: str, size: int, seed: int) -> None:
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(100)]
+    records = (
+        f"2024-01-01T00:00:{i % 60:02d} INFO "
+        + " ".join(rng.choices(words, k=rng.randrange(2, 30)))
+        for i in range(20_000)
+    )
+    chunk = "".join(record + "\n" for record in records).encode()
+    with open(path, "wb") as f:
+        written = 0
+        while written < size:
+            f.write(chunk)
+            written += len(chunk)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1024, help="file size in MiB")
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--span", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "big.log")
+        make_file(path, args.size << 20, args.seed)
+
+        start = time.perf_counter()
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        naive = time.perf_counter() - start
+        total = len(lines)
+        del lines
+        print(f"naive full read + split: {naive:8.3f} s per read ({total:,} lines)")
+
+        start = time.perf_counter()
+        view = FileView(path)
+        print(f"index build (first open): {time.perf_counter() - start:8.3f} s")
+        start = time.perf_counter()
+        FileView(path).close()
+        print(f"cached reopen:            {(time.perf_counter() - start) * 1e3:8.3f} ms")
+
+        rng = random.Random(args.seed)
+        timings = []
+        for _ in range(args.reads):
+            line = rng.randrange(view.line_count)
+            start = time.perf_counter()
+            view.lines(line, line + args.span)
+            timings.append(time.perf_counter() - start)
+        view.close()
+        print(
+            f"random {args.span}-line reads:    p50 {percentile(timings, 0.5) * 1e6:,.0f} µs, "
+            f"p99 {percentile(timings, 0.99) * 1e6:,.0f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
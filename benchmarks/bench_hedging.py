@@ -0,0 +1,89 @@
+"""Tail latency of hedged against unhedged execution on a long-tailed stub provider.
+
+Each attempt's latency is drawn independently: usually ``--base`` seconds,
+but with probability ``--straggler`` it takes ``--slowdown`` times longer,
+as when a request lands on an overloaded replica. The same tasks run
+through a ``TaskQueue`` with spare agents, once plain and once with a
+``Hedger`` at several budgets; per-task latency percentiles, makespan and
+the extra-call ratio are printed.
+
+Run with ``python -m benchmarks.bench_hedging``.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+
+from deepseek_code_agent import Agent, Task, TaskQueue, TaskResult
+from deepseek_code_agent.hedging import Hedger
+
+from .suite import percentile
+
+
+@dataclass(repr=False)
+class StragglerAgent(Agent):
+    """Stub agent whose calls occasionally take far longer than usual."""
+
+    base: float = 0.01
+    straggler: float = 0.05
+    slowdown: float = 20.0
+    rng: random.Random | None = None
+
+    async def run_async(self, task: Task) -> TaskResult:
+        delay = self.base * (self.slowdown if self.rng.random() < self.straggler else 1.0)
+        await asyncio.sleep(delay * self.rng.uniform(0.8, 1.2))
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output="")
+
+
+def run(args: argparse.Namespace, hedger: Hedger | None) -> tuple[list[float], float]:
+    rng = random.Random(args.seed)
+    agents = [
+        StragglerAgent(
+            name=f"stub-{i}", base=args.base, straggler=args.straggler,
+            slowdown=args.slowdown, rng=rng,
+        )
+        for i in range(args.agents)
+    ]
+    queue = TaskQueue(
+        agents=agents, parallel=True, max_concurrency=args.concurrency, hedger=hedger
+    )
+    for i in range(args.tasks):
+        queue.add_task(Task(description=f"task {i}", hedge=True))
+    start = time.perf_counter()
+    results = queue.run()
+    makespan = time.perf_counter() - start
+    return [result.metadata["span"]["run_time"] for result in results], makespan
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--agents", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base", type=float, default=0.01)
+    parser.add_argument("--straggler", type=float, default=0.05)
+    parser.add_argument("--slowdown", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'hedging':<12} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'max ms':>7} "
+        f"{'makespan':>8} {'extra':>6} {'saved s':>7}"
+    )
+    for budget in (None, 0.02, 0.05, 0.1):
+        hedger = Hedger(budget=budget) if budget is not None else None
+        latencies, makespan = run(args, hedger)
+        stats = hedger.stats() if hedger else {"extra_call_ratio": 0.0, "saved_seconds": 0.0}
+        label = f"budget {budget:.0%}" if budget is not None else "off"
+        print(
+            f"{label:<12} {percentile(latencies, 0.5) * 1e3:>7.1f} "
+            f"{percentile(latencies, 0.95) * 1e3:>7.1f} {percentile(latencies, 0.99) * 1e3:>7.1f} "
+            f"{max(latencies) * 1e3:>7.1f} {makespan:>8.3f} {stats['extra_call_ratio']:>6.1%} "
+            f"{stats['saved_seconds']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""MessageBus publish/drain throughput and retained memory.
+
+Publishes messages round-robin to many agents, then has every agent drain
+its mailbox. For contrast, times a handful of polls against the previous
+scan-everything implementation on the same backlog.
+
+Run with ``python -m benchmarks.bench_messaging``.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from deepseek_code_agent.messaging import Message, MessageBus
+
+
+def scan_subscribe(messages: list[Message], agent_id: str) -> list[Message]:
+    """The original O(total messages) subscribe."""
+    return [m for m in messages if m.to_agent == agent_id]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=10_000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--max-messages", type=int, default=None)
+    args = parser.parse_args()
+
+    agent_ids = [f"agent_{i}" for i in range(args.agents)]
+    messages = [
+        Message(from_agent="bench", to_agent=agent_ids[i % args.agents], content="ping")
+        for i in range(args.messages)
+    ]
+
+    tracemalloc.start()
+    bus = MessageBus(max_messages=args.max_messages)
+    start = time.perf_counter()
+    for message in messages:
+        bus.publish(message)
+    published = time.perf_counter()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    drained = 0
+    for agent_id in agent_ids:
+        drained += len(bus.subscribe(agent_id))
+    finished = time.perf_counter()
+
+    polls = 10
+    scan_start = time.perf_counter()
+    for agent_id in agent_ids[:polls]:
+        scan_subscribe(messages, agent_id)
+    scan_per_poll = (time.perf_counter() - scan_start) / polls
+
+    print(f"agents={args.agents:,} messages={args.messages:,} max_messages={args.max_messages}")
+    print(f"  publish        {args.messages / (published - start):>12,.0f} msg/s")
+    drain_rate = drained / (finished - published)
+    print(f"  drain all      {drain_rate:>12,.0f} msg/s ({drained:,} delivered)")
+    print(f"  bus overhead   {retained / args.messages:>12,.1f} bytes/msg")
+    print(f"  mailbox poll   {(finished - published) / args.agents * 1e6:>12,.1f} us/agent")
+    print(f"  scan poll      {scan_per_poll * 1e6:>12,.1f} us/agent (previous implementation)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Memory and construction cost of Task, TaskResult and Message.
+
+Compares the slotted classes with replicas of the original dataclasses
+(per-instance ``__dict__``, eager ``metadata`` dict, ``uuid4`` ids and an
+eagerly formatted ISO timestamp on messages).
+
+Run with ``python -m benchmarks.bench_objects``.
+"""
+
+import argparse
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from deepseek_code_agent import Message, Task, TaskResult
+
+from .suite import allocated
+
+
+@dataclass
+class LegacyTask:
+    description: str
+    id: str = field(default_factory=lambda: f"task_{uuid.uuid4().hex[:8]}")
+    priority: int = 0
+    decompose: bool = False
+    max_depth: int = 3
+    strategies: list[str] = field(default_factory=list)
+    metadata: dict[str, Any] = field(default_factory=dict)
+    status: str = "pending"
+    depends_on: list[str] = field(default_factory=list)
+    depth: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.strategies:
+            self.strategies = ["by_feature"]
+
+
+@dataclass
+class LegacyTaskResult:
+    task_id: str
+    agent_id: str
+    success: bool
+    output: str
+    error: str | None = None
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class LegacyMessage:
+    from_agent: str
+    to_agent: str
+    content: str
+    id: str = field(default_factory=lambda: f"msg_{uuid.uuid4().hex[:8]}")
+    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+PAIRS: dict[str, tuple[Callable[[int], Any], Callable[[int], Any]]] = {
+    "Task": (
+        lambda i: LegacyTask(description="fix lint"),
+        lambda i: Task(description="fix lint"),
+    ),
+    "TaskResult": (
+        lambda i: LegacyTaskResult(task_id="t", agent_id="a", success=True, output="ok"),
+        lambda i: TaskResult(task_id="t", agent_id="a", success=True, output="ok"),
+    ),
+    "Message": (
+        lambda i: LegacyMessage(from_agent="a", to_agent="b", content="ping"),
+        lambda i: Message(from_agent="a", to_agent="b", content="ping"),
+    ),
+}
+
+
+def construct(make: Callable[[int], Any], count: int) -> float:
+    """Mean microseconds per construction."""
+    start = time.perf_counter()
+    for i in range(count):
+        make(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{'type':<11} {'':>7} {'bytes/obj':>10} {'us/new':>8}")
+    for name, (legacy, slotted) in PAIRS.items():
+        for label, make in (("before", legacy), ("after", slotted)):
+            size = allocated(lambda: [make(i) for i in range(args.count)]) / args.count
+            print(f"{name:<11} {label:>7} {size:>10.0f} {construct(make, args.count):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
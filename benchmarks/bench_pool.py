@@ -0,0 +1,109 @@
+"""Agent pool throughput and fairness with heterogeneous stub agents.
+
+Compares the pool-backed TaskQueue with the original dispatch rule (first
+idle agent, else ``agents[0]``) under saturation. Stub agents do not slow
+down when overloaded, so the legacy rule's throughput is optimistic; its
+peak concurrency on agent 0 is what a real agent would have to absorb.
+
+Run with ``python -m benchmarks.bench_pool``.
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+
+from deepseek_code_agent import Agent, Task, TaskQueue, TaskResult
+
+from .stubs import SleepyAgent
+
+
+@dataclass(repr=False)
+class CountingAgent(SleepyAgent):
+    """Stub agent that records busy time and peak concurrency."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.tasks_run = 0
+        self.busy = 0.0
+        self.active = 0
+        self.peak = 0
+
+    async def run_async(self, task: Task) -> TaskResult:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        start = time.perf_counter()
+        try:
+            return await super().run_async(task)
+        finally:
+            self.busy += time.perf_counter() - start
+            self.tasks_run += 1
+            self.active -= 1
+
+
+def make_agents(count: int, base_latency: float) -> list[CountingAgent]:
+    # Latencies spread 1x..4x so agents differ in speed.
+    return [
+        CountingAgent(name=f"stub-{i}", latency=base_latency * (1 + 3 * i / max(count - 1, 1)))
+        for i in range(count)
+    ]
+
+
+async def legacy_dispatch(agents: list[Agent], tasks: list[Task], concurrency: int) -> None:
+    """The original first-idle-else-agent-0 rule, run with bounded concurrency."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(task: Task) -> None:
+        async with semaphore:
+            agent = next((a for a in agents if a.status == "idle"), agents[0])
+            await agent.run_async(task)
+
+    await asyncio.gather(*(one(task) for task in tasks))
+
+
+def jain(values: list[float]) -> float:
+    """Jain's fairness index: 1.0 when all values are equal."""
+    return sum(values) ** 2 / (len(values) * sum(v * v for v in values)) if any(values) else 1.0
+
+
+def report(label: str, agents: list[CountingAgent], tasks: int, elapsed: float) -> None:
+    utilization = [agent.busy / elapsed for agent in agents]
+    print(
+        f"{label:<8} {tasks / elapsed:>9,.0f} tasks/s  "
+        f"fairness={jain(utilization):.2f}  "
+        f"max peak={max(agent.peak for agent in agents)}  "
+        f"agent0 share={agents[0].tasks_run / tasks:.0%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=16)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    agents = make_agents(args.agents, args.latency)
+    tasks = [Task(description=f"task {i}") for i in range(args.tasks)]
+    start = time.perf_counter()
+    asyncio.run(legacy_dispatch(agents, tasks, args.concurrency))
+    report("legacy", agents, args.tasks, time.perf_counter() - start)
+
+    for capacity in (1, 2):
+        agents = make_agents(args.agents, args.latency)
+        queue = TaskQueue(
+            agents=agents,
+            parallel=True,
+            max_concurrency=args.concurrency,
+            per_agent_concurrency=capacity,
+        )
+        for task in tasks:
+            queue.add_task(task)
+        start = time.perf_counter()
+        queue.run()
+        report(f"pool/{capacity}", agents, args.tasks, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
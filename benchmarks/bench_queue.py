@@ -0,0 +1,43 @@
+"""Concurrent TaskQueue speedup against a latency-bound stub agent.
+
+Run with ``python -m benchmarks.bench_queue``.
+"""
+
+import argparse
+import time
+
+from deepseek_code_agent import Task, TaskQueue
+
+from .stubs import SleepyAgent
+
+
+def bench(tasks: int, agents: int, concurrency: int, latency: float) -> float:
+    queue = TaskQueue(
+        agents=[SleepyAgent(name=f"stub-{i}", latency=latency) for i in range(agents)],
+        parallel=True,
+        max_concurrency=concurrency,
+    )
+    for i in range(tasks):
+        queue.add_task(Task(description=f"task {i}"))
+
+    start = time.perf_counter()
+    queue.run()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=256)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    baseline = bench(args.tasks, 1, 1, args.latency)
+    print(f"{'concurrency':>11} {'seconds':>8} {'speedup':>8} {'efficiency':>10}")
+    for concurrency in (1, 2, 4, 8, 16, 32, 64):
+        elapsed = bench(args.tasks, concurrency, concurrency, args.latency)
+        speedup = baseline / elapsed
+        print(f"{concurrency:>11} {elapsed:>8.3f} {speedup:>8.2f} {speedup / concurrency:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
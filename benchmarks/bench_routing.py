@@ -0,0 +1,62 @@
+"""Agent selection cost in Team as the team grows.
+
+Builds teams of agents spread over a few roles, tools and tags, then
+times ``Team._select_agent`` for tasks with no requirements, one
+requirement and an intersection of three.
+
+Run with ``python -m benchmarks.bench_routing``.
+"""
+
+import argparse
+import time
+
+from deepseek_code_agent import Agent, Task, Team
+
+ROLES = ("Developer", "Reviewer", "Tester", "Architect")
+TOOLS = ("grep", "edit", "shell", "browser", "glob")
+
+
+def make_team(size: int) -> Team:
+    return Team(
+        agents=[
+            Agent(
+                name=f"agent-{i}",
+                role=ROLES[i % len(ROLES)],
+                tools=[TOOLS[i % len(TOOLS)], TOOLS[(i + 2) % len(TOOLS)]],
+                tags=[f"shard-{i % 50}"],
+            )
+            for i in range(size)
+        ]
+    )
+
+
+def per_call(team: Team, task: Task, calls: int) -> float:
+    team._select_agent(task)
+    start = time.perf_counter()
+    for _ in range(calls):
+        team._select_agent(task)
+    return (time.perf_counter() - start) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    queries = (
+        ("any", []),
+        ("role", ["role:Reviewer"]),
+        ("role+tool+tag", ["role:Reviewer", "tool:grep", "tag:shard-5"]),
+    )
+    print(f"{'agents':>7} " + " ".join(f"{label:>15}" for label, _ in queries) + "   (µs/call)")
+    for size in (10, 100, 1_000, 10_000):
+        team = make_team(size)
+        cells = [
+            per_call(team, Task(description="t", requires=requires), args.calls) * 1e6
+            for _, requires in queries
+        ]
+        print(f"{size:>7} " + " ".join(f"{cell:>15.2f}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""PriorityScheduler throughput for bulk and interleaved enqueue/dequeue.
+
+Run with ``python -m benchmarks.bench_scheduler``.
+"""
+
+import argparse
+import random
+import time
+
+from deepseek_code_agent.scheduler import PriorityScheduler
+
+
+def bench_bulk(ops: int, aging: float) -> tuple[float, float]:
+    scheduler = PriorityScheduler(aging=aging)
+    priorities = [random.randrange(10) for _ in range(ops)]
+
+    start = time.perf_counter()
+    for i, priority in enumerate(priorities):
+        scheduler.push(i, priority)
+    pushed = time.perf_counter()
+    while scheduler:
+        scheduler.pop()
+    popped = time.perf_counter()
+    return pushed - start, popped - pushed
+
+
+def bench_interleaved(ops: int, depth: int, aging: float) -> float:
+    scheduler = PriorityScheduler(aging=aging)
+    for i in range(depth):
+        scheduler.push(i, random.randrange(10))
+    priorities = [random.randrange(10) for _ in range(ops)]
+
+    start = time.perf_counter()
+    for i, priority in enumerate(priorities):
+        scheduler.push(i, priority)
+        scheduler.pop()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    parser.add_argument("--depth", type=int, default=10_000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    for aging in (0.0, 1.0):
+        push, pop = bench_bulk(args.ops, aging)
+        mixed = bench_interleaved(args.ops, args.depth, aging)
+        print(f"aging={aging}")
+        print(f"  bulk push   {args.ops / push:>12,.0f} ops/s")
+        print(f"  bulk pop    {args.ops / pop:>12,.0f} ops/s")
+        print(f"  push+pop @ depth {args.depth:,}: {args.ops / mixed:>12,.0f} pairs/s")
+
+
+if __name__ == "__main__":
+    main()
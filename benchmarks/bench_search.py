@@ -0,0 +1,84 @@
+"""Indexed grep and glob against walking and reading the tree on every query.
+
+Generates a synthetic source tree, builds a ``SearchIndex`` over it and
+times a selective regex, a glob and a no-change refresh against the
+naive walk-and-read approach a grep tool would otherwise take.
+
+Run with ``python -m benchmarks.bench_search``.
+"""
+
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+from deepseek_code_agent.search_index import SearchIndex
+
+WORDS = ("agent", "task", "queue", "result", "pool", "model", "token", "span", "cache", "team")
+
+
+def make_tree(root: str, files: int, lines: int, seed: int) -> None:
+    rng = random.Random(seed)
+    for i in range(files):
+        directory = os.path.join(root, f"pkg{i % 20}", f"mod{i % 7}")
+        os.makedirs(directory, exist_ok=True)
+        body = [
+            f"def {rng.choice(WORDS)}_{rng.choice(WORDS)}_{j}(x): return x + {j}"
+            for j in range(lines)
+        ]
+        if i % 500 == 0:
+            body.append("def handle_rare_event(payload): pass")
+        with open(os.path.join(directory, f"file{i}.py"), "w") as f:
+            f.write("\n".join(body))
+
+
+def naive_grep(root: str, pattern: str) -> int:
+    regex = re.compile(pattern)
+    hits = 0
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in names:
+            with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                hits += sum(1 for line in f if regex.search(line))
+    return hits
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, args.files, args.lines, args.seed)
+        index = SearchIndex(root)
+        start = time.perf_counter()
+        index.refresh()
+        print(f"initial index of {len(index)} files: {time.perf_counter() - start:.2f}s")
+
+        pattern = r"def handle_rare_\w+"
+        rows = (
+            ("grep (naive walk)", lambda: naive_grep(root, pattern)),
+            ("grep (index)", lambda: index.grep(pattern)),
+            ("glob (naive walk)", lambda: [p for p, _, _ in os.walk(root)]),
+            ("glob (index)", lambda: index.glob("pkg1/**/*.py")),
+            ("refresh (no change)", index.refresh),
+        )
+        for label, fn in rows:
+            print(f"{label:<22} {timed(fn) * 1e3:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Makespan of work stealing against central dispatch for skewed task durations.
+
+Each task carries its own duration, drawn from a heavy-tailed distribution,
+and a file hint drawn from a small set of hot files. The same batch runs
+through the central ``TaskQueue``, a ``WorkStealingQueue`` with stealing
+off (static placement) and one with stealing on. ``ideal`` is the lower
+bound ``max(total / agents, longest task)``; ``moves`` counts how often
+consecutive tasks on a file ran on different agents.
+
+Run with ``python -m benchmarks.bench_stealing``.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+
+from deepseek_code_agent import Agent, Task, TaskQueue, TaskResult
+from deepseek_code_agent.stealing import WorkStealingQueue
+
+from .stubs import latency_distribution
+
+DISTRIBUTIONS = ("uniform:0.001,0.02", "exponential:0.01", "lognormal:0.004,1.5")
+
+
+@dataclass(repr=False)
+class TimedAgent(Agent):
+    """Stub agent that sleeps for the duration recorded on each task."""
+
+    async def run_async(self, task: Task) -> TaskResult:
+        await asyncio.sleep(task.metadata["seconds"])
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output="")
+
+
+def make_batch(tasks: int, spec: str, files: int, seed: int) -> list[tuple[float, str]]:
+    duration = latency_distribution(spec, seed)
+    rng = random.Random(seed)
+    return [(duration(), f"src/module_{rng.randrange(files)}.py") for _ in range(tasks)]
+
+
+def run(queue_type: type[TaskQueue], batch: list[tuple[float, str]], agents: int, **options):
+    queue = queue_type(
+        agents=[TimedAgent(name=f"stub-{i}") for i in range(agents)],
+        parallel=True,
+        max_concurrency=agents,
+        **options,
+    )
+    for i, (seconds, path) in enumerate(batch):
+        metadata = {"seconds": seconds, "files": [path]}
+        queue.add_task(Task(description=f"task {i}", metadata=metadata))
+    start = time.perf_counter()
+    results = queue.run()
+    makespan = time.perf_counter() - start
+
+    last: dict[str, str] = {}
+    moves = 0
+    for (_, path), result in zip(batch, results):
+        moves += last.get(path, result.agent_id) != result.agent_id
+        last[path] = result.agent_id
+    return makespan, moves, getattr(queue, "steals", 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=400)
+    parser.add_argument("--agents", type=int, default=8)
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'distribution':<20} {'dispatch':<9} {'seconds':>8} {'vs ideal':>8} "
+        f"{'moves':>6} {'steals':>6}"
+    )
+    for spec in DISTRIBUTIONS:
+        batch = make_batch(args.tasks, spec, args.files, args.seed)
+        durations = [seconds for seconds, _ in batch]
+        ideal = max(sum(durations) / args.agents, max(durations))
+        runs = (
+            ("central", TaskQueue, {}),
+            ("static", WorkStealingQueue, {"steal": False}),
+            ("stealing", WorkStealingQueue, {}),
+        )
+        for label, queue_type, options in runs:
+            makespan, moves, steals = run(queue_type, batch, args.agents, **options)
+            print(
+                f"{spec:<20} {label:<9} {makespan:>8.3f} {makespan / ideal:>8.2f} "
+                f"{moves:>6} {steals:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Sustained enqueue and complete rate of the durable SQLite task store.
+
+Adds tasks, then leases and completes them as a worker would, for several
+commit batch sizes and SQLite durability levels, and finally runs a
+stub-agent TaskQueue with and without the store.
+
+Run with ``python -m benchmarks.bench_store``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from deepseek_code_agent import Task, TaskQueue, TaskResult
+from deepseek_code_agent.store import SQLiteTaskStore
+
+from .stubs import SleepyAgent
+
+
+def store_rates(path: str, tasks: int, batch_size: int, synchronous: str) -> tuple[float, float]:
+    store = SQLiteTaskStore(path, batch_size=batch_size, synchronous=synchronous)
+    batch = [Task(description=f"task {i}") for i in range(tasks)]
+
+    start = time.perf_counter()
+    for task in batch:
+        store.add(task)
+    store.flush()
+    enqueue = tasks / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    while leased := store.lease("bench", 256):
+        for task in leased:
+            store.complete(TaskResult(task_id=task.id, agent_id="bench", success=True, output=""))
+    store.flush()
+    complete = tasks / (time.perf_counter() - start)
+    store.close()
+    return enqueue, complete
+
+
+def queue_rate(path: str | None, tasks: int) -> float:
+    queue = TaskQueue(
+        agents=[SleepyAgent(name=f"stub-{i}", latency=0) for i in range(32)],
+        parallel=True,
+        max_concurrency=32,
+        store=SQLiteTaskStore(path) if path else None,
+    )
+    for i in range(tasks):
+        queue.add_task(Task(description=f"task {i}"))
+    start = time.perf_counter()
+    queue.run()
+    return tasks / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'batch':>6} {'synchronous':>11} {'enqueue/s':>11} {'complete/s':>11}")
+        for synchronous in ("NORMAL", "FULL"):
+            for batch_size in (1, 16, 256):
+                path = os.path.join(tmp, f"store-{synchronous}-{batch_size}.db")
+                # Unbatched commits are slow; keep that run short.
+                count = args.tasks if batch_size > 1 else min(args.tasks, 2_000)
+                enqueue, complete = store_rates(path, count, batch_size, synchronous)
+                print(f"{batch_size:>6} {synchronous:>11} {enqueue:>11,.0f} {complete:>11,.0f}")
+
+        print()
+        for label, path in (("memory", None), ("durable", os.path.join(tmp, "queue.db"))):
+            print(f"TaskQueue {label:<8} {queue_rate(path, args.tasks):>11,.0f} tasks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Local OpenAI-compatible stub server that replays canned completions.
+
+Speaks just enough HTTP/1.1 (with keep-alive) to answer
+``POST /chat/completions`` and ``POST /v1/chat/completions``. Replies cycle
+through a JSON list of canned message strings and can be delayed to mimic
+model latency.
+
+Run with ``python -m benchmarks.stub_server --port 8765 --latency 0.05``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+DEFAULT_REPLIES = ["Done.", "Here is the patch.", "All tests pass."]
+
+
+class StubServer:
+    """Replays canned chat completions over HTTP/1.1."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        replies: list[str] | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self._replies = itertools.cycle(replies or DEFAULT_REPLIES)
+        self._server: asyncio.Server | None = None
+        self._handlers: set[asyncio.Task] = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Drop idle keep-alive connections; wait_closed() waits on them.
+            for handler in self._handlers:
+                handler.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "StubServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.stop()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                if method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+                    status, payload = "200 OK", await self._complete(body)
+                else:
+                    status, payload = "404 Not Found", {"error": {"message": "not found"}}
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    "Connection: keep-alive\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    return
+        except (asyncio.IncompleteReadError, ConnectionResetError, asyncio.CancelledError):
+            return
+        finally:
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def _complete(self, body: bytes) -> dict:
+        self.requests += 1
+        request = json.loads(body or b"{}")
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        content = next(self._replies)
+        messages = request.get("messages", [])
+        prompt_tokens = sum(len(str(m.get("content", ""))) // 4 for m in messages)
+        completion_tokens = len(content) // 4 + 1
+        return {
+            "id": f"chatcmpl-stub-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+async def serve_forever(server: StubServer) -> None:
+    async with server:
+        print(f"stub server listening on {server.base_url}")
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--replies", help="JSON file holding a list of reply strings")
+    args = parser.parse_args()
+
+    replies = None
+    if args.replies:
+        with open(args.replies) as f:
+            replies = json.load(f)
+    try:
+        asyncio.run(serve_forever(StubServer(args.host, args.port, args.latency, replies)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
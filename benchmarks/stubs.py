@@ -0,0 +1,120 @@
+"""Stub agents with artificial latency for offline benchmarks."""
+
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from deepseek_code_agent import Agent, Task, TaskResult, Team
+
+Latency = Callable[[], float]
+
+
+def latency_distribution(spec: str, seed: int | None = 0) -> Latency:
+    """Parse a latency spec into a sampler returning seconds.
+
+    Specs are ``constant:S``, ``uniform:LO,HI``, ``exponential:MEAN`` and
+    ``lognormal:MEDIAN,SIGMA``; a bare number means ``constant``.
+    """
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "constant", kind
+    params = [float(arg) for arg in args.split(",")]
+    rng = random.Random(seed)
+    if kind == "constant":
+        return lambda: params[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(*params)
+    if kind == "exponential":
+        return lambda: rng.expovariate(1 / params[0]) if params[0] else 0.0
+    if kind == "lognormal":
+        median, sigma = params
+        return lambda: median * rng.lognormvariate(0, sigma)
+    raise ValueError(f"unknown latency distribution {kind!r}")
+
+
+@dataclass(repr=False)
+class SleepyAgent(Agent):
+    """Agent that stands in for a model round trip by sleeping."""
+
+    latency: float = 0.05
+    distribution: Latency | None = None
+
+    def delay(self) -> float:
+        """Seconds to sleep for the next task."""
+        return self.distribution() if self.distribution is not None else self.latency
+
+    def run(self, task: Task) -> TaskResult:
+        self.current_task = task
+        self.status = "running"
+        time.sleep(self.delay())
+        return self._finish(task)
+
+    async def run_async(self, task: Task) -> TaskResult:
+        self.current_task = task
+        self.status = "running"
+        await asyncio.sleep(self.delay())
+        return self._finish(task)
+
+    def _finish(self, task: Task) -> TaskResult:
+        self.current_task = None
+        self.status = "idle"
+        return TaskResult(
+            task_id=task.id,
+            agent_id=self.id,
+            success=True,
+            output=f"Agent {self.name} completed: {task.description}",
+        )
+
+
+@dataclass(repr=False)
+class BusyAgent(Agent):
+    """Agent that stands in for local tool work by burning CPU."""
+
+    work: int = 200_000
+
+    def run(self, task: Task) -> TaskResult:
+        self.current_task = task
+        self.status = "running"
+        total = 0
+        for i in range(self.work):
+            total += i * i
+        self.current_task = None
+        self.status = "idle"
+        return TaskResult(
+            task_id=task.id,
+            agent_id=self.id,
+            success=True,
+            output=f"Agent {self.name} completed: {task.description} ({total})",
+        )
+
+
+@dataclass(repr=False)
+class RecordingAgent(SleepyAgent):
+    """Stub agent that timestamps the start and end of every task it runs."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.spans: list[tuple[float, float]] = []
+
+    async def run_async(self, task: Task) -> TaskResult:
+        start = time.perf_counter()
+        self.current_task = task
+        self.status = "running"
+        delay = self.delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        result = self._finish(task)
+        self.spans.append((start, time.perf_counter()))
+        return result
+
+
+class RecursiveTeam(Team):
+    """Team whose subtasks keep decomposing, so a graph is ``3**max_depth`` leaves."""
+
+    def _decompose_task(self, task: Task) -> list[Task]:
+        subtasks = super()._decompose_task(task)
+        for subtask in subtasks:
+            subtask.decompose = True
+        return subtasks
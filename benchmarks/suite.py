@@ -0,0 +1,192 @@
+"""Benchmark cases for the orchestration core.
+
+Every case returns a flat ``{metric: value}`` dict. Metrics ending in
+``_per_sec`` are better when higher; all others (latencies in microseconds,
+memory in bytes) are better when lower. :func:`compare` uses that rule to
+flag regressions against a stored baseline.
+"""
+
+import asyncio
+import gc
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from deepseek_code_agent import Agent, Message, Monitor, Task, TaskQueue
+from deepseek_code_agent.messaging import MessageBus
+
+from .stubs import RecordingAgent, RecursiveTeam, latency_distribution
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def allocated(build: Callable[[], Any]) -> int:
+    """Bytes still allocated by ``build()`` while its result is alive."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+def queue_throughput(tasks: int, agents: int, latency: str) -> dict[str, float]:
+    """Parallel TaskQueue rate and dispatch gap between an agent's tasks."""
+    stubs = [
+        RecordingAgent(name=f"stub-{i}", distribution=latency_distribution(latency, seed=i))
+        for i in range(agents)
+    ]
+    queue = TaskQueue(agents=stubs, parallel=True, max_concurrency=agents)
+    for i in range(tasks):
+        queue.add_task(Task(description=f"task {i}"))
+
+    start = time.perf_counter()
+    queue.run()
+    elapsed = time.perf_counter() - start
+
+    gaps = []
+    for stub in stubs:
+        spans = sorted(stub.spans)
+        gaps.extend(nxt[0] - prev[1] for prev, nxt in zip(spans, spans[1:]))
+    return {
+        "tasks_per_sec": tasks / elapsed,
+        "overhead_p50_us": percentile(gaps, 0.5) * 1e6,
+        "overhead_p99_us": percentile(gaps, 0.99) * 1e6,
+    }
+
+
+def team_throughput(depth: int, agents: int, latency: str) -> dict[str, float]:
+    """Leaves per second through a Team task graph decomposed ``depth`` levels."""
+    stubs = [
+        RecordingAgent(name=f"stub-{i}", distribution=latency_distribution(latency, seed=i))
+        for i in range(agents)
+    ]
+    team = RecursiveTeam(agents=stubs)
+    task = Task(description="root", decompose=True, max_depth=depth)
+    start = time.perf_counter()
+    asyncio.run(team.run_async(task))
+    elapsed = time.perf_counter() - start
+    return {"leaves_per_sec": sum(len(stub.spans) for stub in stubs) / elapsed}
+
+
+def message_bus(agents: int, messages: int) -> dict[str, float]:
+    """MessageBus publish and drain rates."""
+    bus = MessageBus()
+    ids = [f"agent-{i}" for i in range(agents)]
+    batch = [
+        Message(from_agent="bench", to_agent=ids[i % agents], content="ping")
+        for i in range(messages)
+    ]
+
+    start = time.perf_counter()
+    for message in batch:
+        bus.publish(message)
+    published = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for agent_id in ids:
+        bus.subscribe(agent_id)
+    drained = time.perf_counter() - start
+    return {
+        "publish_per_sec": messages / published,
+        "drain_per_sec": messages / drained,
+    }
+
+
+def monitor_updates(agents: int, updates: int) -> dict[str, float]:
+    """Status changes per second with every agent tracked by a Monitor."""
+    team = [Agent(name=f"agent-{i}") for i in range(agents)]
+    monitor = Monitor(agents={})
+    for agent in team:
+        monitor.track(agent)
+
+    start = time.perf_counter()
+    for i in range(updates):
+        team[i % agents].status = "running" if i // agents % 2 == 0 else "idle"
+    elapsed = time.perf_counter() - start
+
+    version, _ = monitor.status_delta()
+    start = time.perf_counter()
+    team[0].status = "error"
+    monitor.status_delta(since=version)
+    delta = time.perf_counter() - start
+    return {"updates_per_sec": updates / elapsed, "delta_us": delta * 1e6}
+
+
+def memory(count: int) -> dict[str, float]:
+    """Retained bytes per Agent, Task and Message."""
+    return {
+        "bytes_per_agent": allocated(lambda: [Agent(name=f"a{i}") for i in range(count)]) / count,
+        "bytes_per_task": allocated(lambda: [Task(description=f"t{i}") for i in range(count)])
+        / count,
+        "bytes_per_message": allocated(
+            lambda: [Message(from_agent="a", to_agent="b", content=f"m{i}") for i in range(count)]
+        )
+        / count,
+    }
+
+
+def cases(quick: bool, latency: str) -> dict[str, Callable[[], dict[str, float]]]:
+    """Named benchmark cases; ``quick`` shrinks sizes for CI smoke runs."""
+    scale = 10 if quick else 1
+    sizes = (1_000, 10_000) if quick else (1_000, 10_000, 100_000)
+    suite: dict[str, Callable[[], dict[str, float]]] = {
+        "queue.zero_latency": lambda: queue_throughput(20_000 // scale, 32, "0"),
+        "queue.stub_latency": lambda: queue_throughput(2_000 // scale, 64, latency),
+        "team.graph": lambda: team_throughput(6 if not quick else 4, 27, latency),
+        "bus.publish": lambda: message_bus(1_000, 1_000_000 // scale),
+        "monitor.updates": lambda: monitor_updates(1_000, 1_000_000 // scale),
+        "memory": lambda: memory(10_000 // scale),
+    }
+    for size in sizes:
+        suite[f"scaling.queue_{size}"] = lambda size=size: queue_throughput(size, 64, "0")
+    return suite
+
+
+def run(
+    quick: bool = False, latency: str = "lognormal:0.002,0.5", only: list[str] | None = None
+) -> dict[str, float]:
+    """Run the suite and return flat ``{"case.metric": value}`` results."""
+    results = {}
+    for name, case in cases(quick, latency).items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        for metric, value in case().items():
+            results[f"{name}.{metric}"] = value
+    return results
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_sec")
+
+
+def compare(
+    current: dict[str, float], baseline: dict[str, float], tolerance: float = 0.2
+) -> list[dict[str, Any]]:
+    """Relative change of every metric present in both runs.
+
+    A metric regresses when it is worse than the baseline by more than
+    ``tolerance`` (a fraction of the baseline value).
+    """
+    rows = []
+    for metric in sorted(current.keys() & baseline.keys()):
+        base, now = baseline[metric], current[metric]
+        change = (now - base) / base if base else 0.0
+        worse = -change if higher_is_better(metric) else change
+        rows.append({
+            "metric": metric,
+            "baseline": base,
+            "current": now,
+            "change": change,
+            "regressed": worse > tolerance,
+        })
+    return rows
@@ -1,11 +1,25 @@
 """DeepSeek Code Agent - Base Agent implementation."""
 
+import asyncio
+import contextvars
+import time
 import uuid
-from dataclasses import dataclass, field
+import weakref
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field, fields
 from typing import Any
 
+from .client import get_client_pool
+from .context import ConversationContext
+from .ratelimit import estimate_tokens, get_rate_limiter
+from .search_index import SearchIndex
 from .task import Task, TaskResult
-from .messaging import Message
+from .tracing import TaskSpan, record_model_call
+from .messaging import Mailbox, MailboxFullError, Message, OverflowPolicy
+
+StatusListener = Callable[["Agent", str, str], None]
+SpanListener = Callable[["Agent", TaskSpan], None]
 
 
 @dataclass
@@ -16,50 +30,251 @@ class Agent:
     role: str = "General Assistant"
     tools: list[str] = field(default_factory=list)
     model: str = "deepseek-chat"
+    base_url: str | None = None
     max_turns: int = 50
+    inbox_size: int | None = 1000
+    outbox_size: int | None = 1000
+    overflow: OverflowPolicy = OverflowPolicy.BLOCK
+    context_budget: int = 32_000
+    shared_prefix: str | None = None
+    search_index: SearchIndex | None = None
+    tags: list[str] = field(default_factory=list)
     
     def __post_init__(self) -> None:
         self.id = f"agent_{uuid.uuid4().hex[:8]}"
-        self.status = "idle"
+        self._status = "idle"
+        self._status_listeners: list[StatusListener] = []
+        self._span_listeners: list[SpanListener] = []
         self.current_task: Task | None = None
-        self.inbox: list[Message] = []
-        self.outbox: list[Message] = []
+        self.inbox = Mailbox(self.inbox_size, self.overflow)
+        self.outbox: deque[Message] = deque()
+        self._peers: weakref.WeakValueDictionary[str, Agent] = weakref.WeakValueDictionary()
+        self.context = ConversationContext(self.context_budget)
+    
+    @property
+    def status(self) -> str:
+        """Current status; changes are pushed to status listeners."""
+        return self._status
+    
+    @status.setter
+    def status(self, value: str) -> None:
+        previous, self._status = self._status, value
+        if value != previous:
+            for listener in self._status_listeners:
+                listener(self, previous, value)
+    
+    def add_status_listener(self, listener: "StatusListener") -> None:
+        """Call ``listener(agent, old, new)`` whenever the status changes."""
+        self._status_listeners.append(listener)
+    
+    def remove_status_listener(self, listener: "StatusListener") -> None:
+        """Stop notifying a status listener."""
+        if listener in self._status_listeners:
+            self._status_listeners.remove(listener)
+    
+    def add_span_listener(self, listener: "SpanListener") -> None:
+        """Call ``listener(agent, span)`` with the timing span of every task it finishes."""
+        self._span_listeners.append(listener)
+    
+    def remove_span_listener(self, listener: "SpanListener") -> None:
+        """Stop notifying a span listener."""
+        if listener in self._span_listeners:
+            self._span_listeners.remove(listener)
     
     def run(self, task: Task) -> TaskResult:
         """Run a task."""
-        self.status = "running"
         self.current_task = task
+        self.status = "running"
+        # Each run gets its own context: with per_agent_concurrency > 1 the
+        # same agent runs several tasks at once.
+        context = ConversationContext(self.context_budget)
+        context.add("user", task.description)
+        context.render(self.system_messages())
         
         # Simulate task execution
+        output = f"Agent {self.name} completed: {task.description}"
+        context.add("assistant", output)
         result = TaskResult(
             task_id=task.id,
             agent_id=self.id,
             success=True,
-            output=f"Agent {self.name} completed: {task.description}",
+            output=output,
+            metadata=context.stats(),
         )
         
-        self.status = "idle"
         self.current_task = None
+        self.status = "idle"
         return result
     
+    async def run_async(self, task: Task) -> TaskResult:
+        """Run a task without blocking the event loop.
+
+        The default offloads :meth:`run` to a worker thread, which cannot be
+        interrupted: cancelling the call takes effect once :meth:`run`
+        returns (see :func:`wait_finished`). Agents backed by an async client
+        should override this with a native coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await wait_finished(loop.run_in_executor(None, ctx.run, self.run, task))
+    
+    def system_messages(self) -> list[dict[str, Any]]:
+        """Stable request prefix: the shared team prompt, then this agent's role.
+        
+        The prefix is identical on every turn, and its first message is
+        identical across a team, so the provider can serve it from cache.
+        """
+        messages = []
+        if self.shared_prefix:
+            messages.append({"role": "system", "content": self.shared_prefix})
+        tools = f" Tools: {', '.join(self.tools)}." if self.tools else ""
+        messages.append({"role": "system", "content": f"You are {self.name}, {self.role}.{tools}"})
+        return messages
+    
+    async def ask(self, content: str, **kwargs: Any) -> str:
+        """Add a user turn, send the managed context and record the reply."""
+        self.context.add("user", content)
+        response = await self.complete(self.context.render(self.system_messages()), **kwargs)
+        reply = response.choices[0].message.content or ""
+        self.context.add("assistant", reply)
+        return reply
+    
+    async def complete(self, messages: list[dict[str, Any]], **kwargs: Any) -> Any:
+        """Send a chat completion request for this agent's model.
+        
+        Uses the process-wide client pool, so agents on the same endpoint
+        share keep-alive connections, and waits on the process-wide rate
+        limiter first; queued calls are ordered by the current task's
+        priority and the token estimate is corrected from reported usage.
+        A ``metadata["model"]`` on the current task overrides :attr:`model`.
+        """
+        task = self.current_task
+        model = task.metadata.get("model", self.model) if task is not None else self.model
+        estimate = estimate_tokens(messages, kwargs.get("max_tokens") or 256)
+        priority = task.priority if task is not None else 0
+        reservation = await get_rate_limiter().acquire(model, estimate, priority)
+        client = get_client_pool().get(model, self.base_url)
+        start = time.perf_counter()
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            **kwargs,
+        )
+        usage = getattr(response, "usage", None)
+        tokens = usage.total_tokens if usage is not None and usage.total_tokens else 0
+        record_model_call(time.perf_counter() - start, tokens)
+        if tokens:
+            reservation.settle(tokens)
+        return response
+    
     def send_to(self, other: "Agent", content: str) -> None:
-        """Send message to another agent."""
+        """Send message to another agent.
+        
+        The message waits in the outbox until :meth:`flush_outbox`; a full
+        outbox raises :class:`MailboxFullError` so producers feel backpressure.
+        """
+        if self.outbox_size is not None and len(self.outbox) >= self.outbox_size:
+            raise MailboxFullError(f"outbox full ({self.outbox_size} messages)")
         msg = Message(
             from_agent=self.id,
             to_agent=other.id,
             content=content,
         )
+        self._peers[other.id] = other
         self.outbox.append(msg)
     
+    def flush_outbox(self) -> int:
+        """Deliver queued messages to their recipients' inboxes.
+        
+        Delivery is in send order and stops at the first recipient that is
+        full under the BLOCK policy, leaving the rest queued for a later
+        flush. Messages refused under REJECT, or addressed to agents that no
+        longer exist, are discarded. Returns the number delivered.
+        """
+        delivered = 0
+        while self.outbox:
+            msg = self.outbox[0]
+            target = self._peers.get(msg.to_agent)
+            if target is None or target.inbox.offer(msg):
+                delivered += target is not None
+            elif target.inbox.overflow is OverflowPolicy.BLOCK:
+                break
+            self.outbox.popleft()
+        return delivered
+    
+    async def send_async(self, other: "Agent", content: str) -> None:
+        """Deliver a message straight to another agent's inbox.
+        
+        Waits while the recipient's inbox is full under the BLOCK policy.
+        """
+        msg = Message(
+            from_agent=self.id,
+            to_agent=other.id,
+            content=content,
+        )
+        await other.inbox.put(msg)
+    
     def receive(self) -> Message | None:
         """Receive a message."""
-        if self.inbox:
-            return self.inbox.pop(0)
-        return None
+        return self.inbox.get_nowait()
+    
+    async def receive_async(self) -> Message:
+        """Receive a message, waiting until one arrives."""
+        return await self.inbox.get()
+    
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle configuration and identity only.
+        
+        Status, mailboxes and listeners belong to the local process and are
+        rebuilt fresh when an agent is shipped to a worker.
+        """
+        state = {f.name: getattr(self, f.name) for f in fields(self)}
+        state["id"] = self.id
+        return state
+    
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        agent_id = state.pop("id")
+        self.__dict__.update(state)
+        self.__post_init__()
+        self.id = agent_id
+    
+    def capabilities(self) -> set[str]:
+        """Capabilities tasks can require, as ``kind:value`` strings.
+        
+        One each for the role and model, one per tool and one per tag:
+        ``role:Reviewer``, ``model:deepseek-chat``, ``tool:grep``,
+        ``tag:python``.
+        """
+        return {
+            f"role:{self.role}",
+            f"model:{self.model}",
+            *(f"tool:{tool}" for tool in self.tools),
+            *(f"tag:{tag}" for tag in self.tags),
+        }
     
     def can_handle(self, task: Task) -> bool:
         """Check if agent can handle the task."""
-        return True
+        return not task.requires or self.capabilities().issuperset(task.requires)
     
     def __repr__(self) -> str:
         return f"Agent(name={self.name}, role={self.role}, status={self.status})"
+
+
+async def wait_finished(call: "asyncio.Future[TaskResult]") -> TaskResult:
+    """Await a call running on a thread or in a process.
+
+    Such calls cannot be interrupted, so cancelling the caller is held back
+    until the call returns: whoever cancelled it can rely on the agent being
+    free again once the cancellation has gone through.
+    """
+    cancelled = False
+    while not call.done():
+        try:
+            await asyncio.wait((call,))
+        except asyncio.CancelledError:
+            cancelled = True
+    if cancelled:
+        if not call.cancelled():
+            call.exception()  # retrieved, so a late failure is not logged
+        raise asyncio.CancelledError
+    return call.result()
@@ -0,0 +1,248 @@
+"""DeepSeek Code Agent - Task result cache."""
+
+import asyncio
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .agent import Agent
+from .task import Task, TaskResult
+
+
+class ResultCache:
+    """Content-addressed cache of successful task results.
+
+    Entries are keyed on a hash of the task description, the agent's model,
+    role and tools, and the caller's input fingerprint
+    (``task.metadata["fingerprint"]``, e.g. a commit or file digest), so a
+    hit is only served when the inputs are known to be unchanged.
+
+    Results live in an in-memory LRU of ``max_entries`` with a ``ttl`` in
+    seconds, optionally backed by a SQLite file at ``path`` that survives
+    restarts. Concurrent misses on the same key are coalesced: one caller
+    runs the task and the others await its result.
+
+    Only a result's task and agent ids, success, output and error are
+    stored; every lookup returns a fresh copy with empty metadata, so
+    spans, hedge flags and other annotations callers add to the result
+    they ran never leak into later hits, and both tiers agree.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float | None = 3600.0,
+        path: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: OrderedDict[str, tuple[float, TaskResult]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future[TaskResult]] = {}
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, expires REAL, payload BLOB)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(agent: Agent, task: Task) -> str:
+        """Content address for running ``task`` on ``agent``."""
+        material = json.dumps(
+            [
+                task.description,
+                agent.model,
+                agent.role,
+                sorted(agent.tools),
+                task.metadata.get("fingerprint"),
+            ],
+            default=str,
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str) -> TaskResult | None:
+        """Look up a live entry, checking memory before disk."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _stored(result)
+                del self._entries[key]
+            result = self._load(key, now)
+            if result is not None:
+                self.hits += 1
+                return _stored(result)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: TaskResult) -> None:
+        """Store a successful result; failures are never cached."""
+        if not result.success:
+            return
+        expires = self.clock() + self.ttl if self.ttl is not None else float("inf")
+        result = _stored(result)
+        with self._lock:
+            self._remember(key, expires, result)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                    (key, expires, pickle.dumps(result, pickle.HIGHEST_PROTOCOL)),
+                )
+                self._db.commit()
+
+    async def get_or_run(
+        self, key: str, run: Callable[[], Awaitable[TaskResult]]
+    ) -> TaskResult:
+        """Return the cached result for ``key``, running ``run`` on a miss.
+
+        The caller that ran gets ``run``'s own result; everyone else gets a
+        copy of what was stored.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        leader = self._in_flight.get(key)
+        if leader is not None:
+            self.coalesced += 1
+            return await asyncio.shield(leader)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await run()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Followers see the exception; don't warn if there are none.
+            future.exception()
+            raise
+        else:
+            self.put(key, result)
+            future.set_result(_stored(result))
+            return result
+        finally:
+            del self._in_flight[key]
+
+    async def run(
+        self, agent: Agent, task: Task, run: Callable[[], Awaitable[TaskResult]]
+    ) -> TaskResult:
+        """Run ``task`` on ``agent`` through the cache.
+
+        Results served from the cache or from another caller's execution
+        are re-addressed to ``task`` and marked ``metadata["cached"]``.
+        """
+        ran = False
+
+        async def tracked() -> TaskResult:
+            nonlocal ran
+            ran = True
+            return await run()
+
+        result = await self.get_or_run(self.key(agent, task), tracked)
+        return result if ran else _served(result, task)
+
+    def run_sync(self, agent: Agent, task: Task, run: Callable[[], TaskResult]) -> TaskResult:
+        """Blocking :meth:`run` for callers without an event loop.
+
+        Nothing is coalesced: a miss calls ``run()`` and stores its result.
+        """
+        key = self.key(agent, task)
+        cached = self.get(key)
+        if cached is not None:
+            return _served(cached, task)
+        result = run()
+        self.put(key, result)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, expires: float, result: TaskResult) -> None:
+        self._entries[key] = (expires, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str, now: float) -> TaskResult | None:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT expires, payload FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        expires, payload = row
+        if expires <= now:
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        result = pickle.loads(payload)
+        self._remember(key, expires, result)
+        return result
+
+
+def _stored(result: TaskResult) -> TaskResult:
+    """Copy of a result without its metadata, as the cache keeps it."""
+    return TaskResult(
+        task_id=result.task_id,
+        agent_id=result.agent_id,
+        success=result.success,
+        output=result.output,
+        error=result.error,
+    )
+
+
+def _served(result: TaskResult, task: Task) -> TaskResult:
+    """Copy of a stored result re-addressed to ``task`` and marked cached."""
+    return TaskResult(
+        task_id=task.id,
+        agent_id=result.agent_id,
+        success=result.success,
+        output=result.output,
+        error=result.error,
+        metadata={"cached": True},
+    )
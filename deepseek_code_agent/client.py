@@ -0,0 +1,154 @@
+"""DeepSeek Code Agent - Shared LLM client pool."""
+
+import asyncio
+import hashlib
+import os
+import sys
+import weakref
+from typing import Any
+
+DEFAULT_BASE_URL = "https://api.deepseek.com"
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class ClientPool:
+    """Pool of async chat clients shared by every agent in the process.
+
+    Clients are keyed by model, endpoint and a digest of the API key, so
+    callers with different credentials never share one. All clients on one
+    endpoint ride the same ``httpx.AsyncClient``, so TCP/TLS connections
+    are kept alive and reused instead of being opened per agent, and with
+    the ``h2`` package installed concurrent requests multiplex over HTTP/2.
+
+    HTTP connections belong to the event loop that opened them, so reuse
+    only happens within one loop: the pool keeps a separate set of clients
+    per running loop and closes them when the loop shuts down its async
+    generators, as ``asyncio.run`` does on exit; on loops without async
+    generator hooks, await :meth:`aclose` before closing the loop. The pool
+    never keeps a loop alive. ``TaskQueue.run`` and
+    ``Team.run`` start a loop per batch; callers that want connections kept
+    alive across batches should drive ``run_async`` on one long-lived loop.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 60.0,
+        http2: bool | None = None,
+    ) -> None:
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2
+        self._loops: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClients] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self, model: str, base_url: str | None = None, api_key: str | None = None) -> Any:
+        """Return the shared ``openai.AsyncOpenAI`` client for a model and endpoint.
+
+        ``base_url`` and ``api_key`` default to ``DEEPSEEK_BASE_URL`` and
+        ``DEEPSEEK_API_KEY``. Must be called from a running event loop.
+        """
+        from openai import AsyncOpenAI
+
+        base_url = base_url or os.environ.get("DEEPSEEK_BASE_URL", DEFAULT_BASE_URL)
+        api_key = api_key or os.environ.get("DEEPSEEK_API_KEY", "unset")
+        loop = asyncio.get_running_loop()
+        clients = self._loops.get(loop)
+        if clients is None:
+            clients = self._loops[loop] = _LoopClients(self, loop)
+            clients.close_on_shutdown()
+
+        key = (model, base_url, hashlib.sha256(api_key.encode()).hexdigest())
+        client = clients.chat.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                http_client=self._http_client(clients, base_url),
+            )
+            clients.chat[key] = client
+        return client
+
+    def _http_client(self, clients: "_LoopClients", base_url: str) -> Any:
+        import httpx
+
+        http = clients.http.get(base_url)
+        if http is None:
+            http = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+            clients.http[base_url] = http
+        return http
+
+    def __len__(self) -> int:
+        return sum(len(clients.chat) for clients in self._loops.values())
+
+    async def aclose(self) -> None:
+        """Close the connections opened on the current event loop."""
+        clients = self._loops.pop(asyncio.get_running_loop(), None)
+        if clients is not None:
+            await clients.aclose()
+
+
+class _LoopClients:
+    """Clients opened on one event loop, which is held weakly."""
+
+    def __init__(self, pool: ClientPool, loop: asyncio.AbstractEventLoop) -> None:
+        self.pool = pool
+        self.loop = weakref.ref(loop)
+        self.http: dict[str, Any] = {}
+        self.chat: dict[tuple[str, str, str], Any] = {}
+
+    def close_on_shutdown(self) -> None:
+        """Have the running loop's ``shutdown_asyncgens()`` await :meth:`aclose`.
+
+        Loops track async generators through the first-iteration hook and
+        close everything it registered with ``aclose()`` on shutdown, while
+        they still run. Only a weak reference is kept, so the pool's entry
+        keeps this object alive until then.
+        """
+        firstiter = sys.get_asyncgen_hooks().firstiter
+        if firstiter is not None:
+            firstiter(self)
+
+    async def aclose(self) -> None:
+        loop = self.loop()
+        if loop is not None and self.pool._loops.get(loop) is self:
+            del self.pool._loops[loop]
+        http, self.http, self.chat = self.http, {}, {}
+        for client in http.values():
+            await client.aclose()
+
+
+_default_pool: ClientPool | None = None
+
+
+def get_client_pool() -> ClientPool:
+    """Process-wide client pool used by agents."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = ClientPool()
+    return _default_pool
+
+
+def set_client_pool(pool: ClientPool) -> None:
+    """Replace the process-wide client pool, e.g. to tune limits."""
+    global _default_pool
+    _default_pool = pool
@@ -0,0 +1,236 @@
+"""DeepSeek Code Agent - Adaptive concurrency limit for model calls."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from .task import TaskResult
+
+OK = "ok"
+ERROR = "error"
+THROTTLED = "throttled"
+
+
+class Decision(NamedTuple):
+    """One adjustment of the limit, with the window statistics behind it."""
+
+    time: float
+    action: str
+    reason: str
+    previous: int
+    limit: int
+    p50: float
+    tail: float
+    error_rate: float
+    throttle_rate: float
+
+
+DecisionListener = Callable[["AdaptiveConcurrency", Decision], None]
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight calls, steered by latency, errors and throttling.
+
+    Callers :meth:`acquire` a slot before a call and :meth:`release` it with
+    the call's latency and outcome (``"ok"``, ``"error"`` or
+    ``"throttled"``; see :func:`classify`). Every ``window`` completions the
+    limit is reconsidered:
+
+    * any throttling, or an error rate over ``max_error_rate``, multiplies
+      it by ``backoff``;
+    * a ``percentile`` latency over ``tolerance`` times the baseline (the
+      lowest median seen, drifting slowly towards the current one) does the
+      same, since queueing at the provider shows up as latency before
+      errors;
+    * otherwise, if the limit was actually reached during the window, it
+      grows by the square root of the current limit, at least one;
+    * otherwise it holds.
+
+    A throttled call also cuts the limit at once when at least ``limit``
+    calls have completed since the last cut, so one burst of 429s counts
+    once. The limit stays within ``floor`` and ``ceiling``. Decisions are
+    kept in ``decisions`` and passed to listeners such as
+    :meth:`Monitor.watch`.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        floor: int = 1,
+        ceiling: int = 64,
+        window: int = 20,
+        percentile: float = 0.9,
+        tolerance: float = 2.0,
+        backoff: float = 0.7,
+        max_error_rate: float = 0.1,
+        name: str = "default",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 1 <= floor <= ceiling:
+            raise ValueError("need 1 <= floor <= ceiling")
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be in (0, 1)")
+        self.floor = floor
+        self.ceiling = ceiling
+        self.limit = min(max(initial, floor), ceiling)
+        self.window = window
+        self.percentile = percentile
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.max_error_rate = max_error_rate
+        self.name = name
+        self.clock = clock
+        self.in_flight = 0
+        self.baseline: float | None = None
+        self.decisions: deque[Decision] = deque(maxlen=256)
+        self._listeners: list[DecisionListener] = []
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._latencies: list[float] = []
+        self._errors = 0
+        self._throttled = 0
+        self._saturated = False
+        self._since_cut = 0
+
+    def add_listener(self, listener: DecisionListener) -> None:
+        """Call ``listener(limiter, decision)`` on every decision."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: DecisionListener) -> None:
+        """Stop notifying a decision listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting while ``limit`` calls are in flight."""
+        while self.in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+        self.in_flight += 1
+        if self.in_flight >= self.limit:
+            self._saturated = True
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free now, without queueing behind waiters."""
+        if self.in_flight >= self.limit or any(not w.done() for w in self._waiters):
+            return False
+        self.in_flight += 1
+        if self.in_flight >= self.limit:
+            self._saturated = True
+        return True
+
+    def release(self, latency: float | None = None, outcome: str = OK) -> None:
+        """Return a slot; ``latency=None`` records nothing (e.g. a cancelled call)."""
+        self.in_flight -= 1
+        if latency is not None:
+            self._observe(latency, outcome)
+        self._wake()
+
+    def stats(self) -> dict[str, Any]:
+        """Current limit, load and latency baseline."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": sum(not waiter.done() for waiter in self._waiters),
+            "baseline": self.baseline,
+            "decisions": len(self.decisions),
+        }
+
+    def _observe(self, latency: float, outcome: str) -> None:
+        self._since_cut += 1
+        if outcome == OK:
+            self._latencies.append(latency)
+        elif outcome == THROTTLED:
+            self._throttled += 1
+            if self._since_cut >= self.limit:
+                self._decide()
+                return
+        else:
+            self._errors += 1
+        if len(self._latencies) + self._errors + self._throttled >= self.window:
+            self._decide()
+
+    def _decide(self) -> None:
+        count = len(self._latencies) + self._errors + self._throttled
+        latencies = sorted(self._latencies)
+        p50 = _quantile(latencies, 0.5)
+        tail = _quantile(latencies, self.percentile)
+        error_rate = self._errors / count
+        throttle_rate = self._throttled / count
+        if latencies:
+            if self.baseline is None or p50 < self.baseline:
+                self.baseline = p50
+            else:
+                self.baseline += 0.05 * (p50 - self.baseline)
+
+        previous = self.limit
+        if self._throttled:
+            action, reason = "decrease", "throttled"
+        elif error_rate > self.max_error_rate:
+            action, reason = "decrease", "errors"
+        elif latencies and self.baseline and tail > self.tolerance * self.baseline:
+            action, reason = "decrease", "latency"
+        elif self._saturated:
+            action, reason = "increase", "saturated"
+        else:
+            action, reason = "hold", "underused"
+        if action == "decrease":
+            self.limit = max(self.floor, min(previous - 1, math.floor(previous * self.backoff)))
+            self._since_cut = 0
+        elif action == "increase":
+            self.limit = min(self.ceiling, previous + max(1, math.isqrt(previous)))
+        if self.limit == previous and action != "hold":
+            action = "hold"
+
+        decision = Decision(
+            self.clock(), action, reason, previous, self.limit,
+            p50, tail, error_rate, throttle_rate,
+        )
+        self.decisions.append(decision)
+        self._latencies = []
+        self._errors = self._throttled = 0
+        self._saturated = self.in_flight >= self.limit
+        for listener in self._listeners:
+            listener(self, decision)
+        self._wake()
+
+    def _wake(self) -> None:
+        free = self.limit - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+def classify(result: TaskResult | None = None, error: BaseException | None = None) -> str:
+    """Outcome of a call for :meth:`AdaptiveConcurrency.release`.
+
+    HTTP 429s (an exception with ``status_code == 429``, or a failed
+    result whose error mentions 429 or a rate limit) are ``"throttled"``;
+    other exceptions and failures are ``"error"``.
+    """
+    if error is not None:
+        if getattr(error, "status_code", None) == 429 or "RateLimit" in type(error).__name__:
+            return THROTTLED
+        return ERROR
+    if result is None or result.success:
+        return OK
+    message = (result.error or "").lower()
+    return THROTTLED if "429" in message or "rate limit" in message else ERROR
+
+
+def _quantile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
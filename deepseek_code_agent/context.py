@@ -0,0 +1,171 @@
+"""DeepSeek Code Agent - Conversation context management."""
+
+import hashlib
+from collections.abc import Callable
+from typing import Any
+
+Summarizer = Callable[[str, list[dict[str, Any]]], str]
+
+
+def message_tokens(message: dict[str, Any]) -> int:
+    """Rough token count of one chat message: ~4 characters per token."""
+    return len(str(message.get("content") or "")) // 4 + 4
+
+
+def extractive_summary(summary: str, turns: list[dict[str, Any]], width: int = 160) -> str:
+    """Default summarizer: append the first line of each folded turn."""
+    lines = [summary] if summary else []
+    for turn in turns:
+        text = str(turn.get("content") or "").strip().split("\n", 1)[0]
+        if len(text) > width:
+            text = text[: width - 3] + "..."
+        lines.append(f"{turn['role']}: {text}")
+    return "\n".join(lines)
+
+
+class ConversationContext:
+    """Token-budgeted conversation history for one agent.
+
+    :meth:`render` lays a request out as the caller's stable prefix
+    (system/role messages, identical on every turn and, within a
+    :class:`Team`, shared by every member), then a running summary of
+    older turns, then the recent turns verbatim. Keeping the prefix
+    byte-identical lets the provider's context cache serve it.
+
+    When a render would exceed ``budget`` tokens, the oldest turns are
+    folded into the summary with ``summarize`` until the request is back
+    under ``low_water`` of the budget, so compaction happens in occasional
+    batches rather than on every turn. The newest ``keep_recent`` turns are
+    never folded, and the summary is capped at a quarter of the budget by
+    dropping its oldest lines; a prefix plus recent turns larger than the
+    budget is still sent whole. Tool outputs identical to an earlier one
+    still in the window are replaced by a short back-reference; when the
+    original is folded, the first back-reference to it gets the output back.
+    """
+
+    def __init__(
+        self,
+        budget: int = 32_000,
+        keep_recent: int = 6,
+        low_water: float = 0.75,
+        summarize: Summarizer = extractive_summary,
+    ) -> None:
+        if budget <= 0:
+            raise ValueError("budget must be positive")
+        self.budget = budget
+        self.keep_recent = keep_recent
+        self.low_water = low_water
+        self.summarize = summarize
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget the conversation and its statistics."""
+        self.summary = ""
+        self.turns: list[dict[str, Any]] = []
+        self.folded = 0
+        self.deduplicated = 0
+        self.turn_tokens: list[int] = []
+        self.reused_tokens: list[int] = []
+        self._tool_outputs: dict[str, int] = {}
+        self._tool_calls = 0
+        self._folded_calls = 0
+        self._last: list[dict[str, Any]] = []
+
+    def add(self, role: str, content: str, **fields: Any) -> dict[str, Any]:
+        """Append a turn; extra ``fields`` (e.g. ``tool_call_id``) are kept."""
+        if role == "tool":
+            self._tool_calls += 1
+            digest = hashlib.sha1(content.encode()).hexdigest()
+            first = self._tool_outputs.setdefault(digest, self._tool_calls)
+            if first != self._tool_calls:
+                content = f"[same output as tool call #{first}]"
+                self.deduplicated += 1
+        message = {"role": role, "content": content, **fields}
+        self.turns.append(message)
+        return message
+
+    def render(self, prefix: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Build the messages for the next request and record its size."""
+        prefix_tokens = sum(message_tokens(m) for m in prefix)
+        if self._tokens(prefix_tokens) > self.budget:
+            self._compact(prefix_tokens)
+
+        messages = list(prefix)
+        if self.summary:
+            messages.append(
+                {"role": "system", "content": f"Summary of earlier conversation:\n{self.summary}"}
+            )
+        messages.extend(self.turns)
+
+        reused = 0
+        for sent, previous in zip(messages, self._last):
+            if sent != previous:
+                break
+            reused += message_tokens(sent)
+        self.turn_tokens.append(sum(message_tokens(m) for m in messages))
+        self.reused_tokens.append(reused)
+        self._last = messages
+        return messages
+
+    def stats(self) -> dict[str, Any]:
+        """Per-turn tokens sent and the share of them that repeated the last prefix."""
+        sent = sum(self.turn_tokens)
+        return {
+            "turn_tokens": list(self.turn_tokens),
+            "prefix_reuse": sum(self.reused_tokens) / sent if sent else 0.0,
+            "folded_turns": self.folded,
+            "deduplicated_tool_outputs": self.deduplicated,
+        }
+
+    def _tokens(self, prefix_tokens: int) -> int:
+        summary = message_tokens({"content": self.summary}) + 8 if self.summary else 0
+        return prefix_tokens + summary + sum(message_tokens(m) for m in self.turns)
+
+    def _compact(self, prefix_tokens: int) -> None:
+        target = self.budget * self.low_water
+        cut = 0
+        foldable = len(self.turns) - self.keep_recent
+        remaining = self._tokens(prefix_tokens)
+        while cut < foldable and remaining > target:
+            remaining -= message_tokens(self.turns[cut])
+            cut += 1
+        # Tool results must not be separated from the call that produced them.
+        while 0 < cut < len(self.turns) and self.turns[cut]["role"] == "tool":
+            cut -= 1
+        if cut:
+            summary = self.summarize(self.summary, self.turns[:cut])
+            limit = self.budget // 4 * 4
+            if len(summary) > limit:
+                summary = summary[-limit:].partition("\n")[2]
+            self.summary = summary
+            self._fold_tool_outputs(self.turns[:cut])
+            del self.turns[:cut]
+            self.folded += cut
+
+    def _fold_tool_outputs(self, folded: list[dict[str, Any]]) -> None:
+        # Outputs leaving the window can no longer be referred back to.
+        outputs = {}
+        for turn in folded:
+            if turn["role"] == "tool":
+                self._folded_calls += 1
+                outputs[f"[same output as tool call #{self._folded_calls}]"] = turn["content"]
+        self._tool_outputs = {
+            digest: call for digest, call in self._tool_outputs.items()
+            if call > self._folded_calls
+        }
+        call = self._folded_calls
+        for index in range(len(folded), len(self.turns)):
+            turn = self.turns[index]
+            if turn["role"] != "tool":
+                continue
+            call += 1
+            content = outputs.get(turn["content"])
+            if content is None:
+                continue
+            digest = hashlib.sha1(content.encode()).hexdigest()
+            first = self._tool_outputs.setdefault(digest, call)
+            if first == call:
+                self.deduplicated -= 1
+            else:
+                content = f"[same output as tool call #{first}]"
+            self.turns[index] = {**turn, "content": content}
@@ -0,0 +1,383 @@
+"""DeepSeek Code Agent - Coordinator/worker protocol over sockets."""
+
+import asyncio
+import hashlib
+import hmac
+import pickle
+import secrets
+import struct
+import time
+from collections.abc import AsyncIterator, Iterable
+from contextlib import aclosing
+from typing import Any
+
+from .agent import Agent
+from .executors import Executor, make_executor
+from .ids import new_id
+from .pool import AgentPool
+from .scheduler import PriorityScheduler
+from .task import Task, TaskResult
+from .tracing import task_span
+
+Address = tuple[str, int] | str
+
+_HEADER = struct.Struct("!I")
+MAX_FRAME = 64 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """Raised when a peer fails authentication or sends a malformed frame."""
+
+
+class Coordinator:
+    """Hand tasks out to remote :class:`Worker` processes and collect results.
+
+    Listens on a TCP ``(host, port)`` or a Unix socket path. Workers
+    announce how many tasks they can hold (their credits); the coordinator
+    sends tasks in batches of up to ``batch_size`` without exceeding a
+    worker's credits, and every result returned frees one credit, so a slow
+    worker is never flooded. Tasks go out highest priority first.
+
+    Workers heartbeat while connected. One that disconnects, or stays
+    silent for ``heartbeat_timeout`` seconds, is dropped and its
+    outstanding tasks go back to the queue for other workers. The
+    coordinator heartbeats back four times per ``heartbeat_timeout``, so
+    workers can tell when it is gone.
+
+    Frames are pickles, so peers must be trusted: both sides prove
+    knowledge of ``authkey`` with an HMAC challenge before anything is
+    unpickled. A random key is generated when none is given.
+    """
+
+    def __init__(
+        self,
+        address: Address = ("127.0.0.1", 0),
+        tasks: Iterable[Task] = (),
+        batch_size: int = 16,
+        heartbeat_timeout: float = 10.0,
+        authkey: bytes | None = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.address = address
+        self.batch_size = batch_size
+        self.heartbeat_timeout = heartbeat_timeout
+        self.authkey = authkey if authkey is not None else secrets.token_bytes(32)
+        self.tasks: list[Task] = []
+        self.lost_workers = 0
+        self._scheduler = PriorityScheduler()
+        self._workers: dict[str, _RemoteWorker] = {}
+        self._finished: asyncio.Queue[tuple[int, TaskResult]] | None = None
+        self._server: asyncio.Server | None = None
+        self._watchdog: asyncio.Task[None] | None = None
+        self._remaining = 0
+        for task in tasks:
+            self.add_task(task)
+
+    async def start(self) -> None:
+        """Start listening; ``address`` is updated with the bound port."""
+        if self._server is not None:
+            return
+        self._finished = asyncio.Queue()
+        if isinstance(self.address, str):
+            self._server = await asyncio.start_unix_server(self._serve, self.address)
+        else:
+            host, port = self.address
+            self._server = await asyncio.start_server(self._serve, host, port)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        self._watchdog = asyncio.create_task(self._watch())
+
+    async def close(self) -> None:
+        """Tell workers to exit and stop listening."""
+        for worker in list(self._workers.values()):
+            worker.send(("shutdown", None))
+            worker.writer.close()
+        self._workers.clear()
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "Coordinator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    def add_task(self, task: Task) -> None:
+        """Queue a task for the next worker with spare credits."""
+        self._scheduler.push((len(self.tasks), task), task.priority)
+        self.tasks.append(task)
+        self._remaining += 1
+        self._dispatch()
+
+    async def aiter_results(self) -> AsyncIterator[TaskResult]:
+        """Yield results in completion order until every queued task is done."""
+        async for _, result in self._stream():
+            yield result
+
+    async def run_async(self) -> list[TaskResult]:
+        """Wait for every queued task, returning results in submission order."""
+        async with aclosing(self._stream()) as stream:
+            results = {index: result async for index, result in stream}
+        return [results[index] for index in sorted(results)]
+
+    def workers(self) -> dict[str, dict[str, Any]]:
+        """Connected workers with their free credits and outstanding tasks."""
+        return {
+            worker_id: {"credits": worker.credits, "outstanding": len(worker.outstanding)}
+            for worker_id, worker in self._workers.items()
+        }
+
+    async def _stream(self) -> AsyncIterator[tuple[int, TaskResult]]:
+        await self.start()
+        try:
+            while self._remaining:
+                item = await self._finished.get()
+                self._remaining -= 1
+                yield item
+        finally:
+            if not self._remaining:
+                self.tasks = []
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        worker: _RemoteWorker | None = None
+        try:
+            nonce = secrets.token_bytes(32)
+            writer.write(nonce)
+            reply = await reader.readexactly(64)
+            if not hmac.compare_digest(reply[:32], _sign(self.authkey, nonce)):
+                raise ProtocolError("worker failed authentication")
+            writer.write(_sign(self.authkey, reply[32:]))
+
+            kind, hello = await _read_frame(reader)
+            if kind != "hello":
+                raise ProtocolError(f"expected hello, got {kind!r}")
+            try:
+                worker_id, credits = hello
+            except (TypeError, ValueError) as exc:
+                raise ProtocolError(f"malformed hello: {exc}") from exc
+            if not isinstance(worker_id, str) or not isinstance(credits, int) or credits < 1:
+                raise ProtocolError(f"malformed hello: {hello!r}")
+            # A worker reconnecting under its old id replaces the old
+            # connection, whose tasks go back to the queue.
+            previous = self._workers.get(worker_id)
+            if previous is not None:
+                self._drop(worker_id, previous)
+            worker = self._workers[worker_id] = _RemoteWorker(writer, credits)
+            self._dispatch()
+            while True:
+                kind, payload = await _read_frame(reader)
+                worker.last_seen = time.monotonic()
+                if kind == "result":
+                    if not isinstance(payload, TaskResult):
+                        raise ProtocolError(f"expected a TaskResult, got {type(payload).__name__}")
+                    entry = worker.outstanding.pop(payload.task_id, None)
+                    if entry is not None:
+                        worker.credits += 1
+                        self._finished.put_nowait((entry[0], payload))
+                        self._dispatch()
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError):
+            pass
+        finally:
+            if worker is not None:
+                self._drop(worker_id, worker)
+            writer.close()
+
+    def _dispatch(self) -> None:
+        """Send queued tasks to workers with spare credits, in batches."""
+        progress = True
+        while self._scheduler and progress:
+            progress = False
+            for worker in self._workers.values():
+                if not self._scheduler:
+                    break
+                if not worker.credits:
+                    continue
+                batch = []
+                while self._scheduler and len(batch) < min(worker.credits, self.batch_size):
+                    index, task = self._scheduler.pop()
+                    worker.outstanding[task.id] = (index, task)
+                    batch.append(task)
+                worker.credits -= len(batch)
+                worker.send(("tasks", batch))
+                progress = True
+
+    def _drop(self, worker_id: str, worker: "_RemoteWorker") -> None:
+        """Forget a worker and requeue whatever it had not finished."""
+        if self._workers.get(worker_id) is not worker:
+            return
+        del self._workers[worker_id]
+        self.lost_workers += bool(worker.outstanding)
+        for index, task in worker.outstanding.values():
+            self._scheduler.push((index, task), task.priority)
+        worker.outstanding.clear()
+        worker.writer.close()
+        self._dispatch()
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_timeout / 4)
+            deadline = time.monotonic() - self.heartbeat_timeout
+            for worker_id, worker in list(self._workers.items()):
+                if worker.last_seen < deadline:
+                    self._drop(worker_id, worker)
+                else:
+                    worker.send(("heartbeat", None))
+
+
+class _RemoteWorker:
+    """Coordinator-side view of one connected worker."""
+
+    def __init__(self, writer: asyncio.StreamWriter, credits: int) -> None:
+        self.writer = writer
+        self.credits = credits
+        self.outstanding: dict[str, tuple[int, Task]] = {}
+        self.last_seen = time.monotonic()
+
+    def send(self, message: tuple[str, Any]) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(_frame(message))
+
+
+class Worker:
+    """Host agents for a :class:`Coordinator` and run the tasks it sends.
+
+    Tasks are spread over the local agents through an agent pool and run on
+    ``executor``, as in :class:`TaskQueue`; each result is sent back as soon
+    as it is ready. ``capacity`` (default two per agent) is the number of
+    tasks the worker accepts at once, so a few are always queued locally
+    while the rest run.
+
+    The worker gives up and returns when nothing, not even a heartbeat,
+    arrives from the coordinator for ``timeout`` seconds, so a coordinator
+    that dies without closing the connection does not leave it hanging.
+    Keep ``timeout`` well above the coordinator's ``heartbeat_timeout / 4``.
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        agents: list[Agent],
+        authkey: bytes,
+        capacity: int | None = None,
+        heartbeat: float = 1.0,
+        executor: Executor | str | None = None,
+        timeout: float = 30.0,
+    ) -> None:
+        if not agents:
+            raise ValueError("a worker needs at least one agent")
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+        self.address = address
+        self.agents = agents
+        self.authkey = authkey
+        self.capacity = capacity or 2 * len(agents)
+        self.heartbeat = heartbeat
+        self.timeout = timeout
+        self.id = new_id("worker")
+        self.completed = 0
+        self._executor = make_executor(executor, len(agents))
+
+    async def run(self) -> None:
+        """Serve the coordinator until it shuts down or disconnects."""
+        if isinstance(self.address, str):
+            reader, writer = await asyncio.open_unix_connection(self.address)
+        else:
+            reader, writer = await asyncio.open_connection(*self.address)
+        pool = AgentPool(self.agents)
+        running: set[asyncio.Task[None]] = set()
+
+        async def send(message: tuple[str, Any]) -> None:
+            # A lost connection is noticed by the read loop, which ends the run.
+            try:
+                writer.write(_frame(message))
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+        async def execute(task: Task) -> None:
+            agent = await pool.checkout()
+            start = time.perf_counter()
+            try:
+                with task_span(agent, task) as span:
+                    try:
+                        result = await self._executor.submit(agent, task)
+                    except Exception as exc:
+                        result = TaskResult(
+                            task_id=task.id,
+                            agent_id=agent.id,
+                            success=False,
+                            output="",
+                            error=str(exc),
+                        )
+            finally:
+                pool.release(agent, time.perf_counter() - start)
+            self.completed += 1
+            await send(("result", span.attach(result)))
+
+        async def beat() -> None:
+            while True:
+                await asyncio.sleep(self.heartbeat)
+                await send(("heartbeat", None))
+
+        heartbeats = None
+        try:
+            nonce = await asyncio.wait_for(reader.readexactly(32), self.timeout)
+            challenge = secrets.token_bytes(32)
+            writer.write(_sign(self.authkey, nonce) + challenge)
+            proof = await asyncio.wait_for(reader.readexactly(32), self.timeout)
+            if not hmac.compare_digest(proof, _sign(self.authkey, challenge)):
+                raise ProtocolError("coordinator failed authentication")
+            await send(("hello", (self.id, self.capacity)))
+            heartbeats = asyncio.create_task(beat())
+            while True:
+                kind, payload = await asyncio.wait_for(_read_frame(reader), self.timeout)
+                if kind == "shutdown":
+                    return
+                if kind == "tasks":
+                    for task in payload:
+                        job = asyncio.create_task(execute(task))
+                        running.add(job)
+                        job.add_done_callback(running.discard)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.TimeoutError):
+            return
+        finally:
+            for job in (*running, *([heartbeats] if heartbeats else [])):
+                job.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            writer.close()
+            self._executor.shutdown()
+
+
+def run_worker(address: Address, agents: list[Agent], authkey: bytes, **kwargs: Any) -> None:
+    """Run a :class:`Worker` to completion; a convenient process target."""
+    asyncio.run(Worker(address, agents, authkey, **kwargs).run())
+
+
+def _sign(key: bytes, nonce: bytes) -> bytes:
+    return hmac.new(key, nonce, hashlib.sha256).digest()
+
+
+def _frame(message: tuple[str, Any]) -> bytes:
+    payload = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    return _HEADER.pack(len(payload)) + payload
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> tuple[str, Any]:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if size > MAX_FRAME:
+        raise ProtocolError(f"frame of {size} bytes exceeds {MAX_FRAME}")
+    payload = await reader.readexactly(size)
+    try:
+        message = pickle.loads(payload)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError,
+            IndexError, TypeError, ValueError) as exc:
+        raise ProtocolError(f"malformed frame: {exc}") from exc
+    if not (isinstance(message, tuple) and len(message) == 2 and isinstance(message[0], str)):
+        raise ProtocolError(f"malformed frame: {type(message).__name__}")
+    return message
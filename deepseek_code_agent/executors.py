@@ -0,0 +1,136 @@
+"""DeepSeek Code Agent - Execution backends."""
+
+import abc
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .agent import Agent, wait_finished
+from .task import Task, TaskResult
+
+
+class Executor(abc.ABC):
+    """Backend that runs an agent's task on behalf of a TaskQueue or Team."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def submit(self, agent: Agent, task: Task) -> TaskResult:
+        """Run ``task`` on ``agent`` and return its result."""
+
+    def shutdown(self) -> None:
+        """Release any workers held by the backend."""
+
+
+class AsyncExecutor(Executor):
+    """Await the agent's own :meth:`Agent.run_async` on the event loop.
+
+    This is the default: async-native agents run as coroutines, and the base
+    agent offloads to the loop's default thread pool.
+    """
+
+    name = "async"
+
+    async def submit(self, agent: Agent, task: Task) -> TaskResult:
+        return await agent.run_async(task)
+
+
+class InlineExecutor(Executor):
+    """Call :meth:`Agent.run` directly on the event loop thread.
+
+    Tasks run strictly one at a time; useful for debugging and deterministic
+    tests.
+    """
+
+    name = "inline"
+
+    async def submit(self, agent: Agent, task: Task) -> TaskResult:
+        return agent.run(task)
+
+
+class ThreadExecutor(Executor):
+    """Run :meth:`Agent.run` on a dedicated thread pool.
+
+    Suits agents that block on I/O; CPU-bound work still contends for the
+    GIL. The call runs in a copy of the caller's context, so the task's span
+    sees its model and tool calls. A cancelled call finishes before the
+    cancellation goes through; see :func:`~.agent.wait_finished`.
+    """
+
+    name = "thread"
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="agent")
+
+    async def submit(self, agent: Agent, task: Task) -> TaskResult:
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await wait_finished(loop.run_in_executor(self._pool, ctx.run, agent.run, task))
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+class ProcessExecutor(Executor):
+    """Run :meth:`Agent.run` in a pool of worker processes.
+
+    Workers are long-lived and reused across tasks and batches; call
+    :meth:`warm` to start them all before the first batch. The agent and task
+    are pickled per call (agents ship configuration only), so agent classes
+    must be importable by the workers. Status changes made inside the worker
+    are mirrored on the parent's agent for the duration of the call, which,
+    as with threads, runs to the end even if cancelled.
+    """
+
+    name = "process"
+
+    def __init__(self, max_workers: int | None = None, start_method: str | None = "spawn") -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        context = multiprocessing.get_context(start_method)
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def warm(self) -> None:
+        """Start every worker process now rather than on first use."""
+        futures = [self._pool.submit(time.sleep, 0.05) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    async def submit(self, agent: Agent, task: Task) -> TaskResult:
+        loop = asyncio.get_running_loop()
+        agent.current_task = task
+        agent.status = "running"
+        try:
+            return await wait_finished(
+                loop.run_in_executor(self._pool, _run_in_worker, agent, task)
+            )
+        finally:
+            agent.current_task = None
+            agent.status = "idle"
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+def _run_in_worker(agent: Agent, task: Task) -> TaskResult:
+    return agent.run(task)
+
+
+EXECUTORS: dict[str, type[Executor]] = {
+    cls.name: cls for cls in (AsyncExecutor, InlineExecutor, ThreadExecutor, ProcessExecutor)
+}
+
+
+def make_executor(backend: "Executor | str | None", max_workers: int | None = None) -> Executor:
+    """Resolve an executor instance, backend name, or ``None`` (async)."""
+    if isinstance(backend, Executor):
+        return backend
+    cls = EXECUTORS.get(backend or "async")
+    if cls is None:
+        raise ValueError(f"unknown executor {backend!r}; expected one of {sorted(EXECUTORS)}")
+    if cls in (ThreadExecutor, ProcessExecutor):
+        return cls(max_workers=max_workers)
+    return cls()
@@ -0,0 +1,111 @@
+"""DeepSeek Code Agent - Task graph execution."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from .task import Task, TaskResult
+
+Decomposer = Callable[[Task], list[Task]]
+LeafRunner = Callable[[Task], Awaitable[TaskResult]]
+Reducer = Callable[[Task, list[TaskResult]], TaskResult]
+
+
+class TaskGraphExecutor:
+    """Run a decomposable task as a concurrent tree of subtasks.
+
+    A task with ``decompose`` set is split by ``decompose`` until its
+    ``depth`` reaches ``max_depth``; the remaining leaves go to ``run_leaf``.
+    Siblings may name each other in ``depends_on``: a subtask starts only
+    after its dependencies finish, and is failed without running if any of
+    them failed. Independent siblings run concurrently, so the leaf runner
+    is what bounds parallelism. Each parent's result is built by ``reduce``
+    from its children's results, in decomposition order. ``on_result`` is
+    called with every node's result as it completes.
+    """
+
+    def __init__(
+        self,
+        decompose: Decomposer,
+        run_leaf: LeafRunner,
+        reduce: Reducer,
+        on_result: Callable[[TaskResult], None] | None = None,
+    ) -> None:
+        self.decompose = decompose
+        self.run_leaf = run_leaf
+        self.reduce = reduce
+        self.on_result = on_result
+
+    async def run(self, task: Task) -> TaskResult:
+        """Execute ``task`` and everything it decomposes into."""
+        result = await self._run_node(task)
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
+
+    async def _run_node(self, task: Task) -> TaskResult:
+        if not task.decompose or task.depth >= task.max_depth:
+            return await self.run_leaf(task)
+
+        subtasks = self.decompose(task)
+        for subtask in subtasks:
+            subtask.depth = task.depth + 1
+        _check_dependencies(subtasks)
+
+        pending: dict[str, asyncio.Task[TaskResult]] = {}
+        for subtask in _topological_order(subtasks):
+            deps = [pending[dep] for dep in subtask.depends_on]
+            pending[subtask.id] = asyncio.create_task(self._run_after(subtask, deps))
+        try:
+            results = await asyncio.gather(*(pending[s.id] for s in subtasks))
+        except BaseException:
+            for child in pending.values():
+                child.cancel()
+            raise
+        return self.reduce(task, list(results))
+
+    async def _run_after(self, task: Task, deps: list[asyncio.Task[TaskResult]]) -> TaskResult:
+        for dep_id, dep in zip(task.depends_on, deps):
+            if not (await dep).success:
+                skipped = TaskResult(
+                    task_id=task.id,
+                    agent_id="",
+                    success=False,
+                    output="",
+                    error=f"dependency {dep_id} failed",
+                )
+                if self.on_result is not None:
+                    self.on_result(skipped)
+                return skipped
+        return await self.run(task)
+
+
+def _check_dependencies(subtasks: list[Task]) -> None:
+    """Reject dependencies on non-siblings."""
+    ids = {subtask.id for subtask in subtasks}
+    for subtask in subtasks:
+        unknown = [dep for dep in subtask.depends_on if dep not in ids]
+        if unknown:
+            raise ValueError(f"{subtask.id} depends on unknown subtasks {unknown}")
+
+
+def _topological_order(subtasks: list[Task]) -> list[Task]:
+    """Order siblings so every task follows its dependencies."""
+    by_id = {subtask.id: subtask for subtask in subtasks}
+    waiting = {subtask.id: len(set(subtask.depends_on)) for subtask in subtasks}
+    dependents: dict[str, list[str]] = {subtask.id: [] for subtask in subtasks}
+    for subtask in subtasks:
+        for dep in set(subtask.depends_on):
+            dependents[dep].append(subtask.id)
+
+    ready = [subtask.id for subtask in subtasks if not waiting[subtask.id]]
+    order = []
+    while ready:
+        task_id = ready.pop()
+        order.append(by_id[task_id])
+        for dependent in dependents[task_id]:
+            waiting[dependent] -= 1
+            if not waiting[dependent]:
+                ready.append(dependent)
+    if len(order) != len(subtasks):
+        raise ValueError("subtask dependencies contain a cycle")
+    return order
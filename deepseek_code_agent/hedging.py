@@ -0,0 +1,228 @@
+"""DeepSeek Code Agent - Hedged execution of slow tasks."""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+from .agent import Agent
+from .concurrency import AdaptiveConcurrency, classify
+from .pool import AgentPool
+from .task import Task, TaskResult
+
+Submit = Callable[[Agent, Task], Awaitable[TaskResult]]
+
+
+class Hedger:
+    """Launch a backup attempt for tasks that run past the latency tail.
+
+    Every task run through :meth:`run` adds its latency to a rolling
+    ``window``; once ``min_samples`` are in, the ``percentile`` of that
+    window is the hedging threshold. A task with ``hedge=True`` still
+    running at the threshold gets a duplicate on another idle agent from
+    the pool. The backup may use the next of the task's ``strategies``
+    (``metadata["strategy"]``) and the first of ``models`` that differs
+    from the primary agent's (``metadata["model"]``). The first successful
+    result wins and the other attempt is cancelled; if both fail, the
+    primary's failure is returned.
+
+    Backups are capped at ``budget`` times the number of tasks seen, so at
+    most that fraction of extra calls is spent. A loser running on a thread
+    or in a process cannot be interrupted: its agent stays checked out of
+    the pool until the call returns, so it is not handed a second task
+    meanwhile. With a ``limiter``, a backup also needs a free slot of its
+    own, held until it finishes.
+
+    :meth:`stats` reports hedges launched, won and refused by the budget,
+    and ``saved_seconds``: for each hedge win, the mean latency of window
+    samples longer than the primary had run, minus that time — an
+    estimate of how much longer the cancelled primary would have taken.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        budget: float = 0.1,
+        window: int = 256,
+        min_samples: int = 20,
+        models: Sequence[str] = (),
+    ) -> None:
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be in (0, 1)")
+        if budget < 0:
+            raise ValueError("budget must be non-negative")
+        if min_samples < 1 or window < min_samples:
+            raise ValueError("window must hold at least min_samples >= 1 samples")
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.models = list(models)
+        self.tasks = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.denied = 0
+        self.saved_seconds = 0.0
+        self._samples: deque[float] = deque(maxlen=window)
+        self._sorted: list[float] | None = None
+
+    def threshold(self) -> float | None:
+        """Current hedging delay in seconds, or ``None`` while still learning."""
+        if len(self._samples) < self.min_samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        return self._sorted[min(int(self.percentile * len(self._sorted)), len(self._sorted) - 1)]
+
+    def observe(self, latency: float) -> None:
+        """Add a completed attempt's latency to the window."""
+        self._samples.append(latency)
+        self._sorted = None
+
+    async def run(
+        self,
+        agent: Agent,
+        task: Task,
+        submit: Submit,
+        pool: AgentPool,
+        limiter: AdaptiveConcurrency | None = None,
+    ) -> TaskResult:
+        """Run ``task`` on ``agent`` with ``submit``, hedging onto ``pool`` if slow."""
+        self.tasks += 1
+        start = time.perf_counter()
+        delay = self.threshold() if task.hedge else None
+        if delay is None:
+            result = await submit(agent, task)
+            self.observe(time.perf_counter() - start)
+            return result
+
+        primary = asyncio.ensure_future(submit(agent, task))
+        try:
+            done, _ = await asyncio.wait((primary,), timeout=delay)
+            if done:
+                self.observe(time.perf_counter() - start)
+                return primary.result()
+            if self.hedged >= self.budget * self.tasks:
+                self.denied += 1
+                result = await primary
+                self.observe(time.perf_counter() - start)
+                return result
+            backup_agent = pool.try_checkout()
+            if backup_agent is not None and limiter is not None and not limiter.try_acquire():
+                pool.release(backup_agent)
+                backup_agent = None
+            if backup_agent is None:
+                result = await primary
+                self.observe(time.perf_counter() - start)
+                return result
+        except BaseException:
+            _abandon(primary, agent, pool)
+            raise
+
+        self.hedged += 1
+        launched = time.perf_counter()
+        backup = asyncio.ensure_future(submit(backup_agent, self.variant(agent, task)))
+        backup.add_done_callback(
+            lambda attempt: pool.release(backup_agent, time.perf_counter() - launched)
+        )
+        if limiter is not None:
+            backup.add_done_callback(lambda attempt: _settle(limiter, attempt, launched))
+        try:
+            return await self._race(primary, backup, start, launched)
+        finally:
+            _abandon(primary, agent, pool)
+            backup.cancel()
+            backup.add_done_callback(_retrieve)
+
+    async def _race(
+        self,
+        primary: asyncio.Future[TaskResult],
+        backup: asyncio.Future[TaskResult],
+        start: float,
+        launched: float,
+    ) -> TaskResult:
+        """First successful result of the two attempts."""
+        pending: set[asyncio.Future[TaskResult]] = {primary, backup}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            now = time.perf_counter()
+            # Check the primary first so a tie goes to it.
+            for attempt in sorted(done, key=lambda attempt: attempt is not primary):
+                if attempt.exception() is not None or not attempt.result().success:
+                    continue
+                result = attempt.result()
+                result.metadata["hedged"] = True
+                if attempt is primary:
+                    self.observe(now - start)
+                    return result
+                self.observe(now - launched)
+                self.hedge_wins += 1
+                self.saved_seconds += self._remaining(now - start)
+                result.metadata["hedge_won"] = True
+                return result
+        return primary.result()
+
+    def _remaining(self, elapsed: float) -> float:
+        """Expected further latency of an attempt that has run ``elapsed`` seconds."""
+        longer = [sample for sample in self._samples if sample > elapsed]
+        return sum(longer) / len(longer) - elapsed if longer else 0.0
+
+    def variant(self, agent: Agent, task: Task) -> Task:
+        """Backup copy of ``task``, switching strategy and model where possible."""
+        metadata = dict(task._metadata or {})
+        metadata["hedge_of"] = task.id
+        strategies = task.strategies
+        if len(strategies) > 1:
+            current = metadata.get("strategy", strategies[task.depth % len(strategies)])
+            index = strategies.index(current) if current in strategies else -1
+            metadata["strategy"] = strategies[(index + 1) % len(strategies)]
+        current_model = metadata.get("model", agent.model)
+        for model in self.models:
+            if model != current_model:
+                metadata["model"] = model
+                break
+        return task.copy(metadata=metadata)
+
+    def stats(self) -> dict[str, Any]:
+        """Hedging counters, extra-call ratio and estimated tail savings."""
+        return {
+            "tasks": self.tasks,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "denied": self.denied,
+            "extra_call_ratio": self.hedged / self.tasks if self.tasks else 0.0,
+            "threshold": self.threshold(),
+            "saved_seconds": self.saved_seconds,
+        }
+
+
+def _abandon(attempt: asyncio.Future[TaskResult], agent: Agent, pool: AgentPool) -> None:
+    """Cancel the primary attempt, keeping its agent checked out until it ends.
+
+    The caller releases the primary agent as soon as :meth:`Hedger.run`
+    returns, but a call on a thread or in a process keeps running after
+    cancellation, so the agent gets an extra hold for that long.
+    """
+    attempt.cancel()
+    if not attempt.done():
+        pool.retain(agent)
+        attempt.add_done_callback(lambda _: pool.release(agent))
+    attempt.add_done_callback(_retrieve)
+
+
+def _retrieve(attempt: asyncio.Future[TaskResult]) -> None:
+    """Mark an abandoned attempt's failure as seen, so it is not logged."""
+    if not attempt.cancelled():
+        attempt.exception()
+
+
+def _settle(
+    limiter: AdaptiveConcurrency, attempt: asyncio.Future[TaskResult], launched: float
+) -> None:
+    """Give back a backup's slot, sampled unless it was cancelled."""
+    if attempt.cancelled():
+        limiter.release()
+        return
+    error = attempt.exception()
+    outcome = classify(error=error) if error is not None else classify(attempt.result())
+    limiter.release(time.perf_counter() - launched, outcome)
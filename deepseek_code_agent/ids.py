@@ -0,0 +1,26 @@
+"""DeepSeek Code Agent - Identifier generation."""
+
+import itertools
+import os
+import random
+
+
+def _reset() -> None:
+    global _prefix, _counter
+    _prefix = f"{random.getrandbits(32):08x}"
+    _counter = itertools.count(1)
+
+
+_reset()
+os.register_at_fork(after_in_child=_reset)
+
+
+def new_id(kind: str) -> str:
+    """Process-unique id such as ``task_3fa9c01e1b``.
+
+    A per-process random prefix followed by a monotonically increasing
+    counter in hex: far cheaper than ``uuid4()`` (no syscall), ordered by
+    creation within a process, and distinct across processes. A forked
+    child draws a new prefix.
+    """
+    return f"{kind}_{_prefix}{next(_counter):x}"
@@ -1,37 +1,362 @@
 """DeepSeek Code Agent - Inter-agent messaging."""
 
-import uuid
-from dataclasses import dataclass, field
-from datetime import datetime
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+from enum import Enum
 from typing import Any
 
+from .ids import new_id
+
 
-@dataclass
 class Message:
-    """Represents a message between agents."""
+    """Represents a message between agents.
+    
+    Slotted, with ``metadata`` created on first access. The send time is
+    kept as epoch seconds in ``created`` and only formatted into the ISO
+    ``timestamp`` string when that is read. Binary ``content`` is held as
+    a read-only ``memoryview`` (see :func:`frozen_payload`), so one message
+    can be shared by every recipient of a broadcast.
+    """
+    
+    __slots__ = ("from_agent", "to_agent", "content", "id", "created", "_metadata")
+    
+    def __init__(
+        self,
+        from_agent: str,
+        to_agent: str,
+        content: str | bytes | bytearray | memoryview,
+        id: str | None = None,
+        timestamp: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        created: float | None = None,
+    ) -> None:
+        self.from_agent = from_agent
+        self.to_agent = to_agent
+        self.content = content if isinstance(content, str) else frozen_payload(content)
+        self.id = id or new_id("msg")
+        if timestamp is not None:
+            created = _parse_timestamp(timestamp)
+        self.created = time.time() if created is None else created
+        self._metadata = metadata
+    
+    @property
+    def timestamp(self) -> str:
+        """Send time as a naive UTC ISO-8601 string."""
+        return datetime.fromtimestamp(self.created, timezone.utc).replace(tzinfo=None).isoformat()
+    
+    @timestamp.setter
+    def timestamp(self, value: str) -> None:
+        self.created = _parse_timestamp(value)
+    
+    @property
+    def metadata(self) -> dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
     
-    from_agent: str
-    to_agent: str
-    content: str
-    id: str = field(default_factory=lambda: f"msg_{uuid.uuid4().hex[:8]}")
-    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
-    metadata: dict[str, Any] = field(default_factory=dict)
+    @metadata.setter
+    def metadata(self, value: dict[str, Any]) -> None:
+        self._metadata = value
+    
+    def __getstate__(self) -> tuple[Any, ...]:
+        state = tuple(getattr(self, name) for name in Message.__slots__)
+        if isinstance(self.content, memoryview):
+            state = (*state[:2], self.content.tobytes(), *state[3:])
+        return state
+    
+    def __setstate__(self, state: tuple[Any, ...]) -> None:
+        for name, value in zip(Message.__slots__, state):
+            setattr(self, name, value)
+        if isinstance(self.content, bytes):
+            self.content = memoryview(self.content)
+    
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.__getstate__()[:-1] == other.__getstate__()[:-1] and (
+            (self._metadata or {}) == (other._metadata or {})
+        )
+    
+    __hash__ = None  # type: ignore[assignment]
+    
+    def __repr__(self) -> str:
+        return (
+            f"Message(from_agent={self.from_agent!r}, to_agent={self.to_agent!r}, "
+            f"content={self.content!r}, id={self.id!r}, timestamp={self.timestamp!r}, "
+            f"metadata={self.metadata!r})"
+        )
+
+
+def frozen_payload(data: bytes | bytearray | memoryview) -> memoryview:
+    """Read-only view of a binary payload, safe to share between recipients.
+    
+    ``bytes`` and read-only views are wrapped without copying; mutable
+    buffers are copied once so later writes cannot reach recipients.
+    """
+    if isinstance(data, memoryview) and data.readonly:
+        return data
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    return memoryview(data)
+
+
+def _parse_timestamp(value: str) -> float:
+    """Epoch seconds of an ISO-8601 timestamp; naive values are taken as UTC."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class OverflowPolicy(Enum):
+    """What a full mailbox does with a new message."""
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    REJECT = "reject"
+
+
+class MailboxFullError(Exception):
+    """Raised when a full mailbox cannot accept a message."""
+
+
+#: Former name of :class:`MailboxFullError`, kept for existing callers.
+MailboxFull = MailboxFullError
+
+
+class Mailbox:
+    """Bounded FIFO of messages with awaitable receive.
+    
+    When full, ``BLOCK`` parks async senders until there is room,
+    ``DROP_OLDEST`` evicts the oldest message, and ``REJECT`` refuses the new
+    one. ``maxsize=None`` makes the mailbox unbounded.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int | None = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+    ) -> None:
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self.rejected = 0
+        self._messages: deque[Message] = deque()
+        self._getters: deque[asyncio.Future[None]] = deque()
+        self._putters: deque[asyncio.Future[None]] = deque()
+    
+    def full(self) -> bool:
+        """Whether the mailbox is at capacity."""
+        return self.maxsize is not None and len(self._messages) >= self.maxsize
+    
+    def offer(self, message: Message) -> bool:
+        """Add a message without waiting, returning whether it was accepted."""
+        if self.full():
+            if self.overflow is OverflowPolicy.DROP_OLDEST:
+                self._messages.popleft()
+                self.dropped += 1
+            else:
+                if self.overflow is OverflowPolicy.REJECT:
+                    self.rejected += 1
+                return False
+        self._messages.append(message)
+        _wake(self._getters)
+        return True
+    
+    def put_nowait(self, message: Message) -> None:
+        """Add a message without waiting, raising MailboxFullError if refused."""
+        if not self.offer(message):
+            raise MailboxFullError(f"mailbox full ({self.maxsize} messages)")
+    
+    async def put(self, message: Message) -> None:
+        """Add a message, waiting for room under the BLOCK policy."""
+        while self.overflow is OverflowPolicy.BLOCK and self.full():
+            await _park(self._putters, self.full)
+        self.put_nowait(message)
+    
+    def get_nowait(self) -> Message | None:
+        """Take the oldest message, or None if the mailbox is empty."""
+        if not self._messages:
+            return None
+        message = self._messages.popleft()
+        _wake(self._putters)
+        return message
+    
+    async def get(self) -> Message:
+        """Take the oldest message, waiting until one arrives."""
+        while not self._messages:
+            await _park(self._getters, self.empty)
+        return self.get_nowait()
+    
+    def empty(self) -> bool:
+        """Whether the mailbox has no messages."""
+        return not self._messages
+    
+    def __len__(self) -> int:
+        return len(self._messages)
+
+
+def _wake(waiters: deque[asyncio.Future[None]]) -> None:
+    """Resolve the first still-pending waiter."""
+    while waiters:
+        waiter = waiters.popleft()
+        if not waiter.done():
+            waiter.set_result(None)
+            return
+
+
+async def _park(waiters: deque[asyncio.Future[None]], blocked: Callable[[], bool]) -> None:
+    """Wait on a fresh future, handing a consumed wakeup on if cancelled."""
+    waiter = asyncio.get_running_loop().create_future()
+    waiters.append(waiter)
+    try:
+        await waiter
+    except asyncio.CancelledError:
+        if waiter.done() and not waiter.cancelled() and not blocked():
+            _wake(waiters)
+        raise
 
 
 class MessageBus:
-    """Message bus for inter-agent communication."""
+    """Message bus for inter-agent communication.
+    
+    Each recipient has its own mailbox, so publishing is O(1) and draining
+    costs only the messages delivered. Mailboxes are ring buffers holding at
+    most ``max_messages`` each (oldest evicted first), and messages older than
+    ``max_age`` seconds are discarded instead of delivered.
     
-    def __init__(self) -> None:
-        self.messages: list[Message] = []
+    :meth:`broadcast` and :meth:`publish_topic` deliver one message to many
+    mailboxes by reference: the message and its payload exist once however
+    many agents receive it, so recipients must treat it as read-only.
+    Agents join topics with :meth:`join`. :meth:`pump` flushes agent
+    outboxes into their recipients' inboxes.
+    """
+    
+    def __init__(
+        self,
+        max_messages: int | None = None,
+        max_age: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_messages is not None and max_messages < 1:
+            raise ValueError("max_messages must be at least 1")
+        if max_age is not None and max_age <= 0:
+            raise ValueError("max_age must be positive")
+        self.max_messages = max_messages
+        self.max_age = max_age
+        self.clock = clock
+        self.mailboxes: dict[str, deque[tuple[float, Message]]] = {}
+        self.topics: dict[str, dict[str, None]] = {}
+        self.evicted = 0
     
     def publish(self, message: Message) -> None:
         """Publish a message."""
-        self.messages.append(message)
+        self._deliver(message.to_agent, message, self.clock())
+    
+    def register(self, agent_id: str) -> None:
+        """Give an agent a mailbox, so broadcasts reach it before any message does."""
+        if agent_id not in self.mailboxes:
+            self.mailboxes[agent_id] = deque(maxlen=self.max_messages)
+    
+    def broadcast(self, message: Message, recipients: Iterable[str] | None = None) -> int:
+        """Deliver one shared message to ``recipients``, by default every mailbox.
+        
+        The sender is skipped. Returns the number of mailboxes reached.
+        """
+        if recipients is None:
+            recipients = list(self.mailboxes)
+        now = self.clock()
+        delivered = 0
+        for agent_id in recipients:
+            if agent_id != message.from_agent:
+                self._deliver(agent_id, message, now)
+                delivered += 1
+        return delivered
+    
+    def join(self, agent_id: str, topic: str) -> None:
+        """Subscribe an agent to a topic."""
+        self.register(agent_id)
+        self.topics.setdefault(topic, {})[agent_id] = None
+    
+    def leave(self, agent_id: str, topic: str) -> None:
+        """Unsubscribe an agent from a topic."""
+        members = self.topics.get(topic)
+        if members is not None:
+            members.pop(agent_id, None)
+            if not members:
+                del self.topics[topic]
+    
+    def publish_topic(self, topic: str, message: Message) -> int:
+        """Broadcast a message to the members of ``topic``, in join order."""
+        return self.broadcast(message, self.topics.get(topic, ()))
+    
+    def pump(self, agents: Iterable[Any]) -> int:
+        """Flush the agents' outboxes into their recipients' inboxes.
+        
+        Delivery goes through :meth:`Agent.flush_outbox`, one message at a
+        time, so each recipient's overflow policy applies and messages for
+        a full BLOCK inbox stay queued; nothing is put on the bus itself.
+        Returns the number delivered.
+        """
+        return sum(agent.flush_outbox() for agent in agents if agent.outbox)
+    
+    def _deliver(self, agent_id: str, message: Message, now: float) -> None:
+        mailbox = self.mailboxes.get(agent_id)
+        if mailbox is None:
+            mailbox = self.mailboxes[agent_id] = deque(maxlen=self.max_messages)
+        elif len(mailbox) == self.max_messages:
+            self.evicted += 1
+        mailbox.append((now, message))
+        if self.max_age is not None:
+            self._expire(mailbox, now - self.max_age)
     
     def subscribe(self, agent_id: str) -> list[Message]:
-        """Get messages for an agent."""
-        return [m for m in self.messages if m.to_agent == agent_id]
+        """Take all pending messages for an agent, oldest first.
+        
+        Delivered messages are removed from the bus.
+        """
+        mailbox = self.mailboxes.get(agent_id)
+        if not mailbox:
+            return []
+        if self.max_age is not None:
+            self._expire(mailbox, self.clock() - self.max_age)
+        messages = [message for _, message in mailbox]
+        mailbox.clear()
+        return messages
+    
+    def pending(self, agent_id: str) -> int:
+        """Number of messages waiting for an agent."""
+        mailbox = self.mailboxes.get(agent_id)
+        return len(mailbox) if mailbox else 0
+    
+    def expire(self) -> int:
+        """Evict expired messages from every mailbox, returning the count."""
+        if self.max_age is None:
+            return 0
+        before = self.evicted
+        cutoff = self.clock() - self.max_age
+        for mailbox in self.mailboxes.values():
+            self._expire(mailbox, cutoff)
+        return self.evicted - before
+    
+    def _expire(self, mailbox: deque[tuple[float, Message]], cutoff: float) -> None:
+        while mailbox and mailbox[0][0] < cutoff:
+            mailbox.popleft()
+            self.evicted += 1
+    
+    def remove(self, agent_id: str) -> None:
+        """Drop an agent's mailbox, anything still in it and its topics."""
+        self.mailboxes.pop(agent_id, None)
+        for topic in [topic for topic, members in self.topics.items() if agent_id in members]:
+            self.leave(agent_id, topic)
     
     def clear(self) -> None:
         """Clear all messages."""
-        self.messages.clear()
+        self.mailboxes.clear()
+    
+    def __len__(self) -> int:
+        return sum(len(mailbox) for mailbox in self.mailboxes.values())
@@ -1,42 +1,271 @@
 """DeepSeek Code Agent - Monitoring."""
 
+import threading
+from collections import OrderedDict, defaultdict, deque
 from dataclasses import dataclass, field
 from typing import Any
 
 from .agent import Agent
+from .concurrency import AdaptiveConcurrency, Decision
+from .tracing import Histogram, TaskSpan
+
+SPAN_HISTOGRAMS = {
+    "queue_wait": "Seconds tasks waited between enqueue and start.",
+    "run_time": "Seconds from task start to finish.",
+    "model_time": "Seconds per task spent in model calls.",
+    "tool_time": "Seconds per task spent in tool calls.",
+}
+SPAN_COUNTERS = {
+    "tasks": "Tasks finished.",
+    "model_calls": "Model calls made.",
+    "tool_calls": "Tool calls made.",
+    "tokens": "Model tokens used.",
+}
 
 
 @dataclass
 class Monitor:
-    """Monitor for tracking agent status."""
-    
+    """Monitor for tracking agent status.
+
+    Tracked agents push status changes to the monitor, which keeps agents
+    bucketed by status and a cached snapshot per agent, so lookups never
+    scan the whole fleet. Every change bumps ``version``; dashboards can
+    poll :meth:`status_delta` with the last version they saw.
+
+    Tracked agents also report the timing span of every task they finish;
+    the monitor folds them into fixed-bucket histograms and counters per
+    agent and role, exported by :meth:`openmetrics`.
+
+    Watched :class:`AdaptiveConcurrency` limiters report every decision;
+    their current limits, decision counts and the latest ``decisions`` are
+    available from :meth:`concurrency` and exported alongside.
+    """
+
     agents: dict[str, Agent] = field(default_factory=dict)
-    
+
+    def __post_init__(self) -> None:
+        self.version = 0
+        self._lock = threading.Lock()
+        self._by_status: defaultdict[str, dict[str, Agent]] = defaultdict(dict)
+        self._snapshots: dict[str, dict[str, Any]] = {}
+        self._changes: OrderedDict[str, int] = OrderedDict()
+        self._histograms: dict[tuple[str, str], dict[str, Histogram]] = {}
+        self._counters: dict[tuple[str, str], dict[str, int]] = {}
+        self._limiters: dict[str, AdaptiveConcurrency] = {}
+        self._decision_counts: dict[str, defaultdict[tuple[str, str], int]] = {}
+        self.decisions: deque[tuple[str, Decision]] = deque(maxlen=256)
+        agents, self.agents = self.agents, {}
+        for agent in agents.values():
+            self.track(agent)
+
     def track(self, agent: Agent) -> None:
         """Track an agent."""
-        self.agents[agent.id] = agent
-    
+        with self._lock:
+            if agent.id in self.agents:
+                return
+            self.agents[agent.id] = agent
+            self._by_status[agent.status][agent.id] = agent
+            self._record(agent)
+        agent.add_status_listener(self._on_status_change)
+        agent.add_span_listener(self._on_span)
+
     def untrack(self, agent: Agent) -> None:
         """Stop tracking an agent."""
-        if agent.id in self.agents:
+        with self._lock:
+            if agent.id not in self.agents:
+                return
             del self.agents[agent.id]
-    
+            self._by_status[agent.status].pop(agent.id, None)
+            del self._snapshots[agent.id]
+            self._bump(agent.id)
+        agent.remove_status_listener(self._on_status_change)
+        agent.remove_span_listener(self._on_span)
+
+    def watch(self, limiter: AdaptiveConcurrency) -> None:
+        """Follow an adaptive concurrency limiter, keyed by its ``name``."""
+        with self._lock:
+            if self._limiters.get(limiter.name) is limiter:
+                return
+            self._limiters[limiter.name] = limiter
+            self._decision_counts[limiter.name] = defaultdict(int)
+        limiter.add_listener(self._on_decision)
+
+    def unwatch(self, limiter: AdaptiveConcurrency) -> None:
+        """Stop following a limiter."""
+        with self._lock:
+            if self._limiters.get(limiter.name) is not limiter:
+                return
+            del self._limiters[limiter.name]
+            del self._decision_counts[limiter.name]
+        limiter.remove_listener(self._on_decision)
+
+    def _on_decision(self, limiter: AdaptiveConcurrency, decision: Decision) -> None:
+        with self._lock:
+            counts = self._decision_counts.get(limiter.name)
+            if counts is None:
+                return
+            counts[decision.action, decision.reason] += 1
+            self.decisions.append((limiter.name, decision))
+
+    def _on_status_change(self, agent: Agent, old: str, new: str) -> None:
+        with self._lock:
+            self._by_status[old].pop(agent.id, None)
+            self._by_status[new][agent.id] = agent
+            self._record(agent)
+
+    def _on_span(self, agent: Agent, span: TaskSpan) -> None:
+        key = (agent.name, agent.role)
+        with self._lock:
+            histograms = self._histograms.get(key)
+            if histograms is None:
+                histograms = self._histograms[key] = {name: Histogram() for name in SPAN_HISTOGRAMS}
+                self._counters[key] = dict.fromkeys(SPAN_COUNTERS, 0)
+            histograms["queue_wait"].observe(span.queue_wait)
+            histograms["run_time"].observe(span.run_time)
+            histograms["model_time"].observe(span.model_time)
+            histograms["tool_time"].observe(span.tool_time)
+            counters = self._counters[key]
+            counters["tasks"] += 1
+            counters["model_calls"] += span.model_calls
+            counters["tool_calls"] += span.tool_calls
+            counters["tokens"] += span.tokens
+
+    def _record(self, agent: Agent) -> None:
+        self._snapshots[agent.id] = {
+            "name": agent.name,
+            "role": agent.role,
+            "status": agent.status,
+            "current_task": agent.current_task.description if agent.current_task else None,
+        }
+        self._bump(agent.id)
+
+    def _bump(self, agent_id: str) -> None:
+        self.version += 1
+        self._changes[agent_id] = self.version
+        self._changes.move_to_end(agent_id)
+
     def status(self) -> dict[str, dict[str, Any]]:
         """Get status of all tracked agents."""
-        return {
-            agent.id: {
-                "name": agent.name,
-                "role": agent.role,
-                "status": agent.status,
-                "current_task": agent.current_task.description if agent.current_task else None,
-            }
-            for agent in self.agents.values()
-        }
-    
+        with self._lock:
+            return dict(self._snapshots)
+
+    def status_delta(self, since: int = 0) -> tuple[int, dict[str, dict[str, Any] | None]]:
+        """Get agents whose status changed after version ``since``.
+
+        Returns the current version and a snapshot per changed agent, with
+        ``None`` for agents that have been untracked. Cost is proportional
+        to the number of changes, not the number of agents.
+        """
+        delta: dict[str, dict[str, Any] | None] = {}
+        with self._lock:
+            for agent_id, version in reversed(self._changes.items()):
+                if version <= since:
+                    break
+                delta[agent_id] = self._snapshots.get(agent_id)
+            return self.version, delta
+
+    def count(self, status: str) -> int:
+        """Number of tracked agents with the given status."""
+        return len(self._by_status.get(status, ()))
+
+    def get_idle_agent(self) -> Agent | None:
+        """Get any idle agent, or None if all are busy."""
+        with self._lock:
+            return next(iter(self._by_status["idle"].values()), None)
+
     def get_idle_agents(self) -> list[Agent]:
         """Get list of idle agents."""
-        return [a for a in self.agents.values() if a.status == "idle"]
-    
+        with self._lock:
+            return list(self._by_status["idle"].values())
+
     def get_running_agents(self) -> list[Agent]:
         """Get list of running agents."""
-        return [a for a in self.agents.values() if a.status == "running"]
+        with self._lock:
+            return list(self._by_status["running"].values())
+
+    def concurrency(self) -> dict[str, dict[str, Any]]:
+        """Limit, load and decision counts per watched limiter.
+
+        ``decisions`` maps ``"action:reason"`` to how often it was decided.
+        """
+        with self._lock:
+            return {
+                name: {
+                    **limiter.stats(),
+                    "floor": limiter.floor,
+                    "ceiling": limiter.ceiling,
+                    "decisions": {
+                        f"{action}:{reason}": total
+                        for (action, reason), total in self._decision_counts[name].items()
+                    },
+                }
+                for name, limiter in self._limiters.items()
+            }
+
+    def histogram(
+        self, metric: str, agent: str | None = None, role: str | None = None
+    ) -> Histogram:
+        """Span histogram for ``metric``, merged over agents matching name and role."""
+        merged = Histogram()
+        with self._lock:
+            for (name, agent_role), histograms in self._histograms.items():
+                if agent in (None, name) and role in (None, agent_role):
+                    merged.merge(histograms[metric])
+        return merged
+
+    def openmetrics(self, prefix: str = "deepseek_agent") -> str:
+        """Span histograms and counters in the OpenMetrics text format.
+
+        Series are labelled with agent name and role; Prometheus can
+        aggregate per role with ``sum by (role)``.
+        """
+        lines = []
+        with self._lock:
+            for metric, help_text in SPAN_HISTOGRAMS.items():
+                name = f"{prefix}_{metric}_seconds"
+                lines += [f"# TYPE {name} histogram", f"# HELP {name} {help_text}"]
+                for (agent, role), histograms in self._histograms.items():
+                    histogram = histograms[metric]
+                    labels = f'agent="{_escape(agent)}",role="{_escape(role)}"'
+                    for bound, total in histogram.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {total}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+            for metric, help_text in SPAN_COUNTERS.items():
+                name = f"{prefix}_{metric}"
+                lines += [f"# TYPE {name} counter", f"# HELP {name} {help_text}"]
+                for (agent, role), counters in self._counters.items():
+                    labels = f'agent="{_escape(agent)}",role="{_escape(role)}"'
+                    lines.append(f"{name}_total{{{labels}}} {counters[metric]}")
+            if self._limiters:
+                lines += self._concurrency_metrics(prefix)
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+    def _concurrency_metrics(self, prefix: str) -> list[str]:
+        lines = []
+        for metric, help_text in (
+            ("limit", "Current adaptive concurrency limit."),
+            ("in_flight", "Calls in flight under the adaptive limit."),
+        ):
+            name = f"{prefix}_concurrency_{metric}"
+            lines += [f"# TYPE {name} gauge", f"# HELP {name} {help_text}"]
+            for limiter_name, limiter in self._limiters.items():
+                value = getattr(limiter, metric)
+                lines.append(f'{name}{{limiter="{_escape(limiter_name)}"}} {value}')
+        name = f"{prefix}_concurrency_decisions"
+        lines += [f"# TYPE {name} counter", f"# HELP {name} Adaptive concurrency decisions."]
+        for limiter_name, counts in self._decision_counts.items():
+            for (action, reason), total in counts.items():
+                labels = (
+                    f'limiter="{_escape(limiter_name)}",action="{action}",reason="{reason}"'
+                )
+                lines.append(f"{name}_total{{{labels}}} {total}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    """Escape an OpenMetrics label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,178 @@
+"""DeepSeek Code Agent - Agent pool."""
+
+import asyncio
+import heapq
+import itertools
+from collections import OrderedDict, deque
+
+from .agent import Agent
+
+
+class AgentPool:
+    """Least-loaded checkout of agents with bounded per-agent capacity.
+
+    Idle agents wait on a FIFO free-list and are handed out first. Agents
+    that are busy but below ``capacity`` sit in a heap ordered by in-flight
+    count, then by an EWMA of their task latency, so faster agents absorb
+    more of the overflow. Stale heap entries are skipped lazily, keeping
+    checkout and release O(log n). When every agent is at capacity,
+    :meth:`checkout` waits for a release instead of overloading anyone.
+
+    Callers that pick agents themselves, such as capability routing, take
+    a specific agent with :meth:`claim` and wait on :meth:`released` when
+    none of theirs has room, sharing one load count with everyone else.
+    """
+
+    def __init__(self, agents: list[Agent], capacity: int = 1, alpha: float = 0.2) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.agents = list(agents)
+        self.capacity = capacity
+        self.alpha = alpha
+        self.in_flight: dict[str, int] = {agent.id: 0 for agent in self.agents}
+        self.latency: dict[str, float] = {agent.id: 0.0 for agent in self.agents}
+        self.completed: dict[str, int] = {agent.id: 0 for agent in self.agents}
+        self._idle: OrderedDict[str, Agent] = OrderedDict((a.id, a) for a in self.agents)
+        self._busy: list[tuple[int, float, int, Agent]] = []
+        self._counter = itertools.count()
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._watchers: list[asyncio.Future[None]] = []
+        self._leaving: set[str] = set()
+
+    def add(self, agent: Agent) -> None:
+        """Add an agent, idle."""
+        self._leaving.discard(agent.id)
+        if agent.id in self.in_flight:
+            if agent not in self.agents:
+                self.agents.append(agent)
+            return
+        self.agents.append(agent)
+        self.in_flight[agent.id] = 0
+        self.latency[agent.id] = 0.0
+        self.completed[agent.id] = 0
+        self._idle[agent.id] = agent
+        self._wake()
+
+    def remove(self, agent: Agent) -> None:
+        """Stop handing out an agent; one still checked out leaves on release."""
+        if agent not in self.agents:
+            return
+        self.agents.remove(agent)
+        self._idle.pop(agent.id, None)
+        if self.in_flight[agent.id]:
+            self._leaving.add(agent.id)
+        else:
+            self._forget(agent)
+
+    def try_checkout(self) -> Agent | None:
+        """Take the least-loaded agent with spare capacity, if any."""
+        if self._idle:
+            _, agent = self._idle.popitem(last=False)
+        else:
+            agent = self._pop_busy()
+            if agent is None:
+                return None
+        self._take(agent)
+        return agent
+
+    def claim(self, agent: Agent) -> bool:
+        """Take ``agent`` itself if it has spare capacity."""
+        load = self.in_flight.get(agent.id, self.capacity)
+        if agent.id in self._leaving or load >= self.capacity:
+            return False
+        self._idle.pop(agent.id, None)
+        self._take(agent)
+        return True
+
+    def retain(self, agent: Agent) -> None:
+        """Take one more hold on an agent that is checked out, even past capacity.
+
+        For work that outlives its checkout, such as a cancelled call still
+        running on a thread; :meth:`release` the hold when it ends.
+        """
+        self.in_flight[agent.id] += 1
+
+    async def released(self) -> None:
+        """Wait for the next release; :meth:`claim` may then succeed."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._watchers.append(waiter)
+        await waiter
+
+    async def checkout(self) -> Agent:
+        """Take the least-loaded agent, waiting until one has capacity."""
+        if not self.agents:
+            raise ValueError("pool has no agents")
+        while True:
+            agent = self.try_checkout()
+            if agent is not None:
+                return agent
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+
+    def release(self, agent: Agent, latency: float | None = None) -> None:
+        """Return an agent, folding the task's latency into its EWMA."""
+        if latency is not None:
+            previous = self.latency[agent.id]
+            self.latency[agent.id] = (
+                latency if not self.completed[agent.id]
+                else previous + self.alpha * (latency - previous)
+            )
+            self.completed[agent.id] += 1
+        load = self.in_flight[agent.id] - 1
+        self.in_flight[agent.id] = load
+        if agent.id in self._leaving:
+            if load == 0:
+                self._leaving.discard(agent.id)
+                self._forget(agent)
+        elif load == 0:
+            self._idle[agent.id] = agent
+        else:
+            self._push_busy(agent)
+        self._wake()
+
+    def load(self, agent: Agent) -> int:
+        """Number of tasks currently checked out to an agent."""
+        return self.in_flight.get(agent.id, 0)
+
+    def _take(self, agent: Agent) -> None:
+        load = self.in_flight[agent.id] + 1
+        self.in_flight[agent.id] = load
+        if load < self.capacity:
+            self._push_busy(agent)
+
+    def _forget(self, agent: Agent) -> None:
+        for counts in (self.in_flight, self.latency, self.completed):
+            del counts[agent.id]
+
+    def _push_busy(self, agent: Agent) -> None:
+        entry = (self.in_flight[agent.id], self.latency[agent.id], next(self._counter), agent)
+        heapq.heappush(self._busy, entry)
+
+    def _pop_busy(self) -> Agent | None:
+        while self._busy:
+            load, latency, _, agent = heapq.heappop(self._busy)
+            current = self.in_flight.get(agent.id)
+            fresh = load == current and latency == self.latency[agent.id]
+            fresh = fresh and agent.id not in self._leaving
+            if fresh and 0 < current < self.capacity:
+                return agent
+        return None
+
+    def _wake(self) -> None:
+        watchers, self._watchers = self._watchers, []
+        for watcher in watchers:
+            if not watcher.done():
+                watcher.set_result(None)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
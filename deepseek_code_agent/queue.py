@@ -1,49 +1,441 @@
 """DeepSeek Code Agent - Task queue."""
 
 import asyncio
+import time
+from collections.abc import AsyncIterator, Coroutine, Iterable, Iterator, Sequence
+from contextlib import aclosing
 from dataclasses import dataclass, field
 from typing import Any
 
 from .agent import Agent
+from .cache import ResultCache
+from .concurrency import AdaptiveConcurrency, classify
+from .executors import Executor, make_executor
+from .hedging import Hedger
+from .ids import new_id
+from .pool import AgentPool
+from .scheduler import PriorityScheduler
+from .store import SQLiteTaskStore
 from .task import Task, TaskResult
+from .tracing import task_span
+
+Finished = asyncio.Queue[tuple[int, TaskResult] | None]
 
 
 @dataclass
 class TaskQueue:
-    """Queue for managing tasks across multiple agents."""
-    
+    """Queue for managing tasks across multiple agents.
+
+    Tasks are dispatched by :class:`Task` priority, with ``aging`` priority
+    points added per second of waiting so low-priority work is not starved.
+    With ``parallel=True`` up to ``max_concurrency`` tasks run at once, and
+    no agent holds more than ``per_agent_concurrency`` of them. ``tasks`` is
+    a read-only view of the current batch in submission order; add work
+    with :meth:`add_task`, which also schedules it. Each run drains the
+    batch, so ``tasks`` is empty again afterwards.
+
+    ``executor`` picks where agents run: ``"async"`` (default), ``"inline"``,
+    ``"thread"`` or ``"process"``, or an :class:`Executor` instance. Pools
+    created from a name are sized to ``max_concurrency`` and kept until
+    :meth:`close`. With a ``cache``, repeated tasks are served from it and
+    identical tasks in flight share one execution.
+
+    With a ``store``, every task and result is persisted: tasks the store
+    holds as done are answered from it (``metadata["restored"]``) instead
+    of being run again, running tasks are leased and kept alive by
+    heartbeats, and unfinished tasks left by an earlier, crashed run are
+    resumed as part of this queue's first batch, including tasks whose lease
+    had not yet lapsed: the queue assumes it is the store's only consumer.
+    Sequential runs commit each result as it completes.
+
+    With a ``hedger``, parallel runs duplicate slow tasks that opted in
+    with ``Task.hedge`` onto an idle agent; see :class:`Hedger`.
+    ``executor``, ``hedger`` and ``concurrency`` only apply to parallel
+    runs; sequential runs call :meth:`Agent.run` directly and refuse them
+    with a ``ValueError`` rather than ignoring them.
+
+    With ``concurrency``, parallel runs hold at most its current limit of
+    tasks in flight, adapting it to the provider's latency and throttling;
+    see :class:`AdaptiveConcurrency`. Tasks wait for a slot in the
+    scheduler, so priority and aging still apply, and hedged backups need
+    a slot of their own. ``max_concurrency`` then only caps the limit, so
+    set it at or above the limiter's ``ceiling``.
+    """
+
     agents: list[Agent] = field(default_factory=list)
-    tasks: list[Task] = field(default_factory=list)
+    tasks: Sequence[Task] = field(default_factory=list)
     parallel: bool = False
-    
+    max_concurrency: int = 8
+    per_agent_concurrency: int = 1
+    aging: float = 0.0
+    executor: Executor | str | None = None
+    cache: ResultCache | None = None
+    store: SQLiteTaskStore | None = None
+    hedger: Hedger | None = None
+    concurrency: AdaptiveConcurrency | None = None
+
+    def __post_init__(self) -> None:
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if self.per_agent_concurrency < 1:
+            raise ValueError("per_agent_concurrency must be at least 1")
+        self._scheduler = PriorityScheduler(aging=self.aging)
+        self._executor = make_executor(self.executor, self.max_concurrency)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._owner = new_id("queue")
+        self._done: set[str] = set()
+        self._tasks = list(self.tasks)
+        self.tasks = _BatchView(self._tasks)
+        if self.store is not None:
+            self.store.reclaim(self._owner)
+            self._done = self.store.done_ids()
+            known = {task.id for task in self._tasks}
+            self._tasks.extend(task for task in self.store.unfinished() if task.id not in known)
+        for index, task in enumerate(self._tasks):
+            if self.store is not None:
+                self.store.add(task)
+            self._scheduler.push((index, task, time.perf_counter()), task.priority)
+
     def add_task(self, task: Task) -> None:
-        """Add task to queue."""
-        self.tasks.append(task)
-    
+        """Add task to queue.
+
+        Tasks may be added while the queue is draining, including from the
+        worker threads agents run on; they join the current batch.
+        """
+        loop = self._loop
+        if loop is not None and not _in_loop(loop):
+            loop.call_soon_threadsafe(self._enqueue, task)
+        else:
+            self._enqueue(task)
+
+    def _enqueue(self, task: Task) -> None:
+        if self.store is not None:
+            self.store.add(task)
+        self._scheduler.push((len(self._tasks), task, time.perf_counter()), task.priority)
+        self._tasks.append(task)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
     def run(self) -> list[TaskResult]:
-        """Run all tasks."""
-        results = []
-        
+        """Run all tasks, highest priority first.
+
+        The queue is drained: results come back in submission order and
+        ``tasks`` is reset for the next batch. Parallel queues delegate to
+        :meth:`run_async` on a fresh event loop, so this must not be called
+        from inside a running loop.
+        """
         if self.parallel:
-            # Run tasks in parallel
-            for task in self.tasks:
-                agent = self._get_available_agent()
-                if agent:
-                    result = agent.run(task)
-                    results.append(result)
-        else:
-            # Run sequentially
-            for task in self.tasks:
-                agent = self._get_available_agent()
+            return asyncio.run(self.run_async())
+        return self._in_submission_order(self._run_sequential())
+
+    async def run_async(self) -> list[TaskResult]:
+        """Run all tasks concurrently, returning results in submission order."""
+        async with aclosing(self._stream()) as stream:
+            results = {index: result async for index, result in stream}
+        return self._in_submission_order(results.items())
+
+    def iter_results(self, buffer: int | None = None) -> Iterator[TaskResult]:
+        """Yield each result as soon as its task finishes.
+
+        Results arrive in completion order and are not retained, so large
+        batches can be consumed in constant memory. Parallel queues drive
+        :meth:`aiter_results` on a private event loop that only advances
+        while the iterator is being pulled; ``buffer`` is as there.
+        """
+        if not self.parallel:
+            for _, result in self._run_sequential():
+                yield result
+            return
+
+        loop = asyncio.new_event_loop()
+        stream = self.aiter_results(buffer)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(anext(stream))
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(stream.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    async def aiter_results(self, buffer: int | None = None) -> AsyncIterator[TaskResult]:
+        """Run all tasks concurrently, yielding results in completion order.
+
+        With ``buffer``, at most that many finished results wait for the
+        consumer; workers pause until it catches up. Closing the iterator
+        early cancels the rest of the batch.
+        """
+        async with aclosing(self._stream(buffer)) as stream:
+            async for _, result in stream:
+                yield result
+
+    def _run_sequential(self) -> Iterator[tuple[int, TaskResult]]:
+        if self.executor is not None or self.hedger is not None or self.concurrency is not None:
+            raise ValueError("executor, hedger and concurrency need parallel=True")
+        pool = AgentPool(self.agents)
+        try:
+            while self._scheduler:
+                index, task, enqueued = self._scheduler.pop()
+                restored = self._restore(task)
+                if restored is not None:
+                    yield index, restored
+                    continue
+                agent = pool.try_checkout()
                 if agent:
-                    result = agent.run(task)
-                    results.append(result)
-        
-        return results
-    
-    def _get_available_agent(self) -> Agent | None:
-        """Get an available agent."""
-        for agent in self.agents:
-            if agent.status == "idle":
-                return agent
-        return self.agents[0] if self.agents else None
+                    if self.store is not None:
+                        self.store.start(task.id, self._owner)
+                    try:
+                        with task_span(agent, task, enqueued) as span:
+                            try:
+                                if self.cache is None:
+                                    result = agent.run(task)
+                                else:
+                                    result = self.cache.run_sync(
+                                        agent, task, lambda: agent.run(task)
+                                    )
+                            except Exception as exc:
+                                result = TaskResult(
+                                    task_id=task.id,
+                                    agent_id=agent.id,
+                                    success=False,
+                                    output="",
+                                    error=str(exc),
+                                )
+                    finally:
+                        pool.release(agent, span.run_time)
+                    result = self._record(span.attach(result))
+                    if self.store is not None:
+                        self.store.flush()
+                    yield index, result
+        finally:
+            self._reset_batch()
+
+    async def _stream(self, buffer: int | None = None) -> AsyncIterator[tuple[int, TaskResult]]:
+        """Drain the batch concurrently, yielding ``(index, result)``.
+
+        The workers come from :meth:`_workers`; this runs them, heartbeats
+        the leases of running tasks and tears the batch down.
+        """
+        if not self.agents:
+            return
+
+        finished: Finished = asyncio.Queue(buffer or 0)
+        wakeup = asyncio.Event()
+        running: set[str] = set()
+
+        async def heartbeat(store: SQLiteTaskStore) -> None:
+            while True:
+                await asyncio.sleep(store.lease_time / 3)
+                store.heartbeat(self._owner, list(running))
+
+        async def supervise() -> None:
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                await finished.put(None)
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = wakeup
+        workers = [
+            asyncio.create_task(worker) for worker in self._workers(finished, wakeup, running)
+        ]
+        supervisor = asyncio.create_task(supervise())
+        jobs = [*workers, supervisor]
+        if self.store is not None:
+            jobs.append(asyncio.create_task(heartbeat(self.store)))
+        try:
+            while (item := await finished.get()) is not None:
+                yield item
+            await supervisor
+        finally:
+            for job in jobs:
+                job.cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
+            self._loop = None
+            self._wakeup = None
+            self._reset_batch()
+
+    def _workers(
+        self, finished: Finished, wakeup: asyncio.Event, running: set[str]
+    ) -> list[Coroutine[Any, Any, None]]:
+        """Worker coroutines that run the batch, putting results on ``finished``.
+
+        Workers add the ids of tasks they run to ``running`` while they run
+        and set ``wakeup`` when one finishes; :meth:`_enqueue` sets it too.
+        """
+        pool = AgentPool(self.agents, capacity=self.per_agent_concurrency)
+        limiter = self.concurrency
+        active = 0
+
+        async def worker() -> None:
+            nonlocal active
+            while True:
+                if not self._scheduler:
+                    if not active:
+                        return
+                    # Running tasks may still add work; park until they do
+                    # or until the last one finishes.
+                    wakeup.clear()
+                    await wakeup.wait()
+                    continue
+                # Pop only once a concurrency slot and an agent are free, so
+                # tasks added meanwhile still compete on priority.
+                if limiter is not None:
+                    await limiter.acquire()
+                try:
+                    agent = await pool.checkout()
+                except BaseException:
+                    self._free_slot()
+                    raise
+                if not self._scheduler:
+                    pool.release(agent)
+                    self._free_slot()
+                    continue
+                index, task, enqueued = self._scheduler.pop()
+                restored = self._restore(task)
+                if restored is not None:
+                    pool.release(agent)
+                    self._free_slot()
+                    await finished.put((index, restored))
+                    continue
+                active += 1
+                running.add(task.id)
+                start = time.perf_counter()
+                try:
+                    result = await self._execute(agent, task, enqueued, pool)
+                finally:
+                    pool.release(agent, time.perf_counter() - start)
+                    running.discard(task.id)
+                    active -= 1
+                    wakeup.set()
+                await finished.put((index, result))
+
+        return [worker() for _ in range(self.max_concurrency)]
+
+    def close(self) -> None:
+        """Shut down the executor's workers."""
+        self._executor.shutdown()
+
+    @staticmethod
+    def _in_submission_order(results: Iterable[tuple[int, TaskResult]]) -> list[TaskResult]:
+        return [result for _, result in sorted(results, key=lambda item: item[0])]
+
+    def _reset_batch(self) -> None:
+        """Start a fresh batch, dropping anything left unrun."""
+        self._scheduler.clear()
+        self._tasks.clear()
+        if self.store is not None:
+            self.store.flush()
+
+    def _restore(self, task: Task) -> TaskResult | None:
+        """Stored result of a task completed by this or an earlier run."""
+        if task.id not in self._done:
+            return None
+        result = self.store.result(task.id)
+        if result is not None:
+            result.metadata["restored"] = True
+        return result
+
+    def _record(self, result: TaskResult) -> TaskResult:
+        if self.store is not None:
+            self.store.complete(result)
+            if result.success:
+                self._done.add(result.task_id)
+        return result
+
+    async def _execute(
+        self, agent: Agent, task: Task, enqueued: float, pool: AgentPool | None = None
+    ) -> TaskResult:
+        """Run a task on an agent, turning exceptions into failed results.
+
+        Hedged attempts take their backup agent from ``pool``. With a
+        ``concurrency`` limiter the caller holds a slot for the task, taken
+        before it was popped; it is given back here, with the call's
+        latency and outcome unless the cache answered.
+        """
+        if self.store is not None:
+            self.store.start(task.id, self._owner)
+        limiter = self.concurrency
+        sample: tuple[float, str] | None = None
+
+        async def run() -> TaskResult:
+            nonlocal sample
+            start = time.perf_counter()
+            try:
+                if self.hedger is not None and pool is not None:
+                    result = await self.hedger.run(
+                        agent, task, self._executor.submit, pool, limiter
+                    )
+                else:
+                    result = await self._executor.submit(agent, task)
+            except Exception as exc:
+                sample = (time.perf_counter() - start, classify(error=exc))
+                raise
+            sample = (time.perf_counter() - start, classify(result))
+            return result
+
+        try:
+            with task_span(agent, task, enqueued) as span:
+                try:
+                    if self.cache is not None:
+                        result = await self.cache.run(agent, task, run)
+                    elif limiter is None and self.hedger is None:
+                        result = await self._executor.submit(agent, task)
+                    else:
+                        result = await run()
+                except Exception as exc:
+                    result = TaskResult(
+                        task_id=task.id,
+                        agent_id=agent.id,
+                        success=False,
+                        output="",
+                        error=str(exc),
+                    )
+        finally:
+            if limiter is not None and sample is not None:
+                limiter.release(*sample)
+            elif limiter is not None:
+                limiter.release()
+        return self._record(span.attach(result))
+
+    def _free_slot(self) -> None:
+        """Give back a concurrency slot taken for a task that did not run."""
+        if self.concurrency is not None:
+            self.concurrency.release()
+
+
+class _BatchView(Sequence[Task]):
+    """Read-only view of a queue's current batch, in submission order."""
+
+    __slots__ = ("_tasks",)
+
+    def __init__(self, tasks: list[Task]) -> None:
+        self._tasks = tasks
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._tasks[index]
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, tuple, _BatchView)):
+            return self._tasks == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(self._tasks)
+
+
+def _in_loop(loop: asyncio.AbstractEventLoop) -> bool:
+    """Whether the caller is running on ``loop``."""
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
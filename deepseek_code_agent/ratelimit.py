@@ -0,0 +1,206 @@
+"""DeepSeek Code Agent - Model rate limiting."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+class TokenBucket:
+    """Bucket holding up to ``per_minute`` units, refilled continuously.
+
+    The level may go negative when a reservation is corrected upward after
+    the fact; later callers then wait for the debt to be repaid.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.clock = clock
+        self.level = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now).
+
+        Requests larger than the bucket only wait for it to fill.
+        """
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Take ``amount`` units; negative amounts refund."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class Reservation:
+    """Budget granted for one model call."""
+
+    def __init__(self, limiter: "RateLimiter", model: str, tokens: int, waited: float) -> None:
+        self.limiter = limiter
+        self.model = model
+        self.tokens = tokens
+        self.waited = waited
+
+    def settle(self, actual_tokens: int) -> None:
+        """Correct the token estimate once the call reports real usage."""
+        self.limiter._adjust(self.model, actual_tokens - self.tokens)
+        self.tokens = actual_tokens
+
+
+class _ModelState:
+    """Buckets, waiters and wait statistics for one model."""
+
+    def __init__(self, requests: TokenBucket | None, tokens: TokenBucket | None) -> None:
+        self.requests = requests
+        self.tokens = tokens
+        self.waiters: list[tuple[int, int, int, float, asyncio.Future[float]]] = []
+        self.timer: asyncio.TimerHandle | None = None
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def wait_time(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = self.requests.wait_time(1)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens))
+        return wait
+
+    def consume(self, tokens: int) -> None:
+        if self.requests is not None:
+            self.requests.consume(1)
+        if self.tokens is not None:
+            self.tokens.consume(tokens)
+
+
+class RateLimiter:
+    """Paces model calls against per-model request and token budgets.
+
+    Each model configured with :meth:`configure` gets a requests-per-minute
+    and/or tokens-per-minute :class:`TokenBucket`. Callers :meth:`acquire`
+    budget for an estimated token count before calling the model and
+    :meth:`Reservation.settle` it with the real usage afterwards. Callers
+    that have to wait queue per model by priority (highest first, FIFO
+    within a priority). Models that were never configured are not limited.
+
+    A limiter serves one event loop at a time.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self._models: dict[str, _ModelState] = {}
+        self._counter = itertools.count()
+
+    def configure(self, model: str, rpm: float | None = None, tpm: float | None = None) -> None:
+        """Set the requests- and tokens-per-minute limits for a model."""
+        self._models[model] = _ModelState(
+            TokenBucket(rpm, self.clock) if rpm else None,
+            TokenBucket(tpm, self.clock) if tpm else None,
+        )
+
+    async def acquire(self, model: str, tokens: int, priority: int = 0) -> Reservation:
+        """Wait until ``model`` has budget for one call of ``tokens`` tokens."""
+        state = self._models.get(model)
+        if state is None:
+            return Reservation(self, model, tokens, 0.0)
+
+        if not state.waiters and state.wait_time(tokens) == 0:
+            state.consume(tokens)
+            self._record(state, 0.0)
+            return Reservation(self, model, tokens, 0.0)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (-priority, next(self._counter), tokens, self.clock(), future)
+        heapq.heappush(state.waiters, entry)
+        self._dispatch(state)
+        waited = await future
+        return Reservation(self, model, tokens, waited)
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Queue depth and wait times per configured model."""
+        now = self.clock()
+        report = {}
+        for model, state in self._models.items():
+            live = [entry for entry in state.waiters if not entry[4].done()]
+            report[model] = {
+                "queued": len(live),
+                "oldest_wait": max((now - entry[3] for entry in live), default=0.0),
+                "next_grant_in": state.wait_time(live[0][2]) if live else 0.0,
+                "granted": state.granted,
+                "mean_wait": state.total_wait / state.granted if state.granted else 0.0,
+                "max_wait": state.max_wait,
+            }
+        return report
+
+    def _dispatch(self, state: _ModelState) -> None:
+        """Grant queued calls in priority order while budget allows.
+
+        At most one timer is pending per model: it is replaced, never added
+        to, so each new waiter costs one dispatch rather than a new chain.
+        """
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        while state.waiters:
+            _, _, tokens, enqueued, future = state.waiters[0]
+            if future.done():
+                heapq.heappop(state.waiters)
+                continue
+            wait = state.wait_time(tokens)
+            if wait > 0:
+                state.timer = future.get_loop().call_later(wait, self._dispatch, state)
+                return
+            heapq.heappop(state.waiters)
+            state.consume(tokens)
+            waited = self.clock() - enqueued
+            self._record(state, waited)
+            future.set_result(waited)
+
+    def _adjust(self, model: str, delta_tokens: int) -> None:
+        state = self._models.get(model)
+        if state is not None and state.tokens is not None and delta_tokens:
+            state.tokens.consume(delta_tokens)
+            if state.waiters:
+                self._dispatch(state)
+
+    @staticmethod
+    def _record(state: _ModelState, waited: float) -> None:
+        state.granted += 1
+        state.total_wait += waited
+        state.max_wait = max(state.max_wait, waited)
+
+
+def estimate_tokens(messages: list[dict[str, Any]], completion: int = 256) -> int:
+    """Rough token count for a chat request: ~4 characters per token."""
+    prompt = sum(len(str(message.get("content", ""))) for message in messages) // 4
+    return prompt + 4 * len(messages) + completion
+
+
+_default_limiter: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide rate limiter used by agents."""
+    global _default_limiter
+    if _default_limiter is None:
+        _default_limiter = RateLimiter()
+    return _default_limiter
+
+
+def set_rate_limiter(limiter: RateLimiter) -> None:
+    """Replace the process-wide rate limiter."""
+    global _default_limiter
+    _default_limiter = limiter
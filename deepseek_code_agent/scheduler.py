@@ -0,0 +1,62 @@
+"""DeepSeek Code Agent - Priority scheduling."""
+
+import heapq
+import itertools
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+class PriorityScheduler:
+    """Max-priority heap with linear aging.
+
+    While waiting, an item's effective priority grows by ``aging`` per unit of
+    ``clock``. Every waiting item ages at the same rate, so ordering by
+    ``aging * enqueued_at - priority`` is fixed at push time and needs no
+    re-keying: push and pop stay O(log n). Equal keys pop in FIFO order.
+    """
+
+    def __init__(
+        self,
+        aging: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if aging < 0:
+            raise ValueError("aging must be non-negative")
+        self.aging = aging
+        self.clock = clock
+        self._heap: list[tuple[float, int, Any]] = []
+        self._counter = itertools.count()
+
+    def push(self, item: Any, priority: int = 0) -> None:
+        """Schedule an item; higher priorities pop first."""
+        key = self.aging * self.clock() - priority if self.aging else -priority
+        heapq.heappush(self._heap, (key, next(self._counter), item))
+
+    def pop(self) -> Any:
+        """Remove and return the item with the highest effective priority."""
+        return heapq.heappop(self._heap)[2]
+
+    def pop_keyed(self) -> tuple[float, Any]:
+        """Remove the next item, returning its ordering key with it."""
+        key, _, item = heapq.heappop(self._heap)
+        return key, item
+
+    def push_keyed(self, key: float, item: Any) -> None:
+        """Schedule an item under a key from :meth:`pop_keyed`.
+
+        Moving items between schedulers with the same ``aging`` and clock
+        this way keeps the age they have built up.
+        """
+        heapq.heappush(self._heap, (key, next(self._counter), item))
+
+    def peek(self) -> Any:
+        """Return the next item without removing it."""
+        return self._heap[0][2]
+
+    def clear(self) -> None:
+        """Drop all scheduled items."""
+        self._heap.clear()
+
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -0,0 +1,385 @@
+"""DeepSeek Code Agent - Trigram search index for grep and glob tools."""
+
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Iterator
+from typing import Any, NamedTuple
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants
+    import sre_parse
+
+IGNORED_DIRS = frozenset(
+    {
+        ".git", ".hg", ".svn", ".deepseek", ".venv", "venv", "node_modules",
+        "__pycache__", ".mypy_cache", ".pytest_cache", ".tox",
+    }
+)
+
+
+class GrepMatch(NamedTuple):
+    """One matching line; ``path`` is relative to the index root."""
+
+    path: str
+    line_number: int
+    line: str
+
+
+class SearchIndex:
+    """On-disk trigram index of the text files under ``root``.
+
+    The index lives in a SQLite file (default ``<root>/.deepseek/search.db``)
+    mapping every three-byte sequence, lowercased, to the files containing
+    it. :meth:`refresh` walks the tree comparing each file's mtime and size
+    with the index and re-reads only files that changed, so keeping it
+    current costs a ``stat`` per file rather than a read.
+
+    :meth:`grep` pulls the literal runs a regex requires, looks up files
+    holding all of their trigrams and only reads and matches those;
+    patterns without a three-character literal scan every indexed file.
+    :meth:`glob` matches against the cached path list without touching the
+    file system. Results reflect the last refresh: files changed since then
+    are matched on their current content, but only if their old content
+    was a candidate.
+
+    Files over ``max_file_size`` bytes, binary files (a NUL in the first
+    8 KiB) and ``ignored`` directories are skipped. An index opened with
+    ``readonly=True``, or unpickled in another process, shares the file
+    without writing to it and picks up other writers' refreshes; unpickling
+    reuses one read-only handle per file and process.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        path: str | None = None,
+        readonly: bool = False,
+        max_file_size: int = 1 << 20,
+        ignored: frozenset[str] = IGNORED_DIRS,
+    ) -> None:
+        self.root = os.path.abspath(root)
+        self.path = path or os.path.join(self.root, ".deepseek", "search.db")
+        self.readonly = readonly
+        self.max_file_size = max_file_size
+        self.ignored = ignored
+        self._lock = threading.Lock()
+        if readonly:
+            uri = "file:" + self.path + "?mode=ro"
+            self._db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime INTEGER, size INTEGER, "
+                "grams BLOB)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS grams ("
+                "gram BLOB, file INTEGER, PRIMARY KEY (gram, file)) WITHOUT ROWID"
+            )
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._version: int | None = None
+        self._files: dict[str, tuple[int, int, int]] = {}
+        self._load()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _reader, (self.root, self.path, self.max_file_size, self.ignored)
+
+    def refresh(self) -> dict[str, int]:
+        """Bring the index up to date; returns counts of added, updated and removed files."""
+        if self.readonly:
+            raise PermissionError("search index is read-only")
+        with self._lock:
+            seen: set[str] = set()
+            changed: list[tuple[str, os.stat_result]] = []
+            for rel, stat in self._walk():
+                seen.add(rel)
+                known = self._files.get(rel)
+                if known is None or known[1:] != (stat.st_mtime_ns, stat.st_size):
+                    changed.append((rel, stat))
+            removed = [rel for rel in self._files if rel not in seen]
+            counts = {
+                "added": sum(rel not in self._files for rel, _ in changed),
+                "updated": sum(rel in self._files for rel, _ in changed),
+                "removed": len(removed),
+            }
+            if changed or removed:
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    for rel in removed:
+                        self._forget(rel)
+                    for rel, stat in changed:
+                        self._forget(rel)
+                        self._index(rel, stat)
+                    self._db.execute("COMMIT")
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+                self._load_locked()
+            return counts
+
+    def glob(self, pattern: str, path: str | None = None) -> list[str]:
+        """Indexed paths matching a glob such as ``src/**/*.py``, sorted."""
+        matcher = re.compile(glob_to_regex(pattern))
+        prefix = self._prefix(path)
+        with self._lock:
+            self._reload_if_changed()
+            return sorted(
+                rel for rel in self._files
+                if rel.startswith(prefix) and matcher.fullmatch(rel[len(prefix):])
+            )
+
+    def grep(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        ignore_case: bool = False,
+        limit: int | None = None,
+    ) -> list[GrepMatch]:
+        """Lines matching ``pattern`` in indexed files, by path then line.
+
+        ``path`` restricts the search to a subdirectory of the root and
+        ``glob`` to files whose path below it matches.
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        regex = re.compile(pattern, flags | re.MULTILINE)
+        matches: list[GrepMatch] = []
+        for rel in self.candidates(pattern, path, glob, flags):
+            for match in self._scan(rel, regex):
+                matches.append(match)
+                if limit is not None and len(matches) >= limit:
+                    return matches
+        return matches
+
+    def candidates(
+        self, pattern: str, path: str | None = None, glob: str | None = None, flags: int = 0
+    ) -> list[str]:
+        """Indexed paths that may contain a match for ``pattern``, sorted."""
+        grams = required_trigrams(pattern, flags)
+        with self._lock:
+            self._reload_if_changed()
+            if grams:
+                ids: set[int] | None = None
+                for gram in sorted(grams):
+                    rows = self._db.execute("SELECT file FROM grams WHERE gram = ?", (gram,))
+                    found = {row[0] for row in rows}
+                    ids = found if ids is None else ids & found
+                    if not ids:
+                        return []
+                paths = [rel for rel, (file_id, _, _) in self._files.items() if file_id in ids]
+            else:
+                paths = list(self._files)
+        prefix = self._prefix(path)
+        matcher = re.compile(glob_to_regex(glob)) if glob else None
+        return sorted(
+            rel for rel in paths
+            if rel.startswith(prefix)
+            and (matcher is None or matcher.fullmatch(rel[len(prefix):]))
+        )
+
+    def close(self) -> None:
+        """Close the index file."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def _walk(self) -> Iterator[tuple[str, os.stat_result]]:
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in self.ignored:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_size <= self.max_file_size:
+                        rel = os.path.relpath(entry.path, self.root)
+                        yield rel.replace(os.sep, "/"), stat
+
+    def _index(self, rel: str, stat: os.stat_result) -> None:
+        try:
+            with open(os.path.join(self.root, rel), "rb") as f:
+                data = f.read(self.max_file_size + 1)
+        except OSError:
+            return
+        if b"\0" in data[:8192]:
+            grams: set[bytes] = set()
+        else:
+            grams = trigrams(data)
+        cursor = self._db.execute(
+            "INSERT INTO files (path, mtime, size, grams) VALUES (?, ?, ?, ?)",
+            (rel, stat.st_mtime_ns, stat.st_size, b"".join(grams)),
+        )
+        self._db.executemany(
+            "INSERT INTO grams VALUES (?, ?)", ((gram, cursor.lastrowid) for gram in grams)
+        )
+
+    def _forget(self, rel: str) -> None:
+        row = self._db.execute("SELECT id, grams FROM files WHERE path = ?", (rel,)).fetchone()
+        if row is None:
+            return
+        file_id, blob = row
+        self._db.executemany(
+            "DELETE FROM grams WHERE gram = ? AND file = ?",
+            ((blob[i:i + 3], file_id) for i in range(0, len(blob), 3)),
+        )
+        self._db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _load(self) -> None:
+        with self._lock:
+            self._load_locked()
+
+    def _load_locked(self) -> None:
+        try:
+            rows = self._db.execute("SELECT path, id, mtime, size FROM files").fetchall()
+        except sqlite3.OperationalError:
+            # A read-only handle opened before any writer created the tables.
+            rows = []
+        self._files = {rel: (file_id, mtime, size) for rel, file_id, mtime, size in rows}
+        self._version = self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def _reload_if_changed(self) -> None:
+        if self._db.execute("PRAGMA data_version").fetchone()[0] != self._version:
+            self._load_locked()
+
+    def _prefix(self, path: str | None) -> str:
+        if path is None:
+            return ""
+        rel = os.path.relpath(os.path.join(self.root, path), self.root).replace(os.sep, "/")
+        return "" if rel == "." else rel.rstrip("/") + "/"
+
+    def _scan(self, rel: str, regex: re.Pattern[str]) -> Iterator[GrepMatch]:
+        try:
+            # Keep line endings as written, so patterns see the bytes the
+            # trigram filter saw and "\n" matches only real newlines.
+            with open(
+                os.path.join(self.root, rel), encoding="utf-8", errors="replace", newline=""
+            ) as f:
+                text = f.read()
+        except OSError:
+            return
+        line, position, reported = 1, 0, -1
+        for match in regex.finditer(text):
+            start = text.rfind("\n", 0, match.start()) + 1
+            if start == reported:
+                # Report each line once, however many matches it holds.
+                continue
+            line += text.count("\n", position, start)
+            position = reported = start
+            end = text.find("\n", start)
+            found = text[start:end] if end != -1 else text[start:]
+            yield GrepMatch(rel, line, found.removesuffix("\r"))
+
+
+_readers: dict[tuple[Any, ...], SearchIndex] = {}
+_readers_lock = threading.Lock()
+
+
+def _reader(
+    root: str, path: str, max_file_size: int, ignored: frozenset[str]
+) -> SearchIndex:
+    """Read-only handle on an index file, opened once per process.
+
+    Agents carry their index to process workers with every call; sharing
+    the handle avoids a connection and a full load per unpickle.
+    """
+    key = (root, path, max_file_size, ignored)
+    with _readers_lock:
+        index = _readers.get(key)
+        if index is None or index._db is None:
+            index = _readers[key] = SearchIndex(root, path, True, max_file_size, ignored)
+        return index
+
+
+def trigrams(data: bytes) -> set[bytes]:
+    """Distinct three-byte sequences of ``data``, ASCII-lowercased."""
+    data = data.lower()
+    return {data[i:i + 3] for i in range(len(data) - 2)}
+
+
+def required_trigrams(pattern: str, flags: int = 0) -> set[bytes]:
+    """Trigrams every match of ``pattern`` must contain, lowercased.
+
+    Only literal runs outside alternations and optional repeats count, so
+    the set is conservative: an empty set means any file may match.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return set()
+    grams: set[bytes] = set()
+    for run in _literal_runs(parsed):
+        grams |= trigrams(run.encode())
+    return grams
+
+
+def _literal_runs(parsed: Any) -> list[str]:
+    runs: list[str] = []
+    current: list[str] = []
+    for op, av in parsed:
+        if op is sre_constants.LITERAL and av < 128:
+            current.append(chr(av))
+            continue
+        if len(current) >= 3:
+            runs.append("".join(current))
+        current = []
+        if op is sre_constants.SUBPATTERN:
+            runs.extend(_literal_runs(av[-1]))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            runs.extend(_literal_runs(av[2]))
+    if len(current) >= 3:
+        runs.append("".join(current))
+    return runs
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Regex for a ``/``-separated glob; ``**`` spans directories."""
+    out: list[str] = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+                continue
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return "".join(out)
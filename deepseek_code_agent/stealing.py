@@ -0,0 +1,147 @@
+"""DeepSeek Code Agent - Work-stealing task queue."""
+
+import asyncio
+import time
+from collections.abc import Coroutine
+from dataclasses import dataclass
+from typing import Any
+
+from .agent import Agent
+from .pool import AgentPool
+from .queue import Finished, TaskQueue
+from .scheduler import PriorityScheduler
+from .task import Task
+
+Entry = tuple[int, Task, float]
+
+
+@dataclass
+class WorkStealingQueue(TaskQueue):
+    """Task queue where every agent works through its own queue.
+
+    When a parallel batch runs, queued tasks are dealt out to per-agent
+    priority queues as they are scheduled: a task whose
+    ``metadata["files"]`` overlaps files already placed goes to the agent
+    that owns most of them, so work on the same files stays on one agent;
+    anything else goes to the agent with the shortest queue. Each agent
+    runs its own tasks by priority, with the queue's ``aging``, and an
+    agent that runs dry steals the next task, the highest-priority one,
+    of the longest queue, so a few long tasks cannot strand a backlog
+    behind them while other agents sit idle.
+
+    ``locality=False`` ignores file hints and ``steal=False`` keeps every
+    task on the agent it was first placed on. ``steals`` and
+    ``local_hits`` (tasks placed by their files) count over the queue's
+    lifetime. Sequential runs behave as in :class:`TaskQueue`.
+    """
+
+    locality: bool = True
+    steal: bool = True
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.steals = 0
+        self.local_hits = 0
+
+    def _workers(
+        self, finished: Finished, wakeup: asyncio.Event, running: set[str]
+    ) -> list[Coroutine[Any, Any, None]]:
+        """One worker per agent slot, each draining its agent's queue."""
+        slots = [agent for _ in range(self.per_agent_concurrency) for agent in self.agents]
+        slots = slots[: self.max_concurrency]
+        scheduler = self._scheduler
+        queues: dict[str, PriorityScheduler] = {
+            agent.id: PriorityScheduler(scheduler.aging, scheduler.clock) for agent in slots
+        }
+        owners: dict[str, str] = {}
+        # Workers take their own agent from the pool, so hedged backups can
+        # borrow idle ones without doubling up.
+        pool = AgentPool(self.agents, capacity=self.per_agent_concurrency)
+        limiter = self.concurrency
+        active = 0
+
+        def place() -> None:
+            """Move newly scheduled tasks onto agent queues."""
+            if not scheduler:
+                return
+            while scheduler:
+                key, entry = scheduler.pop_keyed()
+                files = _files(entry[1]) if self.locality else ()
+                votes: dict[str, int] = {}
+                for path in files:
+                    owner = owners.get(path)
+                    if owner is not None:
+                        votes[owner] = votes.get(owner, 0) + 1
+                if votes:
+                    target = max(votes, key=lambda owner: (votes[owner], -len(queues[owner])))
+                    self.local_hits += 1
+                else:
+                    target = min(queues, key=lambda owner: len(queues[owner]))
+                for path in files:
+                    owners[path] = target
+                queues[target].push_keyed(key, entry)
+            wakeup.set()
+
+        def take(agent: Agent) -> Entry | None:
+            own = queues[agent.id]
+            if own:
+                return own.pop()
+            if self.steal:
+                victim = max(queues.values(), key=len)
+                if victim:
+                    self.steals += 1
+                    return victim.pop()
+            return None
+
+        async def worker(agent: Agent) -> None:
+            nonlocal active
+            while True:
+                place()
+                # Take a concurrency slot before a task, so tasks placed
+                # meanwhile still compete on priority.
+                if limiter is not None:
+                    await limiter.acquire()
+                entry = take(agent)
+                if entry is None:
+                    self._free_slot()
+                    if not active and not any(queues.values()):
+                        return
+                    # Running tasks may still add or leave work; park until
+                    # one finishes or new tasks arrive.
+                    wakeup.clear()
+                    await wakeup.wait()
+                    continue
+                index, task, enqueued = entry
+                restored = self._restore(task)
+                if restored is not None:
+                    self._free_slot()
+                    await finished.put((index, restored))
+                    continue
+                active += 1
+                running.add(task.id)
+                try:
+                    try:
+                        while not pool.claim(agent):
+                            await pool.released()
+                    except BaseException:
+                        self._free_slot()
+                        raise
+                    start = time.perf_counter()
+                    try:
+                        result = await self._execute(agent, task, enqueued, pool)
+                    finally:
+                        pool.release(agent, time.perf_counter() - start)
+                finally:
+                    running.discard(task.id)
+                    active -= 1
+                    wakeup.set()
+                await finished.put((index, result))
+
+        return [worker(agent) for agent in slots]
+
+
+def _files(task: Task) -> tuple[str, ...]:
+    """Locality hint of a task, without materialising empty metadata."""
+    if not task._metadata:
+        return ()
+    return tuple(task._metadata.get("files", ()))
@@ -0,0 +1,214 @@
+"""DeepSeek Code Agent - Durable task store."""
+
+import itertools
+import pickle
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from .task import Task, TaskResult
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class SQLiteTaskStore:
+    """Durable record of tasks, their leases and their results.
+
+    Tasks live in one SQLite table in WAL mode, so readers never block the
+    writer and several processes may share a file. Each task is
+    ``pending``, ``leased`` to an owner for ``lease_time`` seconds, ``done``
+    with a stored :class:`TaskResult`, or ``failed`` (kept for retry). Owners keep
+    their leases alive with :meth:`heartbeat`; leases that expire, because
+    their owner crashed or hung, go back to ``pending`` when a store is
+    opened and on :meth:`requeue_expired`. A sole consumer restarting
+    after a crash need not wait for them: :meth:`reclaim` takes back every
+    lease held by another owner.
+
+    Writes from :meth:`add`, :meth:`start` and :meth:`complete` are
+    buffered and committed together once ``batch_size`` accumulate, on
+    :meth:`flush` and before any read. A crash loses at most the last
+    unflushed batch; those tasks are simply run again. ``synchronous``
+    is SQLite's durability level: ``"NORMAL"`` survives process crashes,
+    ``"FULL"`` also survives power loss.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_time: float = 30.0,
+        batch_size: int = 256,
+        synchronous: str = "NORMAL",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if lease_time <= 0:
+            raise ValueError("lease_time must be positive")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"unknown synchronous level {synchronous!r}")
+        self.path = path
+        self.lease_time = lease_time
+        self.batch_size = batch_size
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._writes: list[tuple[str, tuple[Any, ...]]] = []
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={synchronous.upper()}")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id TEXT PRIMARY KEY, priority INTEGER, state TEXT, owner TEXT, "
+            "expires REAL, task BLOB, result BLOB)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, priority)")
+        self.requeued = self.requeue_expired()
+
+    def add(self, task: Task) -> None:
+        """Record a task as pending; tasks already known keep their state."""
+        self._write(
+            "INSERT OR IGNORE INTO tasks (id, priority, state, task) VALUES (?, ?, ?, ?)",
+            (task.id, task.priority, PENDING, pickle.dumps(task, pickle.HIGHEST_PROTOCOL)),
+        )
+
+    def start(self, task_id: str, owner: str) -> None:
+        """Lease a task the caller is about to run."""
+        self._write(
+            "UPDATE tasks SET state = ?, owner = ?, expires = ? WHERE id = ? AND state != ?",
+            (LEASED, owner, self.clock() + self.lease_time, task_id, DONE),
+        )
+
+    def complete(self, result: TaskResult) -> None:
+        """Store a result: ``done`` on success, ``failed`` otherwise."""
+        self._write(
+            "UPDATE tasks SET state = ?, owner = NULL, expires = NULL, result = ? WHERE id = ?",
+            (
+                DONE if result.success else FAILED,
+                pickle.dumps(result, pickle.HIGHEST_PROTOCOL),
+                result.task_id,
+            ),
+        )
+
+    def lease(self, owner: str, limit: int) -> list[Task]:
+        """Atomically lease up to ``limit`` pending tasks, highest priority first."""
+        with self._lock:
+            self._flush()
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "UPDATE tasks SET state = ?, owner = ?, expires = ? WHERE id IN "
+                    "(SELECT id FROM tasks WHERE state = ? ORDER BY priority DESC, rowid LIMIT ?) "
+                    "RETURNING rowid, task",
+                    (LEASED, owner, self.clock() + self.lease_time, PENDING, limit),
+                ).fetchall()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return [pickle.loads(task) for _, task in sorted(rows)]
+
+    def heartbeat(self, owner: str, task_ids: Iterable[str]) -> None:
+        """Extend ``owner``'s leases on ``task_ids`` and commit at once."""
+        expires = self.clock() + self.lease_time
+        with self._lock:
+            self._writes.extend(
+                (
+                    "UPDATE tasks SET expires = ? WHERE id = ? AND owner = ? AND state = ?",
+                    (expires, task_id, owner, LEASED),
+                )
+                for task_id in task_ids
+            )
+            self._flush()
+
+    def requeue_expired(self) -> int:
+        """Return tasks whose lease has lapsed to ``pending``."""
+        with self._lock:
+            self._flush()
+            cursor = self._db.execute(
+                "UPDATE tasks SET state = ?, owner = NULL, expires = NULL "
+                "WHERE state = ? AND expires < ?",
+                (PENDING, LEASED, self.clock()),
+            )
+            return cursor.rowcount
+
+    def reclaim(self, owner: str) -> int:
+        """Return tasks leased to anyone but ``owner`` to ``pending``, expired or not.
+
+        Only safe when no other consumer is live on this store, as when a
+        single queue resumes after its predecessor crashed.
+        """
+        with self._lock:
+            self._flush()
+            cursor = self._db.execute(
+                "UPDATE tasks SET state = ?, owner = NULL, expires = NULL "
+                "WHERE state = ? AND owner IS NOT ?",
+                (PENDING, LEASED, owner),
+            )
+            return cursor.rowcount
+
+    def result(self, task_id: str) -> TaskResult | None:
+        """Stored result of a completed task."""
+        rows = self._read("SELECT result FROM tasks WHERE id = ? AND state = ?", (task_id, DONE))
+        return pickle.loads(rows[0][0]) if rows else None
+
+    def done_ids(self) -> set[str]:
+        """Ids of tasks completed successfully."""
+        return {row[0] for row in self._read("SELECT id FROM tasks WHERE state = ?", (DONE,))}
+
+    def unfinished(self) -> list[Task]:
+        """Pending and failed tasks, in the order they were added."""
+        rows = self._read(
+            "SELECT task FROM tasks WHERE state IN (?, ?) ORDER BY rowid", (PENDING, FAILED)
+        )
+        return [pickle.loads(row[0]) for row in rows]
+
+    def counts(self) -> dict[str, int]:
+        """Number of tasks in each state."""
+        counts = dict.fromkeys((PENDING, LEASED, DONE, FAILED), 0)
+        counts.update(self._read("SELECT state, COUNT(*) FROM tasks GROUP BY state"))
+        return counts
+
+    def flush(self) -> None:
+        """Commit buffered writes."""
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        """Flush and close the database."""
+        with self._lock:
+            if self._db is not None:
+                self._flush()
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return sum(self.counts().values())
+
+    def _write(self, sql: str, params: tuple[Any, ...]) -> None:
+        with self._lock:
+            self._writes.append((sql, params))
+            if len(self._writes) >= self.batch_size:
+                self._flush()
+
+    def _read(self, sql: str, params: tuple[Any, ...] = ()) -> list[tuple[Any, ...]]:
+        with self._lock:
+            self._flush()
+            return self._db.execute(sql, params).fetchall()
+
+    def _flush(self) -> None:
+        if not self._writes:
+            return
+        writes, self._writes = self._writes, []
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, group in itertools.groupby(writes, key=lambda write: write[0]):
+                self._db.executemany(sql, [params for _, params in group])
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
@@ -1,9 +1,9 @@
 """DeepSeek Code Agent - Task definitions."""
 
-import uuid
-from dataclasses import dataclass, field
-from typing import Any
 from enum import Enum
+from typing import Any
+
+from .ids import new_id
 
 
 class TaskStatus(Enum):
@@ -14,32 +14,159 @@ class TaskStatus(Enum):
     FAILED = "failed"
 
 
-@dataclass
 class Task:
-    """Represents a task to be executed by an agent."""
+    """Represents a task to be executed by an agent.
+    
+    Slotted, with ``metadata`` created on first access, since queues hold
+    many of these at once. ``hedge`` opts the task into speculative
+    duplicate execution when a queue has a :class:`~.hedging.Hedger`.
+    ``requires`` lists capabilities an agent must have to run it; see
+    :meth:`Agent.capabilities`.
+    """
+    
+    __slots__ = (
+        "description",
+        "id",
+        "priority",
+        "decompose",
+        "max_depth",
+        "strategies",
+        "_metadata",
+        "status",
+        "depends_on",
+        "depth",
+        "hedge",
+        "requires",
+    )
+    
+    def __init__(
+        self,
+        description: str,
+        id: str | None = None,
+        priority: int = 0,
+        decompose: bool = False,
+        max_depth: int = 3,
+        strategies: list[str] | None = None,
+        metadata: dict[str, Any] | None = None,
+        status: TaskStatus = TaskStatus.PENDING,
+        depends_on: list[str] | None = None,
+        depth: int = 0,
+        hedge: bool = False,
+        requires: list[str] | None = None,
+    ) -> None:
+        self.description = description
+        self.id = id or new_id("task")
+        self.priority = priority
+        self.decompose = decompose
+        self.max_depth = max_depth
+        self.strategies = strategies or ["by_feature"]
+        self._metadata = metadata
+        self.status = status
+        self.depends_on = depends_on if depends_on is not None else []
+        self.depth = depth
+        self.hedge = hedge
+        self.requires = requires if requires is not None else []
+    
+    @property
+    def metadata(self) -> dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
     
-    description: str
-    id: str = field(default_factory=lambda: f"task_{uuid.uuid4().hex[:8]}")
-    priority: int = 0
-    decompose: bool = False
-    max_depth: int = 3
-    strategies: list[str] = field(default_factory=list)
-    metadata: dict[str, Any] = field(default_factory=dict)
+    @metadata.setter
+    def metadata(self, value: dict[str, Any]) -> None:
+        self._metadata = value
     
-    status: TaskStatus = TaskStatus.PENDING
+    def copy(self, **changes: Any) -> "Task":
+        """Copy with ``changes`` applied; list fields and metadata are copied too."""
+        values = {field: getattr(self, name) for field, name in zip(_TASK_FIELDS, Task.__slots__)}
+        values["metadata"] = dict(self._metadata) if self._metadata else None
+        for name in ("strategies", "depends_on", "requires"):
+            values[name] = list(values[name])
+        values.update(changes)
+        return Task(**values)
     
-    def __post_init__(self) -> None:
-        if not self.strategies:
-            self.strategies = ["by_feature"]
+    def __getstate__(self) -> tuple[Any, ...]:
+        # A positional tuple pickles smaller than a field-name dict.
+        return tuple(getattr(self, name) for name in Task.__slots__)
+    
+    def __setstate__(self, state: tuple[Any, ...]) -> None:
+        for name, value in zip(Task.__slots__, state):
+            setattr(self, name, value)
+    
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return _fields(self) == _fields(other)
+    
+    __hash__ = None  # type: ignore[assignment]
+    
+    def __repr__(self) -> str:
+        return _repr(self, _TASK_FIELDS)
 
 
-@dataclass
 class TaskResult:
     """Result of task execution."""
     
-    task_id: str
-    agent_id: str
-    success: bool
-    output: str
-    error: str | None = None
-    metadata: dict[str, Any] = field(default_factory=dict)
+    __slots__ = ("task_id", "agent_id", "success", "output", "error", "_metadata")
+    
+    def __init__(
+        self,
+        task_id: str,
+        agent_id: str,
+        success: bool,
+        output: str,
+        error: str | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        self.task_id = task_id
+        self.agent_id = agent_id
+        self.success = success
+        self.output = output
+        self.error = error
+        self._metadata = metadata
+    
+    @property
+    def metadata(self) -> dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, value: dict[str, Any]) -> None:
+        self._metadata = value
+    
+    def __getstate__(self) -> tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in TaskResult.__slots__)
+    
+    def __setstate__(self, state: tuple[Any, ...]) -> None:
+        for name, value in zip(TaskResult.__slots__, state):
+            setattr(self, name, value)
+    
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return _fields(self) == _fields(other)
+    
+    __hash__ = None  # type: ignore[assignment]
+    
+    def __repr__(self) -> str:
+        return _repr(self, _RESULT_FIELDS)
+
+
+# Public field names, in constructor order.
+_TASK_FIELDS = tuple(name.lstrip("_") for name in Task.__slots__)
+_RESULT_FIELDS = tuple(name.lstrip("_") for name in TaskResult.__slots__)
+
+
+def _fields(obj: Any) -> tuple[Any, ...]:
+    """Slot values for comparison, without materialising lazy metadata."""
+    return tuple(
+        (obj._metadata or {}) if name == "_metadata" else getattr(obj, name)
+        for name in obj.__slots__
+    )
+
+
+def _repr(obj: Any, names: tuple[str, ...]) -> str:
+    args = ", ".join(f"{name}={getattr(obj, name)!r}" for name in names)
+    return f"{obj.__class__.__name__}({args})"
@@ -1,57 +1,419 @@
 """DeepSeek Code Agent - Team orchestration."""
 
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass, field
 from typing import Any
 
 from .agent import Agent
+from .cache import ResultCache
+from .executors import Executor, ProcessExecutor, ThreadExecutor, make_executor
+from .graph import TaskGraphExecutor
+from .pool import AgentPool
+from .search_index import SearchIndex
 from .task import Task, TaskResult
+from .tracing import task_span
 
 
 @dataclass
 class Team:
-    """Team of agents that can collaborate on tasks."""
-    
+    """Team of agents that can collaborate on tasks.
+
+    ``executor`` selects the backend agents run on and ``cache`` serves
+    repeated tasks, as for :class:`TaskQueue`; named pools are sized to the
+    team, replaced by one at least twice as large when :meth:`add_agent`
+    outgrows them, and kept until :meth:`close`. ``prefix`` is the system prompt every
+    member's requests start with, so they share the provider's prompt cache.
+
+    A ``search_index`` is handed to every member for their grep and glob
+    tools and refreshed by the team before the tasks it runs, at most once
+    per ``index_refresh_interval`` seconds of ``clock`` (``0`` refreshes
+    before every task); members only read it. Async runs refresh it in a
+    worker thread, and runs starting while a refresh is in flight wait for
+    that one instead of walking the tree again.
+
+    Every task runs on a member checked out of one :class:`AgentPool`, so
+    no member runs two tasks at once. Tasks are routed on their
+    ``requires`` through an inverted index from each capability (see
+    :meth:`Agent.capabilities`) to the members that have it: the smallest
+    matching set is intersected with the others and cached per requirement
+    set as a route. Each route keeps its idle members in release order, so
+    a pick claims the longest-idle candidate in constant time (members
+    whose :meth:`Agent.can_handle` refuses the task are skipped). When
+    every candidate is busy the task waits in the route's own queue and is
+    woken only when one of the route's members is released. Call
+    :meth:`reindex` after changing a member's role, model, tools or tags.
+    When a task finishes, the messages its member queued with
+    :meth:`Agent.send_to` are flushed to their recipients' inboxes.
+    """
+
     agents: list[Agent] = field(default_factory=list)
     name: str = "Team"
-    
+    executor: Executor | str | None = None
+    cache: ResultCache | None = None
+    prefix: str | None = None
+    search_index: SearchIndex | None = None
+    index_refresh_interval: float = 1.0
+    clock: Callable[[], float] = time.monotonic
+
+    def __post_init__(self) -> None:
+        if self.index_refresh_interval < 0:
+            raise ValueError("index_refresh_interval must not be negative")
+        self._executor = make_executor(self.executor, len(self.agents) or None)
+        self._retired: list[Executor] = []
+        if self.prefix is None:
+            self.prefix = (
+                f"You are a member of {self.name}, a team of coding agents working on "
+                "one codebase. Coordinate through messages and stay within your role."
+            )
+        for agent in self.agents:
+            agent.shared_prefix = self.prefix
+            agent.search_index = self.search_index
+        self._pool = AgentPool(self.agents)
+        self._refreshing: asyncio.Future[dict[str, int]] | None = None
+        self._refreshed_at: float | None = None
+        self.reindex()
+
     def add_agent(self, agent: Agent) -> None:
         """Add an agent to the team."""
+        agent.shared_prefix = self.prefix
+        agent.search_index = self.search_index
         self.agents.append(agent)
-    
+        self._pool.add(agent)
+        self._index_agent(agent)
+        self._grow_executor()
+
     def remove_agent(self, agent: Agent) -> None:
         """Remove an agent from the team."""
         self.agents.remove(agent)
-    
+        self._pool.remove(agent)
+        for members in self._capabilities.values():
+            members.pop(agent.id, None)
+        self._forget_routes()
+
+    def reindex(self) -> None:
+        """Rebuild the capability index from the members' current settings."""
+        self._capabilities: dict[str, dict[str, Agent]] = {}
+        if hasattr(self, "_routes"):
+            self._forget_routes()
+        self._routes: dict[frozenset[str], _Route] = {}
+        self._member_routes: dict[str, list[_Route]] = {}
+        for agent in self.agents:
+            self._index_agent(agent)
+
     def run(self, task: Task) -> TaskResult:
-        """Run a task with the team."""
-        if task.decompose:
-            subtasks = self._decompose_task(task)
-            results = []
-            for subtask in subtasks:
-                agent = self._select_agent(subtask)
-                result = agent.run(subtask)
-                results.append(result)
-            return TaskResult(
-                task_id=task.id,
-                agent_id=self.name,
-                success=True,
-                output=f"Team completed {len(results)} subtasks",
-            )
-        
-        agent = self._select_agent(task)
-        return agent.run(task)
-    
+        """Run a task with the team.
+
+        Decomposed tasks, and every task of a team with a cache or an
+        ``executor``, are executed by :meth:`run_async` on a fresh event
+        loop, so this must not be called from inside a running loop.
+        """
+        if task.decompose or self.cache is not None or self.executor is not None:
+            return asyncio.run(self.run_async(task))
+
+        self._refresh_index()
+        agent = self._try_checkout(task)
+        if agent is None:
+            raise RuntimeError(f"every member of {self.name} that can run {task.id} is busy")
+        try:
+            with task_span(agent, task) as span:
+                result = agent.run(task)
+        finally:
+            self._checkin(agent)
+        return span.attach(result)
+
+    async def run_async(self, task: Task) -> TaskResult:
+        """Run a task, executing its decomposition as a concurrent graph.
+
+        Subtasks are decomposed recursively up to ``task.max_depth``;
+        independent subtasks run in parallel, at most one per team member.
+        """
+        await self._refresh_index_async()
+        if not task.decompose:
+            return await self._run_leaf(task)
+
+        return await self._graph().run(task)
+
+    async def aiter_results(self, task: Task) -> AsyncIterator[TaskResult]:
+        """Run a task, yielding every subtask result as it completes.
+
+        Leaf and intermediate results arrive in completion order; the last
+        one yielded is the result for ``task`` itself.
+        """
+        if not task.decompose:
+            yield await self.run_async(task)
+            return
+
+        await self._refresh_index_async()
+        finished: asyncio.Queue[TaskResult | None] = asyncio.Queue()
+
+        async def drive() -> None:
+            try:
+                await self._graph(finished.put_nowait).run(task)
+            finally:
+                finished.put_nowait(None)
+
+        root = asyncio.create_task(drive())
+        try:
+            while (result := await finished.get()) is not None:
+                yield result
+            await root
+        finally:
+            root.cancel()
+
+    def _graph(
+        self, on_result: Callable[[TaskResult], None] | None = None
+    ) -> TaskGraphExecutor:
+        """Graph executor whose leaves run on agents checked out per subtask."""
+        return TaskGraphExecutor(
+            self._decompose_task, self._run_leaf, self._reduce_results, on_result
+        )
+
+    async def _run_leaf(self, task: Task) -> TaskResult:
+        """Run a task on a member checked out for it."""
+        enqueued = time.perf_counter()
+        agent = await self._checkout(task)
+        try:
+            return await self._submit(agent, task, enqueued)
+        finally:
+            self._checkin(agent)
+
+    def _checkin(self, agent: Agent) -> None:
+        """Deliver what a member sent during its task, then return it to the pool.
+
+        A member that is idle again rejoins its routes and wakes one task
+        waiting on each of them.
+        """
+        agent.flush_outbox()
+        self._pool.release(agent)
+        if self._pool.load(agent):
+            return
+        for route in self._member_routes.get(agent.id, ()):
+            route.idle[agent.id] = agent
+            route.wake()
+
+    async def _checkout(self, task: Task) -> Agent:
+        """Check out a member for ``task``, waiting while every candidate is busy."""
+        if not task.requires:
+            agent = await self._pool.checkout()
+            self._taken(agent)
+            return agent
+        while (agent := self._try_checkout(task)) is None:
+            await self._route(frozenset(task.requires)).released()
+        return agent
+
+    def _try_checkout(self, task: Task) -> Agent | None:
+        if not task.requires:
+            if not self.agents:
+                raise ValueError(f"{self.name} has no agents")
+            agent = self._pool.try_checkout()
+        else:
+            agent = self._select_agent(task)
+            if agent is not None:
+                self._pool.claim(agent)
+        if agent is not None:
+            self._taken(agent)
+        return agent
+
+    def _taken(self, agent: Agent) -> None:
+        for route in self._member_routes.get(agent.id, ()):
+            route.idle.pop(agent.id, None)
+
+    async def _submit(
+        self, agent: Agent, task: Task, enqueued: float | None = None
+    ) -> TaskResult:
+        """Run a task on the executor, through the cache if there is one."""
+        with task_span(agent, task, enqueued) as span:
+            if self.cache is None:
+                result = await self._executor.submit(agent, task)
+            else:
+                result = await self.cache.run(
+                    agent, task, lambda: self._executor.submit(agent, task)
+                )
+        return span.attach(result)
+
+    def close(self) -> None:
+        """Shut down the executor's workers."""
+        for executor in (*self._retired, self._executor):
+            executor.shutdown()
+        self._retired.clear()
+
+    def _grow_executor(self) -> None:
+        """Replace a named pool smaller than the team; tasks already on it finish there."""
+        executor = self._executor
+        if isinstance(self.executor, Executor) or not isinstance(
+            executor, (ThreadExecutor, ProcessExecutor)
+        ):
+            return
+        if len(self.agents) > executor.max_workers:
+            self._retired.append(executor)
+            size = max(len(self.agents), 2 * executor.max_workers)
+            self._executor = make_executor(self.executor, size)
+
+    def _refresh_due(self) -> bool:
+        """Whether the index should be walked now, noting the walk if so."""
+        if self.search_index is None or self.search_index.readonly:
+            return False
+        now = self.clock()
+        last = self._refreshed_at
+        if last is not None and now - last < self.index_refresh_interval:
+            return False
+        self._refreshed_at = now
+        return True
+
+    def _refresh_index(self) -> None:
+        if self._refresh_due():
+            try:
+                self.search_index.refresh()
+            except BaseException:
+                self._refreshed_at = None
+                raise
+
+    async def _refresh_index_async(self) -> None:
+        refresh = self._refreshing
+        if refresh is None or refresh.get_loop() is not asyncio.get_running_loop():
+            if not self._refresh_due():
+                return
+            refresh = asyncio.ensure_future(asyncio.to_thread(self.search_index.refresh))
+            self._refreshing = refresh
+            refresh.add_done_callback(self._refreshed)
+        await asyncio.shield(refresh)
+
+    def _refreshed(self, refresh: asyncio.Future[dict[str, int]]) -> None:
+        if self._refreshing is refresh:
+            self._refreshing = None
+        if refresh.cancelled() or refresh.exception() is not None:
+            self._refreshed_at = None
+
     def _decompose_task(self, task: Task) -> list[Task]:
-        """Decompose a task into subtasks."""
+        """Decompose a task into subtasks.
+
+        Subtasks may set ``decompose`` to be split further and list sibling
+        ids in ``depends_on`` to be ordered after them.
+        """
         # Simple decomposition - in real implementation, use AI
-        return [Task(description=f"Part of: {task.description}") for _ in range(3)]
-    
-    def _select_agent(self, task: Task) -> Agent:
-        """Select best agent for task."""
-        for agent in self.agents:
-            if agent.can_handle(task):
-                return agent
-        return self.agents[0]
-    
+        strategy = task.strategies[task.depth % len(task.strategies)]
+        return [
+            Task(
+                description=f"Part of: {task.description}",
+                priority=task.priority,
+                max_depth=task.max_depth,
+                strategies=list(task.strategies),
+                metadata={"strategy": strategy, "parent_id": task.id},
+                requires=list(task.requires),
+            )
+            for _ in range(3)
+        ]
+
+    def _reduce_results(self, task: Task, results: list[TaskResult]) -> TaskResult:
+        """Combine subtask results into the parent task's result."""
+        errors = [f"{r.task_id}: {r.error}" for r in results if not r.success]
+        return TaskResult(
+            task_id=task.id,
+            agent_id=self.name,
+            success=not errors,
+            output="\n".join(r.output for r in results if r.output),
+            error="; ".join(errors) or None,
+            metadata={"subtask_results": results},
+        )
+
+    def _select_agent(self, task: Task) -> Agent | None:
+        """Longest-idle member with every capability the task requires.
+
+        Members run one task at a time, so only idle members qualify.
+        Returns ``None`` while every such member is busy.
+        """
+        key = frozenset(task.requires)
+        route = self._route(key)
+        if not route.members:
+            raise ValueError(f"no agent in {self.name} has {sorted(key)}")
+
+        stale = []
+        chosen = None
+        for agent_id, agent in route.idle.items():
+            if self._pool.load(agent):
+                # Taken by a checkout that went through the pool directly.
+                stale.append(agent_id)
+            # A member overriding can_handle may still refuse.
+            elif agent.can_handle(task):
+                chosen = agent
+                break
+        for agent_id in stale:
+            del route.idle[agent_id]
+        if chosen is None and not any(agent.can_handle(task) for agent in route.members):
+            raise ValueError(f"no agent in {self.name} can handle {task.id}")
+        return chosen
+
+    def _route(self, requires: frozenset[str]) -> "_Route":
+        """Cached route for a requirement set, with its idle members in team order."""
+        route = self._routes.get(requires)
+        if route is None:
+            members = self._match(requires)
+            route = self._routes[requires] = _Route(members)
+            for agent in members:
+                self._member_routes.setdefault(agent.id, []).append(route)
+                if not self._pool.load(agent):
+                    route.idle[agent.id] = agent
+        return route
+
+    def _forget_routes(self) -> None:
+        """Drop cached routes, sending their waiters back to pick again."""
+        for route in self._routes.values():
+            route.wake_all()
+        self._routes.clear()
+        self._member_routes.clear()
+
+    def _match(self, requires: frozenset[str]) -> list[Agent]:
+        """Members having every capability in ``requires``, in team order."""
+        if not requires:
+            return list(self.agents)
+        sets = sorted(
+            (self._capabilities.get(capability, {}) for capability in requires), key=len
+        )
+        return [
+            agent for agent_id, agent in sets[0].items()
+            if all(agent_id in members for members in sets[1:])
+        ]
+
+    def _index_agent(self, agent: Agent) -> None:
+        for capability in agent.capabilities():
+            self._capabilities.setdefault(capability, {})[agent.id] = agent
+        self._forget_routes()
+
     def __repr__(self) -> str:
         return f"Team(name={self.name}, agents={len(self.agents)})"
+
+
+class _Route:
+    """Members matching one requirement set, which are idle, and who waits for them."""
+
+    __slots__ = ("members", "idle", "waiters")
+
+    def __init__(self, members: list[Agent]) -> None:
+        self.members = members
+        self.idle: OrderedDict[str, Agent] = OrderedDict()
+        self.waiters: deque[asyncio.Future[None]] = deque()
+
+    async def released(self) -> None:
+        """Wait until a member is released or the route is dropped."""
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.wake()
+            raise
+
+    def wake(self) -> None:
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def wake_all(self) -> None:
+        while self.waiters:
+            self.wake()
@@ -0,0 +1,180 @@
+"""DeepSeek Code Agent - Task timing spans and histograms."""
+
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .agent import Agent
+    from .task import Task, TaskResult
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_current_span: ContextVar["TaskSpan | None"] = ContextVar("deepseek_task_span", default=None)
+
+
+class TaskSpan:
+    """Timing of one task execution.
+
+    Timestamps are ``time.perf_counter()`` values. Model and tool calls made
+    while the span is current are accumulated rather than listed, so a span
+    stays a fixed size however many calls a task makes. Used as a context
+    manager, a span is current inside the block and hands itself to the
+    agent's span listeners on exit.
+    """
+
+    __slots__ = (
+        "task_id",
+        "agent_id",
+        "enqueued",
+        "started",
+        "finished",
+        "model_calls",
+        "model_time",
+        "tokens",
+        "tool_calls",
+        "tool_time",
+        "_agent",
+        "_token",
+    )
+
+    def __init__(
+        self, task_id: str, agent_id: str, enqueued: float | None = None, agent: Any = None
+    ) -> None:
+        self.task_id = task_id
+        self.agent_id = agent_id
+        self.started = time.perf_counter()
+        self.enqueued = self.started if enqueued is None else enqueued
+        self.finished: float | None = None
+        self.model_calls = 0
+        self.model_time = 0.0
+        self.tokens = 0
+        self.tool_calls = 0
+        self.tool_time = 0.0
+        self._agent = agent
+        self._token = None
+
+    def __enter__(self) -> "TaskSpan":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        _current_span.reset(self._token)
+        self.finished = time.perf_counter()
+        agent = self._agent
+        if agent is not None:
+            self._agent = None
+            for listener in agent._span_listeners:
+                listener(agent, self)
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__[:-2])
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+        self._agent = self._token = None
+
+    @property
+    def queue_wait(self) -> float:
+        return self.started - self.enqueued
+
+    @property
+    def run_time(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def to_dict(self) -> dict[str, Any]:
+        started = self.started
+        finished = self.finished
+        end = finished if finished is not None else time.perf_counter()
+        return {
+            "enqueued": self.enqueued,
+            "started": started,
+            "finished": finished,
+            "queue_wait": started - self.enqueued,
+            "run_time": end - started,
+            "model_calls": self.model_calls,
+            "model_time": self.model_time,
+            "tokens": self.tokens,
+            "tool_calls": self.tool_calls,
+            "tool_time": self.tool_time,
+        }
+
+    def attach(self, result: "TaskResult") -> "TaskResult":
+        """Store this span's :meth:`to_dict` form in ``result.metadata["span"]``."""
+        result.metadata["span"] = self.to_dict()
+        return result
+
+
+def current_span() -> TaskSpan | None:
+    """Span of the task running in the current context, if any."""
+    return _current_span.get()
+
+
+def task_span(agent: "Agent", task: "Task", enqueued: float | None = None) -> TaskSpan:
+    """Span timing ``task`` on ``agent``; use it as a context manager.
+
+    Code running inside the block, including threads started with
+    ``asyncio.to_thread``, reports model and tool calls to the span.
+    """
+    return TaskSpan(task.id, agent.id, enqueued, agent)
+
+
+def record_model_call(duration: float, tokens: int = 0) -> None:
+    """Add a model round trip to the current span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.model_calls += 1
+        span.model_time += duration
+        span.tokens += tokens
+
+
+@contextmanager
+def tool_call() -> Iterator[None]:
+    """Time a tool invocation against the current span, if any."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        span = _current_span.get()
+        if span is not None:
+            span.tool_calls += 1
+            span.tool_time += time.perf_counter() - start
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``counts[i]`` holds observations <= ``bounds[i]``.
+
+    The last count is the ``+Inf`` overflow bucket. Counts are per bucket,
+    not cumulative.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: "Histogram") -> None:
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.sum += other.sum
+        self.count += other.count
+
+    def cumulative(self) -> Iterator[tuple[float, int]]:
+        """``(upper_bound, cumulative_count)`` pairs ending with ``+Inf``."""
+        total = 0
+        for bound, n in zip((*self.bounds, float("inf")), self.counts):
+            total += n
+            yield bound, total
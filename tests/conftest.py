@@ -0,0 +1,19 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """A FakeClock starting at zero; advance it by setting ``clock.now``."""
+    return FakeClock()
@@ -0,0 +1,66 @@
+"""Tests for the base agent."""
+
+import asyncio
+
+import pytest
+
+from deepseek_code_agent import Agent
+from deepseek_code_agent.messaging import MailboxFullError, OverflowPolicy
+
+
+class TestAgentMessaging:
+    """Test cases for agent-to-agent messaging."""
+
+    def test_flush_outbox_delivers_to_inbox(self):
+        """Sent messages should reach the recipient after a flush."""
+        alice, bob = Agent(name="alice"), Agent(name="bob")
+        alice.send_to(bob, "hello")
+
+        assert bob.receive() is None
+        assert alice.flush_outbox() == 1
+        assert bob.receive().content == "hello"
+        assert not alice.outbox
+
+    def test_flush_stops_at_full_blocking_inbox(self):
+        """Messages for a full BLOCK inbox should stay queued."""
+        alice, bob = Agent(name="alice"), Agent(name="bob", inbox_size=1)
+        alice.send_to(bob, "one")
+        alice.send_to(bob, "two")
+
+        assert alice.flush_outbox() == 1
+        assert len(alice.outbox) == 1
+        bob.receive()
+        assert alice.flush_outbox() == 1
+        assert bob.receive().content == "two"
+
+    def test_flush_discards_rejected_messages(self):
+        """Messages refused by a REJECT inbox should be dropped."""
+        alice = Agent(name="alice")
+        bob = Agent(name="bob", inbox_size=1, overflow=OverflowPolicy.REJECT)
+        alice.send_to(bob, "one")
+        alice.send_to(bob, "two")
+
+        assert alice.flush_outbox() == 1
+        assert not alice.outbox
+        assert bob.inbox.rejected == 1
+
+    def test_full_outbox_raises(self):
+        """Producers should be stopped once their outbox is full."""
+        alice, bob = Agent(name="alice", outbox_size=1), Agent(name="bob")
+        alice.send_to(bob, "one")
+
+        with pytest.raises(MailboxFullError):
+            alice.send_to(bob, "two")
+
+    def test_receive_async_waits_for_send_async(self):
+        """Awaiting receive should park until a message is delivered."""
+        alice, bob = Agent(name="alice"), Agent(name="bob")
+
+        async def scenario():
+            receiver = asyncio.create_task(bob.receive_async())
+            await asyncio.sleep(0)
+            await alice.send_async(bob, "ping")
+            return await asyncio.wait_for(receiver, 1)
+
+        message = asyncio.run(scenario())
+        assert (message.from_agent, message.content) == (alice.id, "ping")
@@ -0,0 +1,140 @@
+"""Tests for the task result cache."""
+
+import asyncio
+from dataclasses import dataclass
+
+from deepseek_code_agent import Agent, Task, TaskQueue, TaskResult
+from deepseek_code_agent.cache import ResultCache
+
+
+@dataclass(repr=False)
+class CountingAgent(Agent):
+    """Agent that counts how often it really runs."""
+
+    delay: float = 0.0
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.calls = 0
+
+    def run(self, task: Task) -> TaskResult:
+        self.calls += 1
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output=task.description)
+
+    async def run_async(self, task: Task) -> TaskResult:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output=task.description)
+
+
+def run_once(cache, agent, task):
+    async def call():
+        return await agent.run_async(task)
+
+    return asyncio.run(cache.run(agent, task, call))
+
+
+class TestResultCache:
+    """Test cases for ResultCache."""
+
+    def test_key_covers_inputs(self):
+        """Keys should change with description, agent config and fingerprint."""
+        agent = Agent(name="a", tools=["grep"])
+        task = Task(description="fix lint in x")
+        key = ResultCache.key(agent, task)
+
+        twin = Agent(name="b", tools=["grep"])
+        assert ResultCache.key(twin, Task(description="fix lint in x")) == key
+        assert ResultCache.key(Agent(name="a", model="other"), task) != key
+        assert ResultCache.key(agent, Task(description="fix lint in y")) != key
+        fingerprinted = Task(description="fix lint in x", metadata={"fingerprint": "abc"})
+        assert ResultCache.key(agent, fingerprinted) != key
+
+    def test_hit_is_readdressed_to_new_task(self):
+        """A hit should skip the agent and carry the new task's id."""
+        cache = ResultCache()
+        agent = CountingAgent(name="a")
+        run_once(cache, agent, Task(description="same"))
+        task = Task(description="same")
+
+        result = run_once(cache, agent, task)
+
+        assert agent.calls == 1
+        assert result.task_id == task.id
+        assert result.metadata["cached"] is True
+        assert cache.stats()["hits"] == 1
+
+    def test_failures_are_not_cached(self):
+        """Unsuccessful results should always be re-run."""
+        cache = ResultCache()
+        cache.put("k", TaskResult(task_id="t", agent_id="a", success=False, output=""))
+
+        assert cache.get("k") is None
+
+    def test_ttl_and_lru_eviction(self, clock):
+        """Entries should expire after ttl and be evicted beyond max_entries."""
+        cache = ResultCache(max_entries=2, ttl=10, clock=clock)
+        for key in "abc":
+            cache.put(key, TaskResult(task_id=key, agent_id="x", success=True, output=key))
+
+        assert cache.get("a") is None
+        assert cache.get("c").output == "c"
+        clock.now = 11
+        assert cache.get("c") is None
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Results should be reloaded from the SQLite tier by a new cache."""
+        path = str(tmp_path / "cache.db")
+        cache = ResultCache(path=path)
+        cache.put("k", TaskResult(task_id="t", agent_id="a", success=True, output="kept"))
+        cache.close()
+
+        reopened = ResultCache(path=path)
+        assert reopened.get("k").output == "kept"
+        reopened.close()
+
+    def test_concurrent_identical_tasks_coalesce(self):
+        """Identical tasks in flight should share one execution."""
+        cache = ResultCache()
+        agents = [CountingAgent(name=f"a{i}", delay=0.02) for i in range(4)]
+        queue = TaskQueue(agents=agents, parallel=True, cache=cache)
+        for _ in range(4):
+            queue.add_task(Task(description="write tests for y"))
+
+        results = queue.run()
+
+        assert sum(agent.calls for agent in agents) == 1
+        assert cache.coalesced == 3
+        assert all(r.success for r in results)
+        assert len({r.task_id for r in results}) == 4
+
+    def test_sequential_queue_uses_cache(self):
+        """Sequential runs should be served from the cache too."""
+        cache = ResultCache()
+        agent = CountingAgent(name="a")
+        tasks = [Task(description="write tests for z") for _ in range(2)]
+
+        first, second = TaskQueue(agents=[agent], tasks=tasks, cache=cache).run()
+
+        assert agent.calls == 1
+        assert "cached" not in first.metadata and second.metadata["cached"]
+        assert second.task_id == tasks[1].id
+
+    def test_hits_do_not_inherit_the_runners_metadata(self, tmp_path):
+        """Spans and flags added to the result that ran must not reach later hits."""
+        path = str(tmp_path / "cache.db")
+        cache = ResultCache(path=path)
+        agent = CountingAgent(name="a")
+        tasks = [Task(description="write tests for w") for _ in range(3)]
+
+        [first] = TaskQueue(agents=[agent], tasks=tasks[:1], cache=cache).run()
+        first.metadata["hedged"] = True
+        [second] = TaskQueue(agents=[agent], tasks=tasks[1:2], cache=cache).run()
+        cache.close()
+        [from_disk] = TaskQueue(agents=[agent], tasks=tasks[2:], cache=ResultCache(path=path)).run()
+
+        assert "span" in first.metadata
+        for hit in (second, from_disk):
+            assert set(hit.metadata) == {"cached", "span"}
+            assert hit.metadata["span"] is not first.metadata["span"]
+
@@ -0,0 +1,83 @@
+"""Tests for the shared LLM client pool."""
+
+import asyncio
+import gc
+import weakref
+
+import pytest
+
+from deepseek_code_agent.client import ClientPool
+
+pytest.importorskip("openai")
+
+
+class TestClientPool:
+    """Test cases for ClientPool."""
+
+    def test_clients_shared_per_model_and_endpoint(self):
+        """Agents on one model and endpoint should share a client."""
+        pool = ClientPool()
+
+        async def scenario():
+            first = pool.get("deepseek-chat", "http://localhost:1/v1", api_key="k")
+            again = pool.get("deepseek-chat", "http://localhost:1/v1", api_key="k")
+            other = pool.get("deepseek-coder", "http://localhost:1/v1", api_key="k")
+            await pool.aclose()
+            return first, again, other
+
+        first, again, other = asyncio.run(scenario())
+
+        assert first is again
+        assert first is not other
+        assert first._client is other._client
+
+    def test_clients_are_per_event_loop(self):
+        """A new event loop should get its own connections."""
+        pool = ClientPool()
+
+        async def get():
+            return pool.get("deepseek-chat", "http://localhost:1/v1", api_key="k")
+
+        assert asyncio.run(get()) is not asyncio.run(get())
+
+    def test_clients_are_per_api_key(self):
+        """Callers with different credentials must not share a client."""
+        pool = ClientPool()
+
+        async def scenario():
+            first = pool.get("deepseek-chat", "http://localhost:1/v1", api_key="k1")
+            second = pool.get("deepseek-chat", "http://localhost:1/v1", api_key="k2")
+            await pool.aclose()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert first is not second
+        assert (first.api_key, second.api_key) == ("k1", "k2")
+
+    def test_connections_closed_when_loop_ends(self):
+        pool = ClientPool()
+
+        async def get():
+            return pool.get("deepseek-chat", "http://localhost:1/v1", api_key="k")
+
+        client = asyncio.run(get())
+
+        assert client._client.is_closed
+        assert len(pool) == 0
+
+    def test_pool_does_not_keep_loops_alive(self):
+        pool = ClientPool()
+        loop = asyncio.new_event_loop()
+
+        async def get():
+            return pool.get("deepseek-chat", "http://localhost:1/v1", api_key="k")
+
+        loop.run_until_complete(get())
+        loop.close()
+        ref = weakref.ref(loop)
+        del loop
+        gc.collect()
+
+        assert ref() is None
+        assert len(pool) == 0
@@ -0,0 +1,253 @@
+"""Tests for the adaptive concurrency limit."""
+
+import asyncio
+from dataclasses import dataclass, field
+
+import pytest
+
+from deepseek_code_agent import Agent, Monitor, Task, TaskQueue, TaskResult
+from deepseek_code_agent.concurrency import AdaptiveConcurrency, classify
+from deepseek_code_agent.hedging import Hedger
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+@dataclass
+class StubProvider:
+    """Provider whose latency and throttling are scripted by load.
+
+    Calls take ``latency`` seconds up to ``capacity`` in flight and
+    proportionally longer beyond it; above ``throttle_at`` in flight they
+    fail with a 429.
+    """
+
+    latency: float = 0.002
+    capacity: int = 1000
+    throttle_at: int = 1000
+    in_flight: int = 0
+    peak: int = 0
+    calls: int = 0
+    throttled: int = 0
+    loads: list[int] = field(default_factory=list)
+
+    async def call(self) -> None:
+        self.in_flight += 1
+        self.calls += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.loads.append(self.in_flight)
+        try:
+            if self.in_flight > self.throttle_at:
+                self.throttled += 1
+                await asyncio.sleep(self.latency / 4)
+                raise RateLimitError("429 Too Many Requests")
+            await asyncio.sleep(self.latency * max(1.0, self.in_flight / self.capacity))
+        finally:
+            self.in_flight -= 1
+
+
+@dataclass(repr=False)
+class ProviderAgent(Agent):
+    provider: StubProvider | None = None
+
+    async def run_async(self, task: Task) -> TaskResult:
+        await self.provider.call()
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output="ok")
+
+
+def drive(provider, limiter, tasks=200, agents=32):
+    queue = TaskQueue(
+        agents=[ProviderAgent(name=f"a{i}", provider=provider) for i in range(agents)],
+        tasks=[Task(f"t{i}") for i in range(tasks)],
+        parallel=True,
+        max_concurrency=agents,
+        concurrency=limiter,
+    )
+    results = queue.run()
+    limits = [decision.limit for decision in limiter.decisions]
+    return results, limits
+
+
+def reasons(limiter):
+    return {f"{decision.action}:{decision.reason}" for decision in limiter.decisions}
+
+
+class TestAdaptiveConcurrency:
+    """Test cases for AdaptiveConcurrency."""
+
+    def test_rejects_bad_bounds(self):
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(floor=4, ceiling=2)
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(backoff=1.0)
+
+    def test_initial_limit_is_clamped(self):
+        assert AdaptiveConcurrency(initial=100, ceiling=8).limit == 8
+        assert AdaptiveConcurrency(initial=0, floor=2).limit == 2
+
+    def test_grows_to_ceiling_on_fast_provider(self):
+        provider = StubProvider()
+        limiter = AdaptiveConcurrency(initial=1, ceiling=8, window=5)
+
+        results, limits = drive(provider, limiter)
+
+        assert all(result.success for result in results)
+        assert limiter.limit == 8 and max(limits) == 8
+        assert provider.peak == 8
+        assert "increase:saturated" in reasons(limiter)
+
+    def test_backs_off_on_throttling(self):
+        provider = StubProvider(throttle_at=6)
+        limiter = AdaptiveConcurrency(initial=2, ceiling=24, window=5)
+
+        results, limits = drive(provider, limiter, tasks=300)
+
+        assert "decrease:throttled" in reasons(limiter)
+        assert provider.throttled
+        # The limit oscillates around the throttling point instead of
+        # climbing to the ceiling, so most calls go through.
+        assert max(limits) < 24
+        assert sum(load > 6 for load in provider.loads) < len(provider.loads) / 4
+        failed = [result for result in results if not result.success]
+        assert len(failed) == provider.throttled
+        assert all("429" in result.error for result in failed)
+
+    def test_backs_off_on_latency_before_errors(self):
+        provider = StubProvider(capacity=4)
+        limiter = AdaptiveConcurrency(initial=2, ceiling=32, window=5, tolerance=1.5)
+
+        drive(provider, limiter, tasks=300)
+
+        assert "decrease:latency" in reasons(limiter)
+        assert provider.peak < 32
+
+    def test_never_drops_below_floor(self):
+        provider = StubProvider(throttle_at=0)
+        limiter = AdaptiveConcurrency(initial=8, floor=2, window=4)
+
+        _, limits = drive(provider, limiter, tasks=60)
+
+        assert min(limits) == limiter.limit == 2
+        assert provider.peak <= 8
+
+    def test_cancelled_calls_are_not_sampled(self):
+        async def scenario():
+            limiter = AdaptiveConcurrency(initial=1, window=1)
+            await limiter.acquire()
+            waiter = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            assert limiter.stats()["waiting"] == 1
+            limiter.release()
+            await waiter
+            limiter.release()
+            return limiter
+
+        limiter = asyncio.run(scenario())
+        assert limiter.in_flight == 0 and not limiter.decisions
+
+    def test_classify(self):
+        assert classify(TaskResult("t", "a", True, "ok")) == "ok"
+        assert classify(error=RateLimitError()) == "throttled"
+        assert classify(error=RuntimeError("boom")) == "error"
+        assert classify(TaskResult("t", "a", False, "", error="Rate limit exceeded")) == "throttled"
+        assert classify(TaskResult("t", "a", False, "", error="bad request")) == "error"
+
+
+class TestQueueConcurrency:
+    """Test cases for TaskQueue with a limiter."""
+
+    def test_waiting_tasks_keep_priority(self):
+        """Tasks waiting for a slot should still be ordered by the scheduler."""
+        order = []
+
+        @dataclass(repr=False)
+        class SpawningAgent(Agent):
+            queue: TaskQueue | None = None
+
+            async def run_async(self, task: Task) -> TaskResult:
+                order.append(task.description)
+                if task.description == "low 0":
+                    self.queue.add_task(Task(description="urgent", priority=100))
+                await asyncio.sleep(0.001)
+                return TaskResult(task_id=task.id, agent_id=self.id, success=True, output="")
+
+        agents = [SpawningAgent(name=f"a{i}") for i in range(4)]
+        queue = TaskQueue(
+            agents=agents,
+            tasks=[Task(description=f"low {i}", priority=1) for i in range(8)],
+            parallel=True,
+            concurrency=AdaptiveConcurrency(initial=1, ceiling=1),
+        )
+        for agent in agents:
+            agent.queue = queue
+
+        results = queue.run()
+
+        assert order == ["low 0", "urgent"] + [f"low {i}" for i in range(1, 8)]
+        # The wait for a slot counts as queue time, not run time.
+        spans = [result.metadata["span"] for result in results]
+        assert max(span["run_time"] for span in spans) < 0.05
+        assert max(span["queue_wait"] for span in spans) > 0.005
+
+    def test_hedged_backups_need_a_slot(self):
+        @dataclass(repr=False)
+        class SlowAgent(Agent):
+            async def run_async(self, task: Task) -> TaskResult:
+                await asyncio.sleep(0.2 if task.metadata.get("hedge_of") is None else 0.0)
+                return TaskResult(task_id=task.id, agent_id=self.id, success=True, output="")
+
+        def run(limit):
+            hedger = Hedger(min_samples=1, budget=1.0)
+            hedger.observe(0.01)
+            limiter = AdaptiveConcurrency(initial=limit, ceiling=limit)
+            queue = TaskQueue(
+                agents=[SlowAgent(name="a"), SlowAgent(name="b")],
+                tasks=[Task(description="t", hedge=True)],
+                parallel=True,
+                hedger=hedger,
+                concurrency=limiter,
+            )
+            queue.run()
+            return hedger.stats()["hedged"], limiter.in_flight
+
+        assert run(1) == (0, 0)
+        assert run(2) == (1, 0)
+
+
+class TestMonitorConcurrency:
+    """Test cases for exposing limiters through Monitor."""
+
+    def test_reports_limit_and_decisions(self):
+        monitor = Monitor()
+        limiter = AdaptiveConcurrency(initial=1, ceiling=4, window=5, name="deepseek")
+        monitor.watch(limiter)
+
+        drive(StubProvider(), limiter, tasks=60)
+
+        state = monitor.concurrency()["deepseek"]
+        assert state["limit"] == limiter.limit == 4
+        assert (state["floor"], state["ceiling"]) == (1, 4)
+        assert state["decisions"]["increase:saturated"] >= 1
+        assert sum(state["decisions"].values()) == len(limiter.decisions)
+        assert monitor.decisions[-1] == ("deepseek", limiter.decisions[-1])
+
+        text = monitor.openmetrics()
+        assert 'deepseek_agent_concurrency_limit{limiter="deepseek"} 4' in text
+        assert "# TYPE deepseek_agent_concurrency_decisions counter" in text
+        assert (
+            'deepseek_agent_concurrency_decisions_total{limiter="deepseek",'
+            'action="increase",reason="saturated"}'
+        ) in text
+        assert text.endswith("# EOF\n")
+
+    def test_unwatch(self):
+        monitor = Monitor()
+        limiter = AdaptiveConcurrency(window=1)
+        monitor.watch(limiter)
+        monitor.unwatch(limiter)
+
+        drive(StubProvider(), limiter, tasks=10)
+
+        assert monitor.concurrency() == {} and not monitor.decisions
+        assert "concurrency" not in monitor.openmetrics()
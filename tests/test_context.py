@@ -0,0 +1,119 @@
+"""Tests for conversation context management."""
+
+import pytest
+
+from deepseek_code_agent import Agent, Task, Team
+from deepseek_code_agent.context import ConversationContext, message_tokens
+
+PREFIX = [{"role": "system", "content": "You are a careful engineer. " * 20}]
+
+
+class TestConversationContext:
+    """Test cases for ConversationContext."""
+
+    def test_render_lays_out_prefix_then_turns(self):
+        """Requests should start with the caller's prefix, unchanged."""
+        context = ConversationContext()
+        context.add("user", "hi")
+
+        messages = context.render(PREFIX)
+
+        assert messages[0] is PREFIX[0]
+        assert messages[1:] == [{"role": "user", "content": "hi"}]
+
+    def test_compacts_old_turns_into_summary(self):
+        """Over budget, old turns should be folded and recent ones kept."""
+        context = ConversationContext(budget=400, keep_recent=2)
+        for i in range(20):
+            context.add("user", f"step {i}: " + "x" * 100)
+            messages = context.render(PREFIX)
+            assert sum(message_tokens(m) for m in messages) <= 400
+
+        assert context.folded > 0
+        assert context.turns[-1]["content"].startswith("step 19")
+        assert f"step {19 - len(context.turns)}" in context.summary
+        assert len(context.summary) <= 400
+        assert messages[1]["content"].startswith("Summary of earlier conversation")
+
+    def test_compaction_keeps_tool_results_with_their_call(self):
+        """A folded cut should never leave a tool result at the head."""
+        context = ConversationContext(budget=200, keep_recent=1)
+        for i in range(10):
+            context.add("assistant", "calling tool " + "y" * 80)
+            context.add("tool", f"output {i} " + "z" * 80, tool_call_id=str(i))
+            context.render([])
+            assert context.turns[0]["role"] != "tool"
+
+    def test_repeated_tool_outputs_are_deduplicated(self):
+        """An identical tool output should be replaced by a back-reference."""
+        context = ConversationContext()
+        context.add("tool", "same listing", tool_call_id="a")
+        repeat = context.add("tool", "same listing", tool_call_id="b")
+
+        assert repeat == {
+            "role": "tool",
+            "content": "[same output as tool call #1]",
+            "tool_call_id": "b",
+        }
+        assert context.stats()["deduplicated_tool_outputs"] == 1
+
+    def test_folded_outputs_are_not_referred_back_to(self):
+        """A back-reference should never point at a turn folded out of the window."""
+        context = ConversationContext(budget=120, keep_recent=2)
+        context.add("tool", "listing " + "z" * 80, tool_call_id="a")
+        context.add("user", "u" * 400)
+        context.add("tool", "listing " + "z" * 80, tool_call_id="b")
+        context.render([])
+
+        assert context.turns[0]["role"] == "user"
+        assert context.turns[1]["content"] == "listing " + "z" * 80
+        repeat = context.add("tool", "listing " + "z" * 80, tool_call_id="c")
+        assert repeat["content"] == "[same output as tool call #2]"
+        assert context.stats()["deduplicated_tool_outputs"] == 1
+
+    def test_prefix_reuse_ratio(self):
+        """Reuse should count tokens matching the previous request's prefix."""
+        context = ConversationContext()
+        context.add("user", "a" * 40)
+        first = context.render(PREFIX)
+        context.add("assistant", "b" * 40)
+        second = context.render(PREFIX)
+
+        stats = context.stats()
+        sent = [sum(message_tokens(m) for m in ms) for ms in (first, second)]
+        assert stats["turn_tokens"] == sent
+        assert stats["prefix_reuse"] == pytest.approx(sum(map(message_tokens, first)) / sum(sent))
+
+    def test_rejects_non_positive_budget(self):
+        with pytest.raises(ValueError):
+            ConversationContext(budget=0)
+
+
+class TestSharedPrefix:
+    """Test cases for the team-wide request prefix."""
+
+    def test_team_members_share_first_system_message(self):
+        """Every member's requests should start with the same team prompt."""
+        coder, reviewer = Agent(name="coder", role="Coder"), Agent(name="rev", role="Reviewer")
+        team = Team(agents=[coder], name="core")
+        team.add_agent(reviewer)
+
+        first = [agent.system_messages()[0] for agent in team.agents]
+        assert first[0] == first[1] == {"role": "system", "content": team.prefix}
+        assert coder.system_messages()[1] != reviewer.system_messages()[1]
+
+    def test_run_reports_context_metrics(self):
+        """Results should carry per-turn tokens and the prefix reuse ratio."""
+        result = Agent(name="a").run(Task(description="fix lint"))
+
+        assert len(result.metadata["turn_tokens"]) == 1
+        assert result.metadata["prefix_reuse"] == 0.0
+
+    def test_run_leaves_conversation_alone(self):
+        """Runs use their own context, so concurrent runs and ask() don't mix."""
+        agent = Agent(name="a")
+        agent.context.add("user", "ongoing question")
+
+        agent.run(Task(description="fix lint"))
+
+        assert [turn["content"] for turn in agent.context.turns] == ["ongoing question"]
@@ -0,0 +1,218 @@
+"""Tests for the coordinator/worker protocol."""
+
+import asyncio
+import hashlib
+import hmac
+import multiprocessing
+import pickle
+import struct
+from dataclasses import dataclass
+
+import pytest
+
+from deepseek_code_agent import Agent, Task, TaskResult
+from deepseek_code_agent.distributed import Coordinator, ProtocolError, Worker, run_worker
+
+
+@dataclass(repr=False)
+class SleepAgent(Agent):
+    """Agent that sleeps; ``delay=None`` never finishes."""
+
+    delay: float | None = 0.01
+
+    async def run_async(self, task: Task) -> TaskResult:
+        if self.delay is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.delay)
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output=task.description)
+
+
+def make_tasks(n):
+    return [Task(description=f"task {i}") for i in range(n)]
+
+
+async def connect(address, authkey):
+    """Open a connection and pass the coordinator's handshake by hand."""
+    reader, writer = await asyncio.open_connection(*address)
+    nonce = await reader.readexactly(32)
+    writer.write(hmac.new(authkey, nonce, hashlib.sha256).digest() + b"\0" * 32)
+    await reader.readexactly(32)
+    return reader, writer
+
+
+class TestCoordinator:
+    """Test cases for Coordinator and Worker."""
+
+    def test_workers_in_separate_processes(self):
+        """Tasks should be shared by worker processes and return in order."""
+
+        async def scenario():
+            async with Coordinator(tasks=make_tasks(40)) as coordinator:
+                ctx = multiprocessing.get_context("spawn")
+                processes = [
+                    ctx.Process(
+                        target=run_worker,
+                        args=(coordinator.address, [Agent(name=f"p{p}-{i}") for i in range(2)]),
+                        kwargs={"authkey": coordinator.authkey},
+                    )
+                    for p in range(2)
+                ]
+                for process in processes:
+                    process.start()
+                try:
+                    results = await asyncio.wait_for(coordinator.run_async(), 60)
+                finally:
+                    await coordinator.close()
+                    for process in processes:
+                        process.join(10)
+                return results, processes
+
+        results, processes = asyncio.run(scenario())
+
+        assert [r.output.rsplit(": ", 1)[1] for r in results] == [f"task {i}" for i in range(40)]
+        assert all(r.success for r in results)
+        assert all(process.exitcode == 0 for process in processes)
+
+    def test_unix_socket_and_credits(self, tmp_path):
+        """A worker should never hold more tasks than its capacity."""
+        held = []
+
+        async def scenario():
+            path = str(tmp_path / "coordinator.sock")
+            async with Coordinator(path, tasks=make_tasks(30), batch_size=8) as coordinator:
+                worker = Worker(path, [SleepAgent(name="a")], coordinator.authkey, capacity=3)
+                job = asyncio.create_task(worker.run())
+
+                async def sample():
+                    while True:
+                        held.extend(w["outstanding"] for w in coordinator.workers().values())
+                        await asyncio.sleep(0.002)
+
+                sampler = asyncio.create_task(sample())
+                results = await asyncio.wait_for(coordinator.run_async(), 10)
+                sampler.cancel()
+            await asyncio.wait_for(job, 5)
+            return results
+
+        assert len(asyncio.run(scenario())) == 30
+        assert held and max(held) <= 3
+
+    def test_silent_worker_tasks_are_requeued(self):
+        """A worker that stops heartbeating should lose its tasks to others."""
+
+        async def scenario():
+            async with Coordinator(tasks=make_tasks(4), heartbeat_timeout=0.3) as coordinator:
+                hung = Worker(
+                    coordinator.address, [SleepAgent(name="hung", delay=None)],
+                    coordinator.authkey, capacity=4, heartbeat=60,
+                )
+                hung_job = asyncio.create_task(hung.run())
+                while not coordinator.workers():
+                    await asyncio.sleep(0.01)
+                healthy = Worker(
+                    coordinator.address, [SleepAgent(name="ok")], coordinator.authkey,
+                    heartbeat=0.05,
+                )
+                healthy_job = asyncio.create_task(healthy.run())
+                results = await asyncio.wait_for(coordinator.run_async(), 10)
+                lost = coordinator.lost_workers
+            await asyncio.wait_for(asyncio.gather(hung_job, healthy_job), 5)
+            return results, lost, healthy
+
+        results, lost, healthy = asyncio.run(scenario())
+        assert lost == 1
+        assert healthy.completed == 4
+        assert {r.agent_id for r in results} == {healthy.agents[0].id}
+
+    def test_reconnecting_worker_replaces_old_connection(self):
+        """A second hello under a live worker's id should requeue the first one's tasks."""
+
+        async def scenario():
+            async with Coordinator(tasks=make_tasks(4)) as coordinator:
+                stale = Worker(
+                    coordinator.address, [SleepAgent(name="stale", delay=None)],
+                    coordinator.authkey, capacity=4,
+                )
+                stale_job = asyncio.create_task(stale.run())
+                while not coordinator.workers():
+                    await asyncio.sleep(0.01)
+                fresh = Worker(coordinator.address, [SleepAgent(name="fresh")], coordinator.authkey)
+                fresh.id = stale.id
+                fresh_job = asyncio.create_task(fresh.run())
+                results = await asyncio.wait_for(coordinator.run_async(), 10)
+                workers = coordinator.workers()
+            await asyncio.wait_for(asyncio.gather(stale_job, fresh_job), 5)
+            return results, workers, fresh
+
+        results, workers, fresh = asyncio.run(scenario())
+        assert list(workers) == [fresh.id]
+        assert {r.agent_id for r in results} == {fresh.agents[0].id}
+
+    def test_wrong_authkey_is_rejected(self):
+        async def scenario():
+            async with Coordinator(authkey=b"right") as coordinator:
+                worker = Worker(coordinator.address, [Agent(name="a")], b"wrong")
+                await asyncio.wait_for(worker.run(), 5)
+                return coordinator.workers()
+
+        assert asyncio.run(scenario()) == {}
+
+    def test_coordinator_must_prove_key(self):
+        """Workers should refuse coordinators that do not know the key."""
+
+        async def scenario():
+            async def fake(reader, writer):
+                writer.write(b"\0" * 32)
+                await reader.readexactly(64)
+                writer.write(b"\0" * 32)
+                await writer.drain()
+
+            server = await asyncio.start_server(fake, "127.0.0.1", 0)
+            address = server.sockets[0].getsockname()[:2]
+            try:
+                await Worker(address, [Agent(name="a")], b"key").run()
+            finally:
+                server.close()
+
+        with pytest.raises(ProtocolError):
+            asyncio.run(scenario())
+
+    def test_worker_leaves_a_silent_coordinator(self):
+        """A worker should stop waiting once the coordinator stops heartbeating."""
+
+        async def scenario():
+            async with Coordinator(heartbeat_timeout=0.1) as live:
+                worker = Worker(
+                    live.address, [Agent(name="a")], live.authkey, heartbeat=0.02, timeout=0.1
+                )
+                job = asyncio.create_task(worker.run())
+                await asyncio.sleep(0.3)
+                assert not job.done() and live.workers()
+            await asyncio.wait_for(job, 5)
+
+            async with Coordinator(heartbeat_timeout=60) as silent:
+                worker = Worker(silent.address, [Agent(name="b")], silent.authkey, timeout=0.1)
+                await asyncio.wait_for(worker.run(), 5)
+
+        asyncio.run(scenario())
+
+    @pytest.mark.parametrize(
+        "frame",
+        [b"not a pickle", pickle.dumps(["hello"]), pickle.dumps(("hello", "oops"))],
+        ids=["garbage", "not a tuple", "bad hello"],
+    )
+    def test_malformed_frames_drop_the_peer(self, frame):
+        """Bad frames should end the connection as a ProtocolError, not a crash."""
+        errors = []
+
+        async def scenario():
+            asyncio.get_running_loop().set_exception_handler(lambda _, ctx: errors.append(ctx))
+            async with Coordinator(authkey=b"key") as coordinator:
+                reader, writer = await connect(coordinator.address, b"key")
+                writer.write(struct.pack("!I", len(frame)) + frame)
+                assert await asyncio.wait_for(reader.read(), 5) == b""
+                writer.close()
+                return coordinator.workers()
+
+        assert asyncio.run(scenario()) == {}
+        assert errors == []
@@ -0,0 +1,173 @@
+"""Tests for execution backends."""
+
+import asyncio
+import os
+import pickle
+import threading
+
+import pytest
+
+from deepseek_code_agent import Agent, Task, TaskQueue, TaskResult, Team
+from deepseek_code_agent.executors import (
+    AsyncExecutor,
+    Executor,
+    InlineExecutor,
+    ProcessExecutor,
+    ThreadExecutor,
+    make_executor,
+)
+
+
+class PidAgent(Agent):
+    """Agent that reports which process ran it."""
+
+    def run(self, task: Task) -> TaskResult:
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output=str(os.getpid()))
+
+
+class GatedAgent(Agent):
+    """Agent whose run blocks its thread until ``gate`` is set."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.gate = threading.Event()
+
+    def run(self, task: Task) -> TaskResult:
+        self.gate.wait(5)
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output="done")
+
+
+class TestPickling:
+    """Test cases for shipping work to other processes."""
+
+    def test_task_round_trip(self):
+        """Tasks should survive pickling with every field intact."""
+        task = Task(description="fix", priority=3, metadata={"k": 1}, depends_on=["x"])
+        clone = pickle.loads(pickle.dumps(task))
+
+        assert clone == task
+
+    def test_task_result_round_trip(self):
+        """Results should survive pickling with every field intact."""
+        result = TaskResult(task_id="t", agent_id="a", success=False, output="", error="e")
+
+        assert pickle.loads(pickle.dumps(result)) == result
+
+    def test_agent_ships_configuration_only(self):
+        """Agents should keep identity and config but not runtime state."""
+        agent = Agent(name="a", tools=["grep"])
+        agent.status = "running"
+        agent.add_status_listener(lambda *_: None)
+        clone = pickle.loads(pickle.dumps(agent))
+
+        assert (clone.id, clone.name, clone.tools) == (agent.id, "a", ["grep"])
+        assert clone.status == "idle"
+        assert clone.inbox is not agent.inbox
+
+
+class TestExecutors:
+    """Test cases for executor selection and backends."""
+
+    def test_make_executor_by_name(self):
+        """Names should resolve to the matching backend."""
+        assert isinstance(make_executor(None), AsyncExecutor)
+        assert isinstance(make_executor("inline"), InlineExecutor)
+        executor = make_executor("thread", max_workers=2)
+        assert isinstance(executor, ThreadExecutor)
+        executor.shutdown()
+        with pytest.raises(ValueError):
+            make_executor("gpu")
+
+    @pytest.mark.parametrize("backend", ["inline", "thread"])
+    def test_queue_runs_on_backend(self, backend):
+        """TaskQueue should run every task on the chosen backend."""
+        agents = [Agent(name="a"), Agent(name="b")]
+        queue = TaskQueue(agents=agents, parallel=True, executor=backend)
+        for i in range(4):
+            queue.add_task(Task(description=f"t{i}"))
+
+        results = queue.run()
+        queue.close()
+
+        assert [r.output.split(": ")[1] for r in results] == [f"t{i}" for i in range(4)]
+
+    def test_process_backend_reuses_workers(self):
+        """Process workers should run tasks out of process and be reused."""
+        executor = ProcessExecutor(max_workers=2)
+        executor.warm()
+        agents = [PidAgent(name="a"), PidAgent(name="b")]
+        queue = TaskQueue(agents=agents, parallel=True, executor=executor)
+        try:
+            pids = set()
+            for _ in range(2):
+                for i in range(4):
+                    queue.add_task(Task(description=f"t{i}"))
+                pids.update(r.output for r in queue.run())
+        finally:
+            queue.close()
+
+        assert str(os.getpid()) not in pids
+        assert len(pids) <= 2
+
+    def test_team_runs_plain_task_on_backend(self):
+        """A task that is not decomposed should still go through the executor."""
+        submitted = []
+
+        class RecordingExecutor(InlineExecutor):
+            async def submit(self, agent, task):
+                submitted.append(task.id)
+                return await super().submit(agent, task)
+
+        team = Team(agents=[Agent(name="a")], executor=RecordingExecutor())
+        task = Task(description="fix")
+
+        assert team.run(task).success
+        assert submitted == [task.id]
+
+    def test_executor_needs_submit(self):
+        with pytest.raises(TypeError):
+            Executor()
+
+    def test_team_pool_grows_with_members(self):
+        """Adding members beyond a named pool's size should give the team a larger pool."""
+        team = Team(agents=[Agent(name="a")], executor="thread")
+        first = team._executor
+        try:
+            team.add_agent(Agent(name="b"))
+            team.add_agent(Agent(name="c"))
+
+            assert first.max_workers == 1
+            assert team._executor.max_workers >= 3
+            assert team.run(Task(description="fix")).success
+        finally:
+            team.close()
+
+    def test_team_uses_backend(self):
+        """Team subtasks should run on the configured backend."""
+        team = Team(agents=[Agent(name="a")], executor="inline")
+        result = team.run(Task(description="refactor", decompose=True))
+
+        assert result.success
+        assert len(result.metadata["subtask_results"]) == 3
+
+    @pytest.mark.parametrize("backend", [AsyncExecutor, ThreadExecutor])
+    def test_cancel_waits_for_thread(self, backend):
+        """Cancelling a call on a thread should complete only once run() returns."""
+        agent = GatedAgent(name="a")
+        executor = backend()
+
+        async def scenario():
+            call = asyncio.ensure_future(executor.submit(agent, Task(description="t")))
+            await asyncio.sleep(0.05)
+            call.cancel()
+            await asyncio.sleep(0.05)
+            pending = not call.done()
+            agent.gate.set()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+            return pending
+
+        try:
+            assert asyncio.run(scenario())
+        finally:
+            executor.shutdown()
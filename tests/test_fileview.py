@@ -0,0 +1,84 @@
+"""Tests for memory-mapped, line-indexed file reads."""
+
+import os
+
+import pytest
+
+from deepseek_code_agent import fileview
+from deepseek_code_agent.fileview import FileView
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    fileview.clear_cache()
+    yield
+    fileview.clear_cache()
+
+
+def make_file(tmp_path, lines, trailing_newline=True):
+    path = tmp_path / "big.log"
+    text = "\n".join(lines) + ("\n" if trailing_newline and lines else "")
+    path.write_bytes(text.encode())
+    return str(path)
+
+
+class TestFileView:
+    """Test cases for FileView."""
+
+    @pytest.mark.parametrize("trailing_newline", [True, False])
+    def test_ranges_match_splitting_whole_file(self, tmp_path, trailing_newline):
+        """Lines should agree with a full read across small index blocks."""
+        expected = [f"line {i} " + "x" * (i % 37) for i in range(500)]
+        path = make_file(tmp_path, expected, trailing_newline)
+
+        with FileView(path, block_size=64) as view:
+            assert view.line_count == 500
+            for start, stop in [(0, 1), (0, 500), (123, 129), (499, 500), (250, 900), (600, 700)]:
+                assert view.lines(start, stop) == expected[start:stop]
+            assert view.lines(498) == expected[498:]
+
+    def test_empty_lines_and_empty_file(self, tmp_path):
+        path = make_file(tmp_path, ["", "a", "", ""])
+        with FileView(path, block_size=2) as view:
+            assert view.line_count == 4
+            assert view.lines(0, 4) == ["", "a", "", ""]
+            assert view.read(1, 2) == "a\n"
+
+        empty = tmp_path / "empty"
+        empty.write_bytes(b"")
+        with FileView(str(empty)) as view:
+            assert view.line_count == 0
+            assert view.lines(0, 10) == []
+
+    def test_pages(self, tmp_path):
+        path = make_file(tmp_path, [str(i) for i in range(25)])
+
+        with FileView(path) as view:
+            first, last = view.page(0, 10), view.page(2, 10)
+            beyond = view.page(5, 10)
+
+        assert first.lines == [str(i) for i in range(10)] and first.has_next
+        assert (last.start, last.stop, last.total_lines) == (20, 25, 25)
+        assert not last.has_next
+        assert beyond.lines == [] and not beyond.has_next
+        with pytest.raises(ValueError):
+            FileView(path).page(0, 0)
+
+    def test_index_cached_until_file_changes(self, tmp_path):
+        path = make_file(tmp_path, ["a", "b"])
+        with FileView(path) as first, FileView(path) as second:
+            assert first.index is second.index
+
+        with open(path, "ab") as f:
+            f.write(b"c\n")
+        os.utime(path, ns=(1, 1))
+        with FileView(path) as view:
+            assert view.index is not first.index
+            assert view.lines(0) == ["a", "b", "c"]
+
+    def test_invalid_utf8_is_replaced(self, tmp_path):
+        path = tmp_path / "bad"
+        path.write_bytes(b"ok\n\xff\xfe\n")
+
+        with FileView(str(path)) as view:
+            assert view.lines(1, 2) == ["��"]
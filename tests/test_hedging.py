@@ -0,0 +1,191 @@
+"""Tests for hedged task execution."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from deepseek_code_agent import Agent, Task, TaskQueue, TaskResult
+from deepseek_code_agent.executors import AsyncExecutor, ThreadExecutor
+from deepseek_code_agent.hedging import Hedger
+from deepseek_code_agent.pool import AgentPool
+
+
+@dataclass(repr=False)
+class ScriptedAgent(Agent):
+    """Agent with a fixed latency that records started and cancelled tasks."""
+
+    delay: float = 0.0
+    succeed: bool = True
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.started: list[Task] = []
+        self.cancelled = 0
+
+    async def run_async(self, task: Task) -> TaskResult:
+        self.started.append(task)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return TaskResult(
+            task_id=task.id, agent_id=self.id, success=self.succeed, output=self.name
+        )
+
+
+@dataclass(repr=False)
+class BlockingAgent(Agent):
+    """Synchronous agent that sleeps on its thread for ``delay`` seconds."""
+
+    delay: float = 0.0
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.finished = 0
+
+    def run(self, task: Task) -> TaskResult:
+        time.sleep(self.delay)
+        self.finished += 1
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output=self.name)
+
+
+def warmed(latency=0.01, samples=20, **kwargs):
+    hedger = Hedger(min_samples=samples, **kwargs)
+    for _ in range(samples):
+        hedger.observe(latency)
+    return hedger
+
+
+def run_one(agents, hedger, task):
+    queue = TaskQueue(agents=agents, tasks=[task], parallel=True, hedger=hedger)
+    start = time.perf_counter()
+    (result,) = queue.run()
+    return result, time.perf_counter() - start
+
+
+class TestHedger:
+    """Test cases for Hedger."""
+
+    def test_threshold_is_window_percentile(self):
+        hedger = Hedger(percentile=0.9, min_samples=5, window=10)
+        for latency in range(4):
+            hedger.observe(latency)
+        assert hedger.threshold() is None
+
+        for latency in range(4, 20):
+            hedger.observe(latency)
+
+        # The window keeps the last 10 samples, 10..19.
+        assert hedger.threshold() == 19
+
+    def test_slow_primary_loses_to_backup(self):
+        slow = ScriptedAgent(name="slow", delay=1.0)
+        fast = ScriptedAgent(name="fast", delay=0.01)
+        hedger = warmed(budget=1.0)
+
+        result, elapsed = run_one([slow, fast], hedger, Task("fix", hedge=True))
+
+        assert result.output == "fast" and result.metadata["hedge_won"]
+        assert elapsed < 0.5
+        assert slow.cancelled == 1
+        stats = hedger.stats()
+        assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+        assert stats["extra_call_ratio"] == 1.0
+
+    def test_primary_that_finishes_first_wins(self):
+        primary = ScriptedAgent(name="primary", delay=0.05)
+        backup = ScriptedAgent(name="backup", delay=1.0)
+
+        result, _ = run_one([primary, backup], warmed(budget=1.0), Task("fix", hedge=True))
+
+        assert result.output == "primary"
+        assert result.metadata["hedged"] and "hedge_won" not in result.metadata
+        assert backup.cancelled == 1
+
+    def test_tasks_must_opt_in(self):
+        slow = ScriptedAgent(name="slow", delay=0.05)
+        fast = ScriptedAgent(name="fast")
+        hedger = warmed(budget=1.0)
+
+        result, _ = run_one([slow, fast], hedger, Task("fix"))
+
+        assert result.output == "slow"
+        assert fast.started == [] and hedger.hedged == 0
+
+    def test_budget_caps_extra_calls(self):
+        slow = ScriptedAgent(name="slow", delay=0.05)
+        fast = ScriptedAgent(name="fast")
+        hedger = warmed(budget=0.0)
+
+        result, _ = run_one([slow, fast], hedger, Task("fix", hedge=True))
+
+        assert result.output == "slow"
+        assert hedger.stats()["denied"] == 1 and fast.started == []
+
+    def test_both_failing_returns_primary_failure(self):
+        primary = ScriptedAgent(name="primary", delay=0.05, succeed=False)
+        backup = ScriptedAgent(name="backup", delay=0.0, succeed=False)
+
+        result, _ = run_one([primary, backup], warmed(budget=1.0), Task("fix", hedge=True))
+
+        assert not result.success and result.output == "primary"
+
+    def test_backup_switches_strategy_and_model(self):
+        slow = ScriptedAgent(name="slow", delay=1.0, model="deepseek-chat")
+        fast = ScriptedAgent(name="fast", model="deepseek-chat")
+        hedger = warmed(budget=1.0, models=["deepseek-chat", "deepseek-reasoner"])
+        task = Task("fix", hedge=True, strategies=["by_feature", "by_layer"])
+
+        run_one([slow, fast], hedger, task)
+
+        (backup,) = fast.started
+        assert backup.id == task.id
+        assert backup.metadata["strategy"] == "by_layer"
+        assert backup.metadata["model"] == "deepseek-reasoner"
+        assert backup.metadata["hedge_of"] == task.id
+
+    def test_backup_keeps_hedge_and_requirements(self):
+        task = Task("fix", hedge=True, requires=["tool:grep"], priority=4)
+
+        backup = Hedger().variant(Agent(name="a"), task)
+
+        assert (backup.hedge, backup.requires, backup.priority) == (True, ["tool:grep"], 4)
+
+    @pytest.mark.parametrize("executor", [AsyncExecutor, ThreadExecutor])
+    def test_losing_thread_keeps_its_agent(self, executor):
+        """A primary that cannot be interrupted stays checked out until it returns."""
+        slow = BlockingAgent(name="slow", delay=0.3)
+        fast = BlockingAgent(name="fast")
+        backend = executor()
+
+        async def scenario():
+            pool = AgentPool([slow, fast])
+            agent = pool.try_checkout()
+            result = await warmed(budget=1.0).run(
+                agent, Task("fix", hedge=True), backend.submit, pool
+            )
+            pool.release(agent)
+            held = pool.load(slow), pool.try_checkout()
+            while pool.load(slow):
+                await asyncio.sleep(0.01)
+            return result, held
+
+        try:
+            result, (load, other) = asyncio.run(scenario())
+        finally:
+            backend.shutdown()
+
+        assert result.output == "fast"
+        assert load == 1 and other is fast
+        assert slow.finished == 1
+
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            Hedger(percentile=1.0)
+        with pytest.raises(ValueError):
+            Hedger(budget=-0.1)
+        with pytest.raises(ValueError):
+            Hedger(window=5, min_samples=10)
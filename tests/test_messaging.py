@@ -0,0 +1,215 @@
+"""Tests for inter-agent messaging."""
+
+import asyncio
+import pickle
+
+import pytest
+
+from deepseek_code_agent import Agent
+from deepseek_code_agent.messaging import (
+    Mailbox,
+    MailboxFull,
+    MailboxFullError,
+    Message,
+    MessageBus,
+    OverflowPolicy,
+)
+
+
+def make_message(to_agent: str, content: str = "hi") -> Message:
+    return Message(from_agent="sender", to_agent=to_agent, content=content)
+
+
+class TestMessageBus:
+    """Test cases for MessageBus."""
+
+    def test_subscribe_returns_only_recipient_messages(self):
+        """Each agent should only see its own mail."""
+        bus = MessageBus()
+        bus.publish(make_message("a", "one"))
+        bus.publish(make_message("b", "two"))
+        bus.publish(make_message("a", "three"))
+
+        assert [m.content for m in bus.subscribe("a")] == ["one", "three"]
+        assert [m.content for m in bus.subscribe("b")] == ["two"]
+
+    def test_subscribe_consumes_messages(self):
+        """Delivered messages should not be returned again."""
+        bus = MessageBus()
+        bus.publish(make_message("a"))
+
+        assert len(bus.subscribe("a")) == 1
+        assert bus.subscribe("a") == []
+        assert len(bus) == 0
+
+    def test_count_retention_evicts_oldest(self):
+        """Mailboxes should keep only the newest max_messages."""
+        bus = MessageBus(max_messages=2)
+        for i in range(5):
+            bus.publish(make_message("a", str(i)))
+
+        assert bus.pending("a") == 2
+        assert bus.evicted == 3
+        assert [m.content for m in bus.subscribe("a")] == ["3", "4"]
+
+    def test_age_retention_drops_stale_messages(self, clock):
+        """Messages older than max_age should not be delivered."""
+        bus = MessageBus(max_age=10, clock=clock)
+        bus.publish(make_message("a", "old"))
+        bus.publish(make_message("b", "other"))
+        clock.now = 8
+        bus.publish(make_message("a", "new"))
+        clock.now = 15
+
+        assert [m.content for m in bus.subscribe("a")] == ["new"]
+        assert bus.expire() == 1
+        assert bus.pending("b") == 0
+
+    def test_invalid_retention(self):
+        """Retention limits must be positive."""
+        with pytest.raises(ValueError):
+            MessageBus(max_messages=0)
+        with pytest.raises(ValueError):
+            MessageBus(max_age=0)
+
+
+class TestBroadcast:
+    """Test cases for broadcast, topics and the outbox pump."""
+
+    def test_broadcast_shares_one_message(self):
+        """Every recipient should receive the same object, not a copy."""
+        bus = MessageBus()
+        for agent_id in ("sender", "a", "b", "c"):
+            bus.register(agent_id)
+        message = make_message("*", "plan")
+
+        assert bus.broadcast(message) == 3
+        received = [bus.subscribe(agent_id) for agent_id in ("a", "b", "c")]
+
+        assert all(inbox == [message] and inbox[0] is message for inbox in received)
+        assert bus.subscribe("sender") == []
+
+    def test_binary_payloads_are_read_only_views(self):
+        blob = bytearray(b"diff --git a b")
+        message = Message(from_agent="s", to_agent="*", content=blob)
+        blob[0:4] = b"XXXX"
+
+        assert isinstance(message.content, memoryview) and message.content.readonly
+        assert message.content == b"diff --git a b"
+
+        data = b"x" * 1024
+        shared = Message(from_agent="s", to_agent="*", content=data)
+        assert shared.content.obj is data
+
+        copy = pickle.loads(pickle.dumps(shared))
+        assert copy == shared and isinstance(copy.content, memoryview)
+
+    def test_topics_reach_members_only(self):
+        bus = MessageBus()
+        bus.join("a", "plans")
+        bus.join("b", "plans")
+        bus.join("c", "diffs")
+        bus.leave("b", "plans")
+
+        assert bus.publish_topic("plans", make_message("topic:plans", "v2")) == 1
+        assert [m.content for m in bus.subscribe("a")] == ["v2"]
+        assert bus.subscribe("b") == [] and bus.subscribe("c") == []
+        assert bus.publish_topic("nobody", make_message("topic:nobody")) == 0
+
+        bus.remove("c")
+        assert "diffs" not in bus.topics
+
+    def test_pump_drains_outboxes_in_order(self):
+        alice, bob, carol = Agent(name="alice"), Agent(name="bob"), Agent(name="carol")
+        alice.send_to(bob, "one")
+        alice.send_to(carol, "two")
+        carol.send_to(bob, "three")
+        bus = MessageBus()
+
+        assert bus.pump([alice, bob, carol]) == 3
+
+        assert not alice.outbox and not carol.outbox
+        assert [bob.receive().content, bob.receive().content] == ["one", "three"]
+        assert carol.receive().content == "two"
+        assert len(bus) == 0
+
+    def test_pump_respects_inbox_policy(self):
+        """A full BLOCK inbox should hold messages back; REJECT should refuse them."""
+        alice = Agent(name="alice")
+        bob = Agent(name="bob", inbox_size=1)
+        carol = Agent(name="carol", inbox_size=1, overflow=OverflowPolicy.REJECT)
+        for content in ("one", "two"):
+            alice.send_to(bob, content)
+            alice.send_to(carol, content)
+
+        assert MessageBus().pump([alice]) == 2
+        assert [m.to_agent for m in alice.outbox] == [bob.id, carol.id]
+        bob.receive()
+        assert MessageBus().pump([alice]) == 1
+        assert carol.inbox.rejected == 1 and not alice.outbox
+
+
+class TestMailbox:
+    """Test cases for Mailbox."""
+
+    def test_fifo_order(self):
+        """Messages should come out in arrival order."""
+        mailbox = Mailbox()
+        for i in range(3):
+            mailbox.put_nowait(make_message("a", str(i)))
+
+        assert [mailbox.get_nowait().content for _ in range(3)] == ["0", "1", "2"]
+        assert mailbox.get_nowait() is None
+
+    def test_drop_oldest_policy(self):
+        """DROP_OLDEST should evict the oldest message when full."""
+        mailbox = Mailbox(maxsize=2, overflow=OverflowPolicy.DROP_OLDEST)
+        for i in range(3):
+            assert mailbox.offer(make_message("a", str(i)))
+
+        assert mailbox.dropped == 1
+        assert [mailbox.get_nowait().content for _ in range(2)] == ["1", "2"]
+
+    def test_reject_policy(self):
+        """REJECT should refuse new messages when full."""
+        mailbox = Mailbox(maxsize=1, overflow=OverflowPolicy.REJECT)
+        mailbox.put_nowait(make_message("a", "kept"))
+
+        assert mailbox.offer(make_message("a", "refused")) is False
+        with pytest.raises(MailboxFullError):
+            asyncio.run(mailbox.put(make_message("a", "refused")))
+        assert mailbox.rejected == 2
+        assert mailbox.get_nowait().content == "kept"
+
+    def test_mailbox_full_alias(self):
+        """The old exception name should still catch refusals."""
+        assert MailboxFull is MailboxFullError
+
+    def test_get_waits_for_message(self):
+        """An awaiting receiver should wake when a message arrives."""
+        mailbox = Mailbox()
+
+        async def scenario():
+            receiver = asyncio.create_task(mailbox.get())
+            await asyncio.sleep(0)
+            assert not receiver.done()
+            mailbox.put_nowait(make_message("a", "wake"))
+            return await asyncio.wait_for(receiver, 1)
+
+        assert asyncio.run(scenario()).content == "wake"
+
+    def test_block_policy_applies_backpressure(self):
+        """A BLOCK sender should wait until the receiver makes room."""
+        mailbox = Mailbox(maxsize=1)
+
+        async def scenario():
+            await mailbox.put(make_message("a", "first"))
+            sender = asyncio.create_task(mailbox.put(make_message("a", "second")))
+            await asyncio.sleep(0)
+            assert not sender.done()
+            first = await mailbox.get()
+            await asyncio.wait_for(sender, 1)
+            return first, await mailbox.get()
+
+        first, second = asyncio.run(scenario())
+        assert (first.content, second.content) == ("first", "second")
@@ -0,0 +1,73 @@
+"""Tests for agent monitoring."""
+
+from deepseek_code_agent import Agent, Monitor, Task
+
+
+class TestMonitor:
+    """Test cases for Monitor."""
+
+    def test_status_buckets_follow_agent_changes(self):
+        """Idle and running lookups should track status changes."""
+        a, b = Agent(name="a"), Agent(name="b")
+        monitor = Monitor()
+        monitor.track(a)
+        monitor.track(b)
+
+        a.status = "running"
+
+        assert monitor.get_running_agents() == [a]
+        assert monitor.get_idle_agents() == [b]
+        assert monitor.get_idle_agent() is b
+        assert monitor.count("running") == 1
+
+    def test_constructor_agents_are_indexed(self):
+        """Agents passed at construction should be tracked like track()."""
+        agent = Agent(name="a")
+        monitor = Monitor(agents={agent.id: agent})
+
+        agent.status = "running"
+
+        assert monitor.get_running_agents() == [agent]
+
+    def test_status_snapshot_includes_current_task(self):
+        """Snapshots should reflect the task an agent is running."""
+        agent = Agent(name="a")
+        monitor = Monitor()
+        monitor.track(agent)
+        seen = []
+        agent.add_status_listener(lambda *_: seen.append(monitor.status()[agent.id]))
+
+        agent.run(Task(description="fix lint"))
+
+        assert [s["current_task"] for s in seen] == ["fix lint", None]
+        assert monitor.status()[agent.id]["status"] == "idle"
+
+    def test_status_delta_returns_only_changes(self):
+        """Deltas should contain agents changed since the given version."""
+        a, b = Agent(name="a"), Agent(name="b")
+        monitor = Monitor()
+        monitor.track(a)
+        monitor.track(b)
+        version, delta = monitor.status_delta()
+        assert set(delta) == {a.id, b.id}
+
+        b.status = "running"
+        version, delta = monitor.status_delta(since=version)
+        assert delta == {b.id: monitor.status()[b.id]}
+
+        monitor.untrack(a)
+        version, delta = monitor.status_delta(since=version)
+        assert delta == {a.id: None}
+        assert monitor.status_delta(since=version) == (version, {})
+
+    def test_untrack_stops_updates(self):
+        """Untracked agents should no longer appear in buckets."""
+        agent = Agent(name="a")
+        monitor = Monitor()
+        monitor.track(agent)
+        monitor.untrack(agent)
+
+        agent.status = "running"
+
+        assert monitor.get_running_agents() == []
+        assert monitor.status() == {}
@@ -0,0 +1,110 @@
+"""Tests for the agent pool."""
+
+import asyncio
+
+import pytest
+
+from deepseek_code_agent import Agent
+from deepseek_code_agent.pool import AgentPool
+
+
+class TestAgentPool:
+    """Test cases for AgentPool."""
+
+    def test_idle_agents_checked_out_first(self):
+        """Every agent should be used once before any doubles up."""
+        agents = [Agent(name=f"a{i}") for i in range(3)]
+        pool = AgentPool(agents, capacity=2)
+
+        first = [pool.try_checkout() for _ in range(3)]
+
+        assert first == agents
+        assert all(pool.load(agent) == 1 for agent in agents)
+
+    def test_overflow_prefers_lower_latency(self):
+        """Busy agents with spare capacity should be ordered by EWMA latency."""
+        slow, fast = Agent(name="slow"), Agent(name="fast")
+        pool = AgentPool([slow, fast], capacity=2)
+        for agent, latency in ((slow, 2.0), (fast, 0.5)):
+            pool.try_checkout()
+            pool.release(agent, latency)
+        pool.try_checkout()
+        pool.try_checkout()
+
+        assert pool.try_checkout() is fast
+        assert pool.try_checkout() is slow
+        assert pool.try_checkout() is None
+
+    def test_checkout_waits_for_release(self):
+        """Checkout should wait rather than exceed capacity."""
+        agent = Agent(name="a")
+        pool = AgentPool([agent])
+
+        async def scenario():
+            pool.try_checkout()
+            waiter = asyncio.create_task(pool.checkout())
+            await asyncio.sleep(0)
+            assert not waiter.done()
+            pool.release(agent)
+            return await asyncio.wait_for(waiter, 1)
+
+        assert asyncio.run(scenario()) is agent
+
+    def test_claim_shares_load_with_checkout(self):
+        """A claimed agent should not be handed out again until released."""
+        first, second = Agent(name="a"), Agent(name="b")
+        pool = AgentPool([first, second])
+
+        assert pool.claim(second)
+        assert not pool.claim(second)
+        assert pool.try_checkout() is first
+        assert pool.try_checkout() is None
+
+        async def scenario():
+            waiter = asyncio.create_task(pool.released())
+            await asyncio.sleep(0)
+            pool.release(second)
+            await asyncio.wait_for(waiter, 1)
+            return pool.claim(second)
+
+        assert asyncio.run(scenario())
+
+    def test_removed_agent_leaves_on_release(self):
+        first, second = Agent(name="a"), Agent(name="b")
+        pool = AgentPool([first])
+        pool.try_checkout()
+        pool.add(second)
+        pool.remove(first)
+
+        pool.release(first)
+
+        assert pool.try_checkout() is second
+        assert pool.try_checkout() is None
+        assert first.id not in pool.in_flight
+
+    def test_retained_agent_waits_for_every_release(self):
+        agent = Agent(name="a")
+        pool = AgentPool([agent])
+        pool.try_checkout()
+        pool.retain(agent)
+
+        pool.release(agent)
+        assert pool.try_checkout() is None
+        pool.release(agent)
+        assert pool.try_checkout() is agent
+
+    def test_release_updates_ewma(self):
+        """Latency should be smoothed with the configured alpha."""
+        agent = Agent(name="a")
+        pool = AgentPool([agent], alpha=0.5)
+        for latency in (1.0, 3.0):
+            pool.try_checkout()
+            pool.release(agent, latency)
+
+        assert pool.latency[agent.id] == 2.0
+        assert pool.completed[agent.id] == 2
+
+    def test_invalid_capacity(self):
+        """Capacity must be positive."""
+        with pytest.raises(ValueError):
+            AgentPool([], capacity=0)
@@ -0,0 +1,263 @@
+"""Tests for the task queue."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from deepseek_code_agent import Agent, Task, TaskQueue, TaskResult
+
+
+@dataclass(repr=False)
+class SlowAgent(Agent):
+    """Agent that sleeps before completing, recording peak concurrency."""
+
+    delay: float = 0.05
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.active = 0
+        self.peak = 0
+
+    async def run_async(self, task: Task) -> TaskResult:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output=task.description)
+
+
+class FailingAgent(Agent):
+    """Agent whose run always raises."""
+
+    def run(self, task: Task) -> TaskResult:
+        raise RuntimeError("model unavailable")
+
+
+class TestTaskQueue:
+    """Test cases for TaskQueue."""
+
+    def test_sequential_run(self):
+        """Sequential queues should run every task in order."""
+        queue = TaskQueue(agents=[Agent(name="a")])
+        tasks = [Task(description=f"t{i}") for i in range(3)]
+        for task in tasks:
+            queue.add_task(task)
+
+        results = queue.run()
+
+        assert [r.task_id for r in results] == [t.id for t in tasks]
+        assert all(r.success for r in results)
+        assert queue.tasks == []
+
+    def test_tasks_is_a_read_only_view(self):
+        """Work must go through add_task, which schedules it."""
+        given = [Task(description="a")]
+        queue = TaskQueue(agents=[Agent(name="a")], tasks=given)
+        extra = Task(description="b")
+        queue.add_task(extra)
+
+        assert list(queue.tasks) == [given[0], extra] and len(given) == 1
+        with pytest.raises(AttributeError):
+            queue.tasks.append(Task(description="c"))
+        assert len(queue.run()) == 2
+
+    def test_runs_highest_priority_first(self):
+        """Higher priority tasks should be dispatched before lower ones."""
+        order = []
+
+        class RecordingAgent(Agent):
+            def run(self, task: Task) -> TaskResult:
+                order.append(task.description)
+                return super().run(task)
+
+        queue = TaskQueue(agents=[RecordingAgent(name="a")])
+        queue.add_task(Task(description="batch", priority=0))
+        queue.add_task(Task(description="urgent", priority=10))
+        queue.add_task(Task(description="normal", priority=5))
+
+        results = queue.run()
+
+        assert order == ["urgent", "normal", "batch"]
+        assert [r.output.split(": ")[1] for r in results] == ["batch", "urgent", "normal"]
+
+    def test_tasks_added_while_draining(self):
+        """Tasks added by running tasks should join the current batch."""
+
+        @dataclass(repr=False)
+        class SpawningAgent(SlowAgent):
+            queue: TaskQueue | None = None
+
+            async def run_async(self, task: Task) -> TaskResult:
+                if task.description == "parent":
+                    self.queue.add_task(Task(description="child"))
+                return await super().run_async(task)
+
+        agent = SpawningAgent(name="a", delay=0.01)
+        queue = TaskQueue(agents=[agent], parallel=True)
+        agent.queue = queue
+        queue.add_task(Task(description="parent"))
+
+        results = queue.run()
+
+        assert [r.output for r in results] == ["parent", "child"]
+
+    def test_parallel_run_is_concurrent(self):
+        """Parallel queues should overlap task latency across agents."""
+        agents = [SlowAgent(name=f"a{i}", delay=0.05) for i in range(4)]
+        queue = TaskQueue(agents=agents, parallel=True, max_concurrency=4)
+        for i in range(8):
+            queue.add_task(Task(description=f"t{i}"))
+
+        start = time.perf_counter()
+        results = queue.run()
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 8
+        assert elapsed < 0.05 * 8 / 2
+
+    def test_parallel_results_in_submission_order(self):
+        """Results should follow submission order, not completion order."""
+        agents = [SlowAgent(name="slow", delay=0.05), SlowAgent(name="fast", delay=0.0)]
+        queue = TaskQueue(agents=agents, parallel=True, max_concurrency=2)
+        for i in range(6):
+            queue.add_task(Task(description=f"t{i}"))
+
+        results = queue.run()
+
+        assert [r.output for r in results] == [f"t{i}" for i in range(6)]
+
+    def test_global_concurrency_limit(self):
+        """No more than max_concurrency tasks should run at once."""
+        agent = SlowAgent(name="a", delay=0.01)
+        queue = TaskQueue(
+            agents=[agent], parallel=True, max_concurrency=3, per_agent_concurrency=10
+        )
+        for i in range(12):
+            queue.add_task(Task(description=f"t{i}"))
+
+        queue.run()
+
+        assert agent.peak == 3
+
+    def test_per_agent_concurrency_limit(self):
+        """No agent should hold more than per_agent_concurrency tasks."""
+        agents = [SlowAgent(name=f"a{i}", delay=0.01) for i in range(2)]
+        queue = TaskQueue(
+            agents=agents, parallel=True, max_concurrency=10, per_agent_concurrency=2
+        )
+        for i in range(12):
+            queue.add_task(Task(description=f"t{i}"))
+
+        queue.run()
+
+        assert [a.peak for a in agents] == [2, 2]
+
+    def test_failures_become_results(self):
+        """Agent exceptions should surface as failed results."""
+        queue = TaskQueue(agents=[FailingAgent(name="a")], parallel=True)
+        queue.add_task(Task(description="t"))
+
+        [result] = queue.run()
+
+        assert result.success is False
+        assert result.error == "model unavailable"
+
+    def test_sequential_failures_become_results(self):
+        """A failing task should not stop a sequential batch."""
+
+        class FlakyAgent(Agent):
+            def run(self, task: Task) -> TaskResult:
+                if task.description == "bad":
+                    raise RuntimeError("model unavailable")
+                return super().run(task)
+
+        queue = TaskQueue(
+            agents=[FlakyAgent(name="a")],
+            tasks=[Task(description=d) for d in ("ok", "bad", "fine")],
+        )
+
+        results = queue.run()
+
+        assert [r.success for r in results] == [True, False, True]
+        assert results[1].error == "model unavailable"
+
+    def test_invalid_concurrency(self):
+        """Concurrency limits must be positive."""
+        with pytest.raises(ValueError):
+            TaskQueue(max_concurrency=0)
+
+    def test_sequential_run_refuses_parallel_options(self):
+        """Options that only apply to parallel runs should not be ignored."""
+        queue = TaskQueue(agents=[Agent(name="a")], tasks=[Task("x")], executor="inline")
+
+        with pytest.raises(ValueError, match="parallel=True"):
+            queue.run()
+        queue.parallel = True
+        assert queue.run()[0].success
+
+
+class TestStreaming:
+    """Test cases for streaming results."""
+
+    def test_iter_results_in_completion_order(self):
+        """Faster tasks should be yielded before slower ones."""
+        agents = [SlowAgent(name="slow", delay=0.05), SlowAgent(name="fast", delay=0.0)]
+        queue = TaskQueue(agents=agents, parallel=True, max_concurrency=2)
+        queue.add_task(Task(description="slow one"))
+        queue.add_task(Task(description="fast one"))
+
+        outputs = [r.output for r in queue.iter_results()]
+
+        assert outputs == ["fast one", "slow one"]
+        assert queue.tasks == []
+
+    def test_sequential_iter_results(self):
+        """Sequential queues should stream results one task at a time."""
+        queue = TaskQueue(agents=[Agent(name="a")])
+        for i in range(3):
+            queue.add_task(Task(description=f"t{i}"))
+
+        stream = queue.iter_results()
+        first = next(stream)
+
+        assert first.output.endswith("t0")
+        assert len(list(stream)) == 2
+
+    def test_bounded_buffer_pauses_workers(self):
+        """With a full buffer, workers should not run ahead of the consumer."""
+        agent = SlowAgent(name="a", delay=0)
+        queue = TaskQueue(
+            agents=[agent], parallel=True, max_concurrency=4, per_agent_concurrency=4
+        )
+        for i in range(20):
+            queue.add_task(Task(description=f"t{i}"))
+
+        async def consume():
+            seen = []
+            stream = queue.aiter_results(buffer=2)
+            seen.append(await anext(stream))
+            await asyncio.sleep(0.01)
+            started = len(queue.tasks) - len(queue._scheduler)
+            async for result in stream:
+                seen.append(result)
+            return started, seen
+
+        started, seen = asyncio.run(consume())
+
+        assert started <= 1 + 2 + 4
+        assert len(seen) == 20
+
+    def test_closing_stream_early_cancels_batch(self):
+        """Abandoning the stream should drop the rest of the batch."""
+        queue = TaskQueue(agents=[SlowAgent(name="a", delay=0.01)], parallel=True)
+        for i in range(5):
+            queue.add_task(Task(description=f"t{i}"))
+
+        stream = queue.iter_results()
+        next(stream)
+        stream.close()
+
+        assert queue.tasks == []
+        assert queue.run() == []
@@ -0,0 +1,137 @@
+"""Tests for the model rate limiter."""
+
+import asyncio
+
+import pytest
+
+from deepseek_code_agent.ratelimit import RateLimiter, TokenBucket, estimate_tokens
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket."""
+
+    def test_refills_at_per_minute_rate(self, clock):
+        """An empty bucket should refill rate/60 units per second."""
+        bucket = TokenBucket(60, clock)
+        bucket.consume(60)
+
+        assert bucket.wait_time(1) == pytest.approx(1.0)
+        clock.now = 0.5
+        assert bucket.wait_time(1) == pytest.approx(0.5)
+        clock.now = 120
+        assert bucket.wait_time(60) == 0 and bucket.level == 60
+
+    def test_oversized_request_waits_for_full_bucket(self, clock):
+        """Requests above capacity should not wait forever."""
+        bucket = TokenBucket(60, clock)
+        assert bucket.wait_time(1000) == 0
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(0)
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter."""
+
+    def test_unconfigured_model_is_unlimited(self):
+        """Models without limits should never wait."""
+        limiter = RateLimiter()
+
+        async def main():
+            return [await limiter.acquire("free", 10**6) for _ in range(100)]
+
+        assert all(r.waited == 0 for r in asyncio.run(main()))
+
+    def test_waits_for_token_budget(self):
+        """Calls beyond the tokens-per-minute budget should be paced."""
+        limiter = RateLimiter()
+        limiter.configure("m", tpm=6000)
+
+        async def main():
+            await limiter.acquire("m", 6000)
+            return await limiter.acquire("m", 10)
+
+        reservation = asyncio.run(main())
+        assert reservation.waited == pytest.approx(0.1, abs=0.05)
+
+    def test_waiters_granted_by_priority(self):
+        """Higher-priority calls should jump the queue."""
+        limiter = RateLimiter()
+        limiter.configure("m", rpm=600)
+        order = []
+
+        async def call(name, priority):
+            await limiter.acquire("m", 1, priority)
+            order.append(name)
+
+        async def main():
+            for _ in range(600):
+                await limiter.acquire("m", 1)
+            low = asyncio.create_task(call("low", 0))
+            await asyncio.sleep(0)
+            high = asyncio.create_task(call("high", 5))
+            await asyncio.gather(low, high)
+
+        asyncio.run(main())
+        assert order == ["high", "low"]
+
+    def test_dispatch_is_linear_in_waiters(self):
+        """Each waiter should not start its own timer chain."""
+        calls = 0
+
+        class CountingLimiter(RateLimiter):
+            def _dispatch(self, state):
+                nonlocal calls
+                calls += 1
+                super()._dispatch(state)
+
+        limiter = CountingLimiter()
+        limiter.configure("m", rpm=6000)
+
+        async def main():
+            for _ in range(6000):
+                await limiter.acquire("m", 1)
+            await asyncio.gather(*(limiter.acquire("m", 1) for _ in range(40)))
+
+        asyncio.run(main())
+        # One dispatch per acquire plus about one per timer firing, where a
+        # timer chain per waiter made it quadratic.
+        assert calls < 200
+
+    def test_settle_corrects_estimate(self, clock):
+        """Settling should charge or refund the difference to the token bucket."""
+        limiter = RateLimiter(clock)
+        limiter.configure("m", tpm=1000)
+
+        async def main():
+            reservation = await limiter.acquire("m", 100)
+            reservation.settle(300)
+            return reservation
+
+        reservation = asyncio.run(main())
+        bucket = limiter._models["m"].tokens
+        assert reservation.tokens == 300
+        assert bucket.level == pytest.approx(700)
+        reservation.settle(50)
+        assert bucket.level == pytest.approx(950)
+
+    def test_metrics_report_waits(self):
+        """Metrics should expose grants and wait times per model."""
+        limiter = RateLimiter()
+        limiter.configure("m", rpm=600)
+
+        async def main():
+            for _ in range(601):
+                await limiter.acquire("m", 1)
+
+        asyncio.run(main())
+        stats = limiter.metrics()["m"]
+        assert stats["granted"] == 601
+        assert stats["queued"] == 0
+        assert stats["max_wait"] > 0
+
+
+def test_estimate_tokens_counts_characters_and_completion():
+    messages = [{"role": "user", "content": "x" * 400}]
+    assert estimate_tokens(messages, completion=100) == 100 + 4 + 100
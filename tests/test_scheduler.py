@@ -0,0 +1,62 @@
+"""Tests for the priority scheduler."""
+
+import pytest
+
+from deepseek_code_agent.scheduler import PriorityScheduler
+
+
+class TestPriorityScheduler:
+    """Test cases for PriorityScheduler."""
+
+    def test_pops_highest_priority_first(self):
+        """Items should pop in descending priority."""
+        scheduler = PriorityScheduler()
+        for priority in (1, 5, 3):
+            scheduler.push(priority, priority)
+
+        assert [scheduler.pop() for _ in range(3)] == [5, 3, 1]
+
+    def test_equal_priorities_are_fifo(self):
+        """Ties should pop in insertion order."""
+        scheduler = PriorityScheduler()
+        for item in "abc":
+            scheduler.push(item)
+
+        assert [scheduler.pop() for _ in range(3)] == ["a", "b", "c"]
+
+    def test_aging_prevents_starvation(self, clock):
+        """A long-waiting low priority item should overtake fresh high ones."""
+        scheduler = PriorityScheduler(aging=1.0, clock=clock)
+        scheduler.push("old", priority=0)
+        clock.now = 5.0
+        scheduler.push("recent", priority=3)
+        scheduler.push("urgent", priority=10)
+
+        assert [scheduler.pop() for _ in range(3)] == ["urgent", "old", "recent"]
+
+    def test_keyed_moves_keep_age(self, clock):
+        """An item moved to another scheduler should keep the age it built up."""
+        source = PriorityScheduler(aging=1.0, clock=clock)
+        target = PriorityScheduler(aging=1.0, clock=clock)
+        source.push("old", priority=0)
+        clock.now = 5.0
+        target.push("recent", priority=3)
+
+        target.push_keyed(*source.pop_keyed())
+
+        assert [target.pop() for _ in range(2)] == ["old", "recent"]
+
+    def test_len_and_peek(self):
+        """Length and peek should reflect pending items."""
+        scheduler = PriorityScheduler()
+        assert not scheduler
+        scheduler.push("a", 1)
+        scheduler.push("b", 2)
+
+        assert len(scheduler) == 2
+        assert scheduler.peek() == "b"
+
+    def test_negative_aging_rejected(self):
+        """Aging must not be negative."""
+        with pytest.raises(ValueError):
+            PriorityScheduler(aging=-1)
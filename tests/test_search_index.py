@@ -0,0 +1,187 @@
+"""Tests for the trigram search index."""
+
+import asyncio
+import os
+import pickle
+import threading
+
+import pytest
+
+from deepseek_code_agent import Agent, Task, Team
+from deepseek_code_agent.search_index import SearchIndex, glob_to_regex, required_trigrams
+
+
+def write(root, rel, content):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path):
+    write(tmp_path, "src/app.py", "def hello():\n    return 'hi'\n\ndef world(): hello()\n")
+    write(tmp_path, "src/util/helpers.py", "import os\n")
+    write(tmp_path, "README.md", "Hello there\n")
+    write(tmp_path, ".git/config", "def hello")
+    (tmp_path / "blob.bin").write_bytes(b"\0def hello")
+    return tmp_path
+
+
+class TestSearchIndex:
+    """Test cases for SearchIndex."""
+
+    def test_grep_finds_matching_lines(self, tree):
+        index = SearchIndex(str(tree))
+        index.refresh()
+
+        matches = index.grep(r"def \w+\(")
+
+        assert [(m.path, m.line_number, m.line) for m in matches] == [
+            ("src/app.py", 1, "def hello():"),
+            ("src/app.py", 4, "def world(): hello()"),
+        ]
+
+    def test_crlf_lines_match_as_written(self, tmp_path):
+        """Patterns should see CRLF endings, as the trigram filter does."""
+        (tmp_path / "dos.txt").write_bytes(b"one\r\ntwo\r\n")
+        index = SearchIndex(str(tmp_path))
+        index.refresh()
+
+        matches = index.grep(r"one\r\ntwo")
+
+        assert [(m.line_number, m.line) for m in matches] == [(1, "one")]
+        assert [m.line for m in index.grep(r"two\r$")] == ["two"]
+
+    def test_trigrams_narrow_candidates(self, tree):
+        index = SearchIndex(str(tree))
+        index.refresh()
+
+        assert index.candidates("hello") == ["README.md", "src/app.py"]
+        assert index.candidates("import os") == ["src/util/helpers.py"]
+        assert index.candidates("nowhere") == []
+        assert [m.path for m in index.grep("hello", ignore_case=True)] == [
+            "README.md", "src/app.py", "src/app.py",
+        ]
+
+    def test_glob_uses_cached_paths(self, tree):
+        index = SearchIndex(str(tree))
+        index.refresh()
+
+        assert index.glob("*.py") == []
+        assert index.glob("**/*.py") == ["src/app.py", "src/util/helpers.py"]
+        assert index.glob("*.py", path="src") == ["src/app.py"]
+        assert index.glob("*") == ["README.md", "blob.bin"]
+
+    def test_refresh_is_incremental(self, tree):
+        index = SearchIndex(str(tree))
+        assert index.refresh() == {"added": 4, "updated": 0, "removed": 0}
+        assert index.refresh() == {"added": 0, "updated": 0, "removed": 0}
+
+        path = write(tree, "src/util/helpers.py", "import os\nhello_again = 1\n")
+        os.utime(path, ns=(1, 1))
+        os.remove(tree / "README.md")
+        write(tree, "docs/new.md", "hello docs\n")
+
+        assert index.refresh() == {"added": 1, "updated": 1, "removed": 1}
+        assert index.candidates("hello") == ["docs/new.md", "src/app.py", "src/util/helpers.py"]
+
+    def test_index_survives_reopening(self, tree):
+        SearchIndex(str(tree)).refresh()
+
+        index = SearchIndex(str(tree))
+
+        assert len(index) == 4
+        assert index.refresh() == {"added": 0, "updated": 0, "removed": 0}
+
+    def test_readonly_handle_sees_writer_refreshes(self, tree):
+        writer = SearchIndex(str(tree))
+        writer.refresh()
+        reader = pickle.loads(pickle.dumps(writer))
+
+        write(tree, "late.py", "def late(): pass\n")
+        writer.refresh()
+
+        assert reader.readonly
+        assert [m.path for m in reader.grep("def late")] == ["late.py"]
+        with pytest.raises(PermissionError):
+            reader.refresh()
+
+    def test_unpickling_reuses_one_reader(self, tree):
+        """Agents shipped to a worker per call should share one read-only handle."""
+        writer = SearchIndex(str(tree))
+        writer.refresh()
+        agent = Agent(name="a", search_index=writer)
+
+        first = pickle.loads(pickle.dumps(agent)).search_index
+        second = pickle.loads(pickle.dumps(agent)).search_index
+
+        assert first is second and first.readonly
+        assert len(first) == 4
+
+    def test_team_refreshes_off_the_loop_once(self, tree):
+        """Concurrent async runs should share one refresh made in a worker thread."""
+        threads = []
+
+        class CountingIndex(SearchIndex):
+            def refresh(self):
+                threads.append(threading.current_thread())
+                return super().refresh()
+
+        team = Team(
+            agents=[Agent(name=f"a{i}") for i in range(3)],
+            search_index=CountingIndex(str(tree)),
+        )
+
+        async def scenario():
+            return await asyncio.gather(
+                *(team.run_async(Task(description=f"t{i}")) for i in range(3))
+            )
+
+        results = asyncio.run(scenario())
+
+        assert all(result.success for result in results)
+        assert len(threads) == 1 and threads[0] is not threading.main_thread()
+
+    def test_team_refreshes_at_most_once_per_interval(self, tree, clock):
+        """Sync runs should not walk the tree before every task."""
+        index = SearchIndex(str(tree))
+        team = Team(
+            agents=[Agent(name="a")], search_index=index,
+            index_refresh_interval=5.0, clock=clock,
+        )
+        team.run(Task(description="first"))
+        write(tree, "src/new.py", "x = 1\n")
+
+        team.run(Task(description="soon after"))
+        assert len(index) == 4
+
+        clock.now = 5.0
+        team.run(Task(description="later"))
+        assert len(index) == 5
+
+    def test_team_shares_and_refreshes_index(self, tree):
+        index = SearchIndex(str(tree))
+        team = Team(agents=[Agent(name="a")], search_index=index)
+        team.add_agent(Agent(name="b"))
+
+        team.run(Task(description="look around"))
+
+        assert all(agent.search_index is index for agent in team.agents)
+        assert len(index) == 4
+
+
+class TestPatterns:
+    """Test cases for trigram extraction and glob translation."""
+
+    def test_required_trigrams_are_conservative(self):
+        assert required_trigrams("foo.*bar") == {b"foo", b"bar"}
+        assert required_trigrams("Hello") == {b"hel", b"ell", b"llo"}
+        assert required_trigrams("foo|bar") == set()
+        assert required_trigrams("(abc)?def") == {b"def"}
+        assert required_trigrams("(abcd)+") == {b"abc", b"bcd"}
+        assert required_trigrams("[") == set()
+
+    def test_glob_to_regex(self):
+        assert glob_to_regex("**/*.py") == r"(?:.*/)?[^/]*\.py"
+        assert glob_to_regex("src/?.[!c]") == r"src/[^/]\.[^c]"
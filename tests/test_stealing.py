@@ -0,0 +1,172 @@
+"""Tests for the work-stealing task queue."""
+
+import asyncio
+from dataclasses import dataclass
+
+from deepseek_code_agent import Agent, Task, TaskResult
+from deepseek_code_agent.hedging import Hedger
+from deepseek_code_agent.stealing import WorkStealingQueue
+
+
+@dataclass(repr=False)
+class TimedAgent(Agent):
+    """Agent that sleeps for ``metadata["seconds"]`` and records what it ran."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.ran: list[str] = []
+
+    async def run_async(self, task: Task) -> TaskResult:
+        await asyncio.sleep(task.metadata.get("seconds", 0.0))
+        self.ran.append(task.description)
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output=task.description)
+
+
+def timed(description, seconds, files=None):
+    metadata = {"seconds": seconds}
+    if files:
+        metadata["files"] = files
+    return Task(description=description, metadata=metadata)
+
+
+class TestWorkStealingQueue:
+    """Test cases for WorkStealingQueue."""
+
+    def test_results_in_submission_order(self):
+        agents = [TimedAgent(name=f"a{i}") for i in range(3)]
+        tasks = [timed(f"task {i}", 0.001 * (i % 4)) for i in range(30)]
+        queue = WorkStealingQueue(agents=agents, tasks=list(tasks), parallel=True)
+
+        results = queue.run()
+
+        assert [r.output for r in results] == [t.description for t in tasks]
+        assert queue.tasks == []
+
+    def test_idle_agents_steal_from_backlog(self):
+        """Tasks stuck behind a long one should be taken by idle agents."""
+        agents = [TimedAgent(name="a"), TimedAgent(name="b")]
+        tasks = [timed("long", 0.3, ["big.py"])]
+        tasks += [timed(f"short {i}", 0.01, ["big.py"]) for i in range(10)]
+        queue = WorkStealingQueue(agents=agents, tasks=tasks, parallel=True)
+
+        queue.run()
+
+        assert agents[0].ran == ["long"]
+        assert len(agents[1].ran) == 10
+        assert queue.steals == 10
+
+    def test_without_stealing_tasks_stay_put(self):
+        agents = [TimedAgent(name="a"), TimedAgent(name="b")]
+        tasks = [timed("long", 0.05, ["big.py"])]
+        tasks += [timed(f"short {i}", 0.0, ["big.py"]) for i in range(5)]
+        queue = WorkStealingQueue(agents=agents, tasks=tasks, parallel=True, steal=False)
+
+        queue.run()
+
+        assert len(agents[0].ran) == 6
+        assert agents[1].ran == []
+        assert queue.steals == 0
+
+    def test_tasks_on_same_files_share_an_agent(self):
+        agents = [TimedAgent(name=f"a{i}") for i in range(4)]
+        tasks = [timed(f"{name} {i}", 0.0, [f"{name}.py"]) for i in range(3) for name in "wxyz"]
+        queue = WorkStealingQueue(agents=agents, tasks=tasks, parallel=True, steal=False)
+
+        queue.run()
+
+        assert sorted(sorted(agent.ran) for agent in agents) == [
+            [f"{name} {i}" for i in range(3)] for name in "wxyz"
+        ]
+        assert queue.local_hits == 8
+
+    def test_locality_disabled_spreads_tasks(self):
+        agents = [TimedAgent(name=f"a{i}") for i in range(2)]
+        tasks = [timed(f"task {i}", 0.0, ["same.py"]) for i in range(4)]
+        queue = WorkStealingQueue(
+            agents=agents, tasks=tasks, parallel=True, steal=False, locality=False
+        )
+
+        queue.run()
+
+        assert [len(agent.ran) for agent in agents] == [2, 2]
+        assert queue.local_hits == 0
+
+    def test_tasks_added_while_draining(self):
+        @dataclass(repr=False)
+        class SpawningAgent(TimedAgent):
+            queue: WorkStealingQueue | None = None
+
+            async def run_async(self, task: Task) -> TaskResult:
+                if task.description == "parent":
+                    self.queue.add_task(timed("child", 0.0))
+                return await super().run_async(task)
+
+        agents = [SpawningAgent(name=f"a{i}") for i in range(2)]
+        queue = WorkStealingQueue(agents=agents, tasks=[timed("parent", 0.0)], parallel=True)
+        for agent in agents:
+            agent.queue = queue
+
+        results = queue.run()
+
+        assert [r.output for r in results] == ["parent", "child"]
+
+    def test_concurrency_is_capped(self):
+        agents = [TimedAgent(name=f"a{i}") for i in range(4)]
+        tasks = [timed(f"task {i}", 0.0) for i in range(8)]
+        queue = WorkStealingQueue(
+            agents=agents, tasks=tasks, parallel=True, max_concurrency=2, steal=False
+        )
+
+        results = queue.run()
+
+        assert len(results) == 8
+        assert [len(agent.ran) for agent in agents[2:]] == [0, 0]
+
+    def test_urgent_task_added_mid_batch_runs_next(self):
+        """A high-priority task should not wait behind queued low-priority ones."""
+
+        @dataclass(repr=False)
+        class SpawningAgent(TimedAgent):
+            queue: WorkStealingQueue | None = None
+
+            async def run_async(self, task: Task) -> TaskResult:
+                if task.description == "low 0":
+                    urgent = timed("urgent", 0.0)
+                    urgent.priority = 100
+                    self.queue.add_task(urgent)
+                return await super().run_async(task)
+
+        agent = SpawningAgent(name="a")
+        tasks = [timed(f"low {i}", 0.0) for i in range(5)]
+        for task in tasks:
+            task.priority = 1
+        queue = WorkStealingQueue(agents=[agent], tasks=tasks, parallel=True)
+        agent.queue = queue
+
+        queue.run()
+
+        assert agent.ran[:2] == ["low 0", "urgent"]
+
+    def test_steals_highest_priority_task(self):
+        agents = [TimedAgent(name="a"), TimedAgent(name="b")]
+        tasks = [timed("long", 0.1, ["big.py"])]
+        tasks += [timed(f"p{i}", 0.0, ["big.py"]) for i in range(3)]
+        for priority, task in zip((9, 1, 5, 3), tasks):
+            task.priority = priority
+        queue = WorkStealingQueue(agents=agents, tasks=tasks, parallel=True)
+
+        queue.run()
+
+        assert agents[0].ran == ["long"]
+        assert agents[1].ran == ["p1", "p2", "p0"]
+
+    def test_hedges_onto_idle_agents(self):
+        agents = [TimedAgent(name="slow"), TimedAgent(name="spare")]
+        hedger = Hedger(min_samples=1, budget=1.0)
+        hedger.observe(0.01)
+        task = Task(description="stuck", metadata={"seconds": 0.5}, hedge=True)
+        queue = WorkStealingQueue(agents=agents, tasks=[task], parallel=True, hedger=hedger)
+
+        queue.run()
+
+        assert hedger.stats()["hedged"] == 1
@@ -0,0 +1,168 @@
+"""Tests for the durable SQLite task store."""
+
+import sqlite3
+from dataclasses import dataclass
+
+import pytest
+
+from deepseek_code_agent import Agent, Task, TaskQueue, TaskResult
+from deepseek_code_agent.store import SQLiteTaskStore
+
+
+@dataclass(repr=False)
+class CountingAgent(Agent):
+    """Agent that records the tasks it really runs."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.ran: list[str] = []
+
+    def run(self, task: Task) -> TaskResult:
+        self.ran.append(task.description)
+        success = "fail" not in task.description
+        return TaskResult(task_id=task.id, agent_id=self.id, success=success, output="ok")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "tasks.db")
+
+
+class TestSQLiteTaskStore:
+    """Test cases for SQLiteTaskStore."""
+
+    def test_uses_wal_journal(self, path):
+        SQLiteTaskStore(path).close()
+
+        assert sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_writes_are_batched(self, path):
+        """Buffered writes should reach disk only once a batch fills."""
+        store = SQLiteTaskStore(path, batch_size=3)
+        reader = sqlite3.connect(path)
+        count = lambda: reader.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]  # noqa: E731
+
+        store.add(Task(description="a"))
+        store.add(Task(description="b"))
+        assert count() == 0
+        store.add(Task(description="c"))
+        assert count() == 3
+
+    def test_lease_orders_by_priority_and_excludes_leased(self, path):
+        store = SQLiteTaskStore(path)
+        low, high = Task(description="low"), Task(description="high", priority=5)
+        store.add(low)
+        store.add(high)
+
+        assert [t.id for t in store.lease("w1", 1)] == [high.id]
+        assert [t.id for t in store.lease("w2", 5)] == [low.id]
+        assert store.lease("w3", 5) == []
+        assert store.counts()["leased"] == 2
+
+    def test_expired_leases_are_requeued_on_open(self, path, clock):
+        """Tasks leased by a crashed owner should come back once the lease lapses."""
+        store = SQLiteTaskStore(path, lease_time=30, clock=clock)
+        store.add(Task(description="a"))
+        store.lease("crashed", 1)
+        store.close()
+
+        clock.now += 10
+        assert SQLiteTaskStore(path, lease_time=30, clock=clock).requeued == 0
+        clock.now += 30
+        reopened = SQLiteTaskStore(path, lease_time=30, clock=clock)
+        assert reopened.requeued == 1
+        assert [t.description for t in reopened.lease("w", 1)] == ["a"]
+
+    def test_heartbeat_keeps_lease(self, path, clock):
+        store = SQLiteTaskStore(path, lease_time=30, clock=clock)
+        task = Task(description="a")
+        store.add(task)
+        store.lease("w", 1)
+
+        clock.now += 20
+        store.heartbeat("w", [task.id])
+        clock.now += 20
+        assert store.requeue_expired() == 0
+        clock.now += 20
+        assert store.requeue_expired() == 1
+
+
+class TestDurableQueue:
+    """Test cases for TaskQueue with a store."""
+
+    def test_completed_work_is_not_redone(self, path):
+        """A task already done should be answered from the store."""
+        task = Task(description="expensive")
+        first = CountingAgent(name="a")
+        TaskQueue(agents=[first], tasks=[task], store=SQLiteTaskStore(path)).run()
+
+        second = CountingAgent(name="b")
+        queue = TaskQueue(agents=[second], tasks=[task], store=SQLiteTaskStore(path))
+        [result] = queue.run()
+
+        assert first.ran == ["expensive"] and second.ran == []
+        assert result.metadata["restored"] is True
+        assert result.agent_id == first.id
+
+    def test_resumes_unfinished_tasks_after_crash(self, path, clock):
+        """A new queue should pick up what a crashed run left behind."""
+        store = SQLiteTaskStore(path, lease_time=30)
+        tasks = [Task(description=f"t{i}") for i in range(4)]
+        for task in tasks:
+            store.add(task)
+        store.complete(TaskResult(task_id=tasks[0].id, agent_id="x", success=True, output=""))
+        store.start(tasks[1].id, "crashed-worker")
+        store.close()
+
+        clock.now = 10**10
+        agent = CountingAgent(name="a")
+        results = TaskQueue(
+            agents=[agent], parallel=True, store=SQLiteTaskStore(path, lease_time=30, clock=clock)
+        ).run()
+
+        assert sorted(agent.ran) == ["t1", "t2", "t3"]
+        assert len(results) == 3
+        assert SQLiteTaskStore(path).counts()["done"] == 4
+
+    def test_resumes_unexpired_leases_after_crash(self, path):
+        """A restart within lease_time should still run the task that was in flight."""
+        store = SQLiteTaskStore(path, lease_time=30)
+        tasks = [Task(description=f"t{i}") for i in range(3)]
+        for task in tasks:
+            store.add(task)
+        store.start(tasks[0].id, "crashed-queue")
+        store.close()
+
+        agent = CountingAgent(name="a")
+        results = TaskQueue(agents=[agent], store=SQLiteTaskStore(path, lease_time=30)).run()
+
+        assert sorted(agent.ran) == ["t0", "t1", "t2"]
+        assert len(results) == 3
+        assert SQLiteTaskStore(path).counts() == {"pending": 0, "leased": 0, "done": 3, "failed": 0}
+
+    def test_sequential_run_commits_each_result(self, path):
+        """Results of a sequential run should be on disk before the next task starts."""
+        store = SQLiteTaskStore(path)
+        reader = sqlite3.connect(path)
+        query = "SELECT COUNT(*) FROM tasks WHERE state = 'done'"
+        seen = []
+
+        @dataclass(repr=False)
+        class ReadingAgent(CountingAgent):
+            def run(self, task: Task) -> TaskResult:
+                seen.append(reader.execute(query).fetchone()[0])
+                return super().run(task)
+
+        tasks = [Task(description=f"t{i}") for i in range(3)]
+        TaskQueue(agents=[ReadingAgent(name="a")], tasks=tasks, store=store).run()
+
+        assert seen == [0, 1, 2]
+
+    def test_failed_tasks_are_retried(self, path):
+        task = Task(description="fail once")
+        TaskQueue(agents=[CountingAgent(name="a")], tasks=[task], store=SQLiteTaskStore(path)).run()
+
+        retry = CountingAgent(name="b")
+        TaskQueue(agents=[retry], store=SQLiteTaskStore(path)).run()
+
+        assert retry.ran == ["fail once"]
@@ -0,0 +1,96 @@
+"""Tests for the slotted Task, TaskResult and Message types."""
+
+import pickle
+from datetime import datetime
+
+import pytest
+
+from deepseek_code_agent import Message, Task, TaskResult
+
+
+class TestTask:
+    """Test cases for Task."""
+
+    def test_is_slotted_with_lazy_metadata(self):
+        """Tasks should carry no instance dict and no metadata until used."""
+        task = Task(description="fix")
+
+        assert not hasattr(task, "__dict__")
+        assert task._metadata is None
+        task.metadata["k"] = 1
+        assert task.metadata == {"k": 1}
+
+    def test_defaults_match_dataclass_api(self):
+        task = Task("fix", priority=2)
+
+        assert (task.description, task.priority, task.depth) == ("fix", 2, 0)
+        assert task.strategies == ["by_feature"]
+        assert task.depends_on == [] and task.metadata == {}
+        assert repr(task).startswith("Task(description='fix', id=")
+
+    def test_ids_are_unique_and_ordered(self):
+        """Ids share a process prefix and count up."""
+        ids = [Task(description="x").id for _ in range(1000)]
+
+        assert len(set(ids)) == 1000
+        assert ids == sorted(ids, key=lambda i: int(i[13:], 16))
+        assert all(i.startswith(ids[0][:13]) for i in ids)
+
+    def test_equality_ignores_metadata_laziness(self):
+        """An untouched metadata dict should equal an explicit empty one."""
+        task = Task(description="x", id="t")
+
+        assert task == Task(description="x", id="t", metadata={})
+        assert task != Task(description="y", id="t")
+        with pytest.raises(TypeError):
+            hash(task)
+
+    def test_copy_keeps_every_field(self):
+        task = Task(
+            description="x", priority=3, hedge=True, requires=["tool:grep"],
+            depends_on=["a"], metadata={"k": 1},
+        )
+
+        copy = task.copy(priority=5)
+
+        assert (copy.id, copy.hedge, copy.priority) == (task.id, True, 5)
+        assert copy.requires == ["tool:grep"] and copy.depends_on == ["a"]
+        copy.requires.append("tag:python")
+        copy.metadata["k"] = 2
+        assert task.requires == ["tool:grep"] and task.metadata == {"k": 1}
+
+
+class TestTaskResult:
+    """Test cases for TaskResult."""
+
+    def test_is_slotted_and_pickles(self):
+        result = TaskResult(task_id="t", agent_id="a", success=True, output="ok")
+
+        assert not hasattr(result, "__dict__")
+        assert pickle.loads(pickle.dumps(result)) == result
+        assert result._metadata is None
+
+
+class TestMessage:
+    """Test cases for Message."""
+
+    def test_timestamp_formatted_from_epoch(self):
+        """The ISO timestamp should be derived from the raw send time."""
+        message = Message(from_agent="a", to_agent="b", content="hi", created=0.5)
+
+        assert message.timestamp == "1970-01-01T00:00:00.500000"
+
+    def test_timestamp_argument_still_accepted(self):
+        """Passing an ISO string should round-trip as before."""
+        stamp = datetime(2024, 5, 1, 12, 30).isoformat()
+        message = Message(from_agent="a", to_agent="b", content="hi", timestamp=stamp)
+
+        assert message.timestamp == stamp
+        assert message.created == datetime.fromisoformat(stamp + "+00:00").timestamp()
+
+    def test_is_slotted_and_pickles(self):
+        message = Message(from_agent="a", to_agent="b", content="hi", metadata={"k": 1})
+
+        assert not hasattr(message, "__dict__")
+        assert pickle.loads(pickle.dumps(message)) == message
+        assert message.id.startswith("msg_")
@@ -0,0 +1,332 @@
+"""Tests for team orchestration."""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from deepseek_code_agent import Agent, Task, TaskResult, Team
+
+
+@dataclass(repr=False)
+class SlowAgent(Agent):
+    """Agent that sleeps, recording the order tasks start and finish."""
+
+    delay: float = 0.05
+    log: list | None = None
+
+    async def run_async(self, task: Task) -> TaskResult:
+        self.log.append(("start", task.description))
+        await asyncio.sleep(self.delay)
+        self.log.append(("end", task.description))
+        success = "fail" not in task.description
+        return TaskResult(
+            task_id=task.id,
+            agent_id=self.id,
+            success=success,
+            output=task.description,
+            error=None if success else "boom",
+        )
+
+
+class PlannedTeam(Team):
+    """Team whose decomposition is a fixed plan keyed by description."""
+
+    def __init__(self, plan, **kwargs):
+        super().__init__(**kwargs)
+        self.plan = plan
+
+    def _decompose_task(self, task):
+        return self.plan(task)
+
+
+def make_agents(count, log, delay=0.05):
+    return [SlowAgent(name=f"a{i}", delay=delay, log=log) for i in range(count)]
+
+
+class TestTeam:
+    """Test cases for Team."""
+
+    def test_plain_task_runs_on_one_agent(self):
+        """Tasks without decomposition go straight to an agent."""
+        team = Team(agents=[Agent(name="a")])
+        result = team.run(Task(description="hello"))
+
+        assert result.success
+        assert "hello" in result.output
+
+    def test_messages_sent_during_a_task_are_delivered(self):
+        """A member's outbox should reach its recipients' inboxes when its task ends."""
+
+        @dataclass(repr=False)
+        class Notifier(Agent):
+            peer: Agent | None = None
+
+            def run(self, task: Task) -> TaskResult:
+                self.send_to(self.peer, task.description)
+                return super().run(task)
+
+        reviewer = Agent(name="reviewer")
+        coder = Notifier(name="coder", peer=reviewer)
+        team = Team(agents=[coder])
+
+        team.run(Task(description="sync"))
+        asyncio.run(team.run_async(Task(description="async")))
+
+        assert not coder.outbox
+        assert [reviewer.receive().content for _ in range(2)] == ["sync", "async"]
+
+    def test_independent_subtasks_run_concurrently(self):
+        """Default subtasks should overlap across team members."""
+        log = []
+        team = Team(agents=make_agents(3, log))
+
+        start = time.perf_counter()
+        result = team.run(Task(description="refactor", decompose=True))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.05 * 2
+        assert result.agent_id == team.name
+        assert len(result.metadata["subtask_results"]) == 3
+        assert result.output.count("Part of: refactor") == 3
+
+    def test_concurrency_bounded_by_team_size(self):
+        """No more subtasks than agents should run at once."""
+        log = []
+        team = Team(agents=make_agents(2, log, delay=0.01))
+        team.run(Task(description="refactor", decompose=True))
+
+        running = peak = 0
+        for event, _ in log:
+            running += 1 if event == "start" else -1
+            peak = max(peak, running)
+        assert peak == 2
+
+    def test_dependencies_are_respected(self):
+        """A subtask should start only after its dependencies finish."""
+        log = []
+
+        def plan(task):
+            parse = Task(description="parse")
+            edit = Task(description="edit", depends_on=[parse.id])
+            docs = Task(description="docs")
+            return [edit, parse, docs]
+
+        team = PlannedTeam(plan, agents=make_agents(3, log, delay=0.01))
+        result = team.run(Task(description="change", decompose=True))
+
+        assert log.index(("end", "parse")) < log.index(("start", "edit"))
+        assert log.index(("start", "docs")) < log.index(("end", "parse"))
+        assert result.output.splitlines() == ["edit", "parse", "docs"]
+
+    def test_failed_dependency_skips_dependents(self):
+        """Dependents of a failed subtask should fail without running."""
+        log = []
+
+        def plan(task):
+            first = Task(description="fail first")
+            second = Task(description="second", depends_on=[first.id])
+            return [first, second]
+
+        team = PlannedTeam(plan, agents=make_agents(2, log, delay=0))
+        result = team.run(Task(description="change", decompose=True))
+
+        assert result.success is False
+        assert ("start", "second") not in log
+        assert "dependency" in result.metadata["subtask_results"][1].error
+
+    def test_recursive_decomposition_stops_at_max_depth(self):
+        """Subtasks may decompose further, but not past max_depth."""
+        log = []
+
+        def plan(task):
+            return [
+                Task(description=f"{task.description}.{i}", decompose=True, max_depth=2)
+                for i in range(2)
+            ]
+
+        team = PlannedTeam(plan, agents=make_agents(4, log, delay=0))
+        result = team.run(Task(description="root", decompose=True, max_depth=2))
+
+        leaves = sorted(desc for event, desc in log if event == "start")
+        assert leaves == ["root.0.0", "root.0.1", "root.1.0", "root.1.1"]
+        assert result.success
+
+    def test_dependency_cycle_rejected(self):
+        """Cyclic sibling dependencies should raise."""
+
+        def plan(task):
+            a, b = Task(description="a"), Task(description="b")
+            a.depends_on, b.depends_on = [b.id], [a.id]
+            return [a, b]
+
+        team = PlannedTeam(plan, agents=[Agent(name="a")])
+        with pytest.raises(ValueError):
+            team.run(Task(description="loop", decompose=True))
+
+    def test_aiter_results_streams_subtasks_then_parent(self):
+        """Subtask results should stream before the reduced parent result."""
+        log = []
+        team = Team(agents=make_agents(3, log, delay=0.01))
+        task = Task(description="refactor", decompose=True)
+
+        async def collect():
+            return [result async for result in team.aiter_results(task)]
+
+        results = asyncio.run(collect())
+
+        assert len(results) == 4
+        assert results[-1].task_id == task.id
+        assert all(r.agent_id != team.name for r in results[:-1])
+
+
+class TestTeamRouting:
+    """Test cases for capability-based agent selection."""
+
+    def make_team(self):
+        return Team(
+            agents=[
+                Agent(name="writer", role="Developer", tools=["edit", "grep"], tags=["python"]),
+                Agent(name="reviewer", role="Reviewer", tools=["grep"], tags=["python"]),
+                Agent(name="infra", role="Developer", tools=["shell"], model="deepseek-reasoner"),
+            ]
+        )
+
+    def route(self, team, *requires):
+        return team.run(Task(description="t", requires=list(requires))).agent_id
+
+    def test_capabilities_cover_role_model_tools_and_tags(self):
+        agent = Agent(name="a", role="Reviewer", tools=["grep"], tags=["python"])
+
+        assert agent.capabilities() == {
+            "role:Reviewer", "model:deepseek-chat", "tool:grep", "tag:python",
+        }
+        assert agent.can_handle(Task("t", requires=["tool:grep", "tag:python"]))
+        assert not agent.can_handle(Task("t", requires=["tool:edit"]))
+
+    def test_requirements_intersect(self):
+        team = self.make_team()
+        writer, reviewer, infra = team.agents
+
+        assert self.route(team, "tool:grep", "role:Reviewer") == reviewer.id
+        assert self.route(team, "tag:python", "tool:edit") == writer.id
+        assert self.route(team, "model:deepseek-reasoner") == infra.id
+
+    def test_equal_candidates_take_turns(self):
+        """Sequential tasks should no longer all land on the first agent."""
+        team = self.make_team()
+
+        routed = [self.route(team, "role:Developer") for _ in range(4)]
+        anyone = {self.route(team) for _ in range(3)}
+
+        writer, _, infra = team.agents
+        assert routed == [writer.id, infra.id, writer.id, infra.id]
+        assert anyone == {agent.id for agent in team.agents}
+
+    def test_least_loaded_candidate_wins(self):
+        log = []
+        team = Team(agents=make_agents(2, log, delay=0.05))
+        first, second = team.agents
+
+        async def overlap():
+            busy = asyncio.create_task(team.run_async(Task(description="long")))
+            await asyncio.sleep(0.01)
+            quick = await team.run_async(Task(description="quick"))
+            return await busy, quick
+
+        busy, quick = asyncio.run(overlap())
+
+        assert busy.agent_id == first.id
+        assert quick.agent_id == second.id
+
+    def test_unsatisfiable_requirements_raise(self):
+        team = self.make_team()
+
+        with pytest.raises(ValueError):
+            self.route(team, "tool:shell", "tag:python")
+
+    def test_index_follows_membership_changes(self):
+        team = self.make_team()
+        writer, reviewer, _ = team.agents
+
+        team.remove_agent(reviewer)
+        with pytest.raises(ValueError):
+            self.route(team, "role:Reviewer")
+
+        newcomer = Agent(name="new", role="Reviewer")
+        team.add_agent(newcomer)
+        assert self.route(team, "role:Reviewer") == newcomer.id
+
+        writer.tags.append("rust")
+        team.reindex()
+        assert self.route(team, "tag:rust") == writer.id
+
+    def test_subtasks_inherit_requirements(self):
+        team = self.make_team()
+        _, reviewer, _ = team.agents
+
+        result = team.run(Task(description="review", decompose=True, requires=["role:Reviewer"]))
+
+        subtasks = result.metadata["subtask_results"]
+        assert [r.agent_id for r in subtasks] == [reviewer.id] * 3
+
+    def test_release_wakes_only_matching_waiters(self):
+        """Finishing a task on one route should not make another route's queue re-pick."""
+        log = []
+        slow = SlowAgent(name="slow", tags=["x"], delay=0.02, log=log)
+        quick = SlowAgent(name="quick", tags=["y"], delay=0, log=log)
+        team = Team(agents=[slow, quick])
+        picks = []
+        select = team._select_agent
+
+        def spy(task):
+            picks.append(task.requires[0])
+            return select(task)
+
+        team._select_agent = spy
+
+        async def mixed():
+            queued = [
+                asyncio.create_task(team.run_async(Task(description=f"x{i}", requires=["tag:x"])))
+                for i in range(4)
+            ]
+            await asyncio.sleep(0.005)
+            for i in range(5):
+                await team.run_async(Task(description=f"y{i}", requires=["tag:y"]))
+            return await asyncio.gather(*queued)
+
+        results = asyncio.run(mixed())
+
+        assert [r.agent_id for r in results] == [slow.id] * 4
+        # One pick per task, plus one retry per task that had to wait.
+        assert picks.count("tag:x") == 4 + 3
+
+    def test_routed_subtasks_run_one_at_a_time_per_agent(self):
+        """Requirement-matched leaves should share the pool's one-task-per-member limit."""
+
+        @dataclass(repr=False)
+        class OverlapAgent(Agent):
+            def __post_init__(self) -> None:
+                super().__post_init__()
+                self.lock = threading.Lock()
+                self.running = self.peak = 0
+
+            def run(self, task: Task) -> TaskResult:
+                with self.lock:
+                    self.running += 1
+                    self.peak = max(self.peak, self.running)
+                time.sleep(0.02)
+                with self.lock:
+                    self.running -= 1
+                return TaskResult(task_id=task.id, agent_id=self.id, success=True, output="")
+
+        python = OverlapAgent(name="py", tags=["py"])
+        team = Team(agents=[python, OverlapAgent(name="other")], executor="thread")
+
+        result = team.run(Task(description="t", decompose=True, requires=["tag:py"]))
+        team.close()
+
+        assert [r.agent_id for r in result.metadata["subtask_results"]] == [python.id] * 3
+        assert python.peak == 1
@@ -0,0 +1,116 @@
+"""Tests for task timing spans and their export."""
+
+import asyncio
+import pickle
+import time
+from dataclasses import dataclass
+
+from deepseek_code_agent import Agent, Monitor, Task, TaskQueue, TaskResult
+from deepseek_code_agent.tracing import Histogram, record_model_call, task_span, tool_call
+
+
+@dataclass(repr=False)
+class ToolAgent(Agent):
+    """Agent that reports one model call and one tool call per task."""
+
+    def run(self, task: Task) -> TaskResult:
+        record_model_call(0.02, tokens=120)
+        with tool_call():
+            time.sleep(0.001)
+        return TaskResult(task_id=task.id, agent_id=self.id, success=True, output="ok")
+
+
+class TestHistogram:
+    """Test cases for Histogram and TaskSpan."""
+
+    def test_buckets_are_upper_bounds(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        assert histogram.counts == [2, 1, 1]
+        assert list(histogram.cumulative()) == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+        assert histogram.sum == 3.65
+
+
+    def test_span_pickles_without_agent(self):
+        """Spans travel with results, so they must pickle on their own."""
+        agent = Agent(name="a")
+        with task_span(agent, Task(description="x")) as span:
+            pass
+
+        copy = pickle.loads(pickle.dumps(span))
+
+        assert copy.to_dict() == span.to_dict()
+
+
+class TestTaskSpans:
+    """Test cases for spans recorded by TaskQueue and Monitor."""
+
+    def test_queue_attaches_spans(self):
+        """Each result should carry its queue wait, run time and calls."""
+        queue = TaskQueue(agents=[ToolAgent(name="t")], tasks=[Task(description="a")])
+
+        span = queue.run()[0].metadata["span"]
+
+        assert span["enqueued"] <= span["started"] <= span["finished"]
+        assert span["model_calls"] == 1 and span["tokens"] == 120
+        assert span["model_time"] == 0.02
+        assert span["tool_calls"] == 1 and span["tool_time"] > 0
+
+    def test_thread_executor_reports_to_span(self):
+        """Calls made on the thread executor's pool should reach the span."""
+        queue = TaskQueue(
+            agents=[ToolAgent(name="t")],
+            tasks=[Task(description="a")],
+            parallel=True,
+            executor="thread",
+        )
+        try:
+            span = queue.run()[0].metadata["span"]
+        finally:
+            queue.close()
+
+        assert type(span) is dict
+        assert span["model_calls"] == 1 and span["tokens"] == 120
+
+    def test_spans_reach_monitor_from_worker_threads(self):
+        """Model calls made in to_thread workers should count toward the span."""
+        agent = ToolAgent(name="t", role="Tester")
+        monitor = Monitor()
+        monitor.track(agent)
+        queue = TaskQueue(agents=[agent], parallel=True)
+        for i in range(3):
+            queue.add_task(Task(description=f"task {i}"))
+
+        queue.run()
+
+        assert monitor.histogram("run_time", role="Tester").count == 3
+        assert monitor.histogram("model_time", agent="t").sum == 0.06
+        assert monitor.histogram("run_time", role="Other").count == 0
+
+    def test_untracked_agents_are_not_aggregated(self):
+        agent = Agent(name="a")
+        monitor = Monitor()
+        monitor.track(agent)
+        monitor.untrack(agent)
+
+        TaskQueue(agents=[agent], tasks=[Task(description="x")]).run()
+
+        assert monitor.histogram("run_time").count == 0
+
+    def test_openmetrics_export(self):
+        """The export should be valid OpenMetrics text with labelled series."""
+        agent = ToolAgent(name='say "hi"', role="Coder")
+        monitor = Monitor()
+        monitor.track(agent)
+        asyncio.run(TaskQueue(agents=[agent], tasks=[Task(description="x")]).run_async())
+
+        text = monitor.openmetrics()
+
+        labels = 'agent="say \\"hi\\"",role="Coder"'
+        assert "# TYPE deepseek_agent_run_time_seconds histogram" in text
+        assert f'deepseek_agent_run_time_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+        assert f"deepseek_agent_run_time_seconds_count{{{labels}}} 1" in text
+        assert f"deepseek_agent_tokens_total{{{labels}}} 120" in text
+        assert text.endswith("# EOF\n")